@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# bench_scrape.py – pomiar przepustowości scraperów TG na offline fake'u (bez kont i sieci)
+#
+#   python scripts/bench_scrape.py --channels 200 --messages 2000 --accounts 3 --latency 0.05
+#   python scripts/bench_scrape.py --incremental 50        # drugi przebieg: tylko nowe wiadomości
+#   python scripts/bench_scrape.py --tool admin            # tg_admin_dump zamiast tg_deep_scrape
+#
+# Świat i klienci z tele/fake_client (latencja na wywołanie API, FloodWait co N-te
+# wywołanie konta), harmonogram z tele/session_pool — ta sama ścieżka co produkcja.
+import argparse, asyncio, contextlib, io, json, os, sys, tempfile, time
+
+from scamgeo_banking.tele.fake_client import FakeTelegramClient, FakeWorld
+from scamgeo_banking.tele.session_pool import SessionPool
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Benchmark tg_deep_scrape / tg_admin_dump na FakeTelegramClient")
+    ap.add_argument("--tool", choices=("deep", "admin"), default="deep")
+    ap.add_argument("--channels", type=int, default=100)
+    ap.add_argument("--messages", type=int, default=1000, help="wiadomości na kanał")
+    ap.add_argument("--limit", type=int, default=700, help="limit wiadomości na kanał (deep) / historia (admin)")
+    ap.add_argument("--accounts", type=int, default=1)
+    ap.add_argument("--per-client", type=int, default=4)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--latency", type=float, default=0.02, help="s na wywołanie API")
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--flood-every", type=int, default=0, help="FloodWait co N-te wywołanie konta (0 = nigdy)")
+    ap.add_argument("--flood-seconds", type=int, default=2)
+    ap.add_argument("--media", action="store_true", help="etap pobierania obrazów (deep)")
+    ap.add_argument("--incremental", type=int, default=0, metavar="N", help="drugi przebieg po N nowych wiadomościach")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--verbose", action="store_true", help="logi narzędzia na stdout")
+    return ap.parse_args()
+
+
+def make_pool(args, world):
+    clients = [(f"fake{i + 1}", FakeTelegramClient(f"fake{i + 1}", world=world, latency=args.latency, jitter=args.jitter,
+                                                   flood_every=args.flood_every, flood_seconds=args.flood_seconds))
+               for i in range(args.accounts)]
+    return SessionPool(clients, per_client=args.per_client, min_interval=0.0)
+
+
+async def run_deep(args, pool, handles, min_ids=None):
+    from scamgeo_banking.tele import tg_deep_scrape as ds
+    from scamgeo_banking.tele.media import MediaStore
+
+    sem = asyncio.Semaphore(args.concurrency)
+    store = MediaStore("media") if args.media else None
+    progress = {"done": 0, "total": len(handles), "t0": time.monotonic()}
+    out = await asyncio.gather(*(ds._channel_task(pool, h, sem, args.limit, progress, min_id=(min_ids or {}).get(h, 0), media=store)
+                                 for h in handles))
+    return out, sum(r["_new"] for r in out), store
+
+
+async def run_admin(args, pool, handles):
+    from scamgeo_banking.tele import tg_admin_dump as ad
+
+    out = await ad.dump_all(pool, handles, concurrency=args.concurrency, history=args.limit)
+    return out, sum(min(args.limit, args.messages) for i in out if i["title"]), None
+
+
+def quiet(verbose):
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+def report(label, t, out, msgs, pool, store):
+    calls = {}
+    for pc in pool.members:
+        for k, v in pc.client.calls.items():
+            calls[k] = calls.get(k, 0) + v
+    ok = sum(1 for r in out if r.get("ok", not r["errors"]))   # admin_dump nie ma pola "ok"
+    print(f"[BENCH] {label}: {len(out)} kanałów ({ok} ok) w {t:.2f}s -> "
+          f"{len(out) / t:.1f} kanałów/s, {msgs / t:.0f} wiadomości/s")
+    print(f"        wywołania API: {json.dumps(calls, sort_keys=True)}")
+    print(f"        pula: {json.dumps(pool.summary(), sort_keys=True)}")
+    if store is not None:
+        print(f"        {store.summary()}")
+
+
+def main():
+    args = parse_args()
+    world = FakeWorld(channels=args.channels, messages=args.messages, seed=args.seed)
+    pool = make_pool(args, world)
+    handles = world.handles()
+    # narzędzia zapisują do scam_hunter_out/ i bazy — przebieg w katalogu tymczasowym
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_scrape_") as tmp:
+        os.chdir(tmp)
+        try:
+            os.environ.setdefault("DB_PATH", os.path.join(tmp, "bench.db"))
+            t0 = time.monotonic()
+            with quiet(args.verbose):
+                if args.tool == "deep":
+                    out, msgs, store = asyncio.run(run_deep(args, pool, handles))
+                else:
+                    out, msgs, store = asyncio.run(run_admin(args, pool, handles))
+            report(f"{args.tool} / pełny", time.monotonic() - t0, out, msgs, pool, store)
+
+            if args.incremental and args.tool == "deep":
+                min_ids = {h: r["_max_id"] for h, r in zip(handles, out) if r["ok"]}
+                world.advance(args.incremental)
+                pool = make_pool(args, world)
+                t0 = time.monotonic()
+                with quiet(args.verbose):
+                    out, msgs, store = asyncio.run(run_deep(args, pool, handles, min_ids))
+                report(f"deep / przyrostowy (+{args.incremental})", time.monotonic() - t0, out, msgs, pool, store)
+        finally:
+            os.chdir(cwd)   # przed sprzątaniem katalogu tymczasowego, także po błędzie
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
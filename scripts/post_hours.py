@@ -1,30 +1,35 @@
-import json, collections, datetime, pytz
+import json, pytz
+from datetime import timezone
 from pathlib import Path
 
+from scamgeo_banking.detection.tzinfer import hour_histogram_tzs, infer_offsets
+from scamgeo_banking.storage.archive import MessageArchive
+
 # ---- Konfiguracja ----
 OUTDIR = Path("scam_hunter_out")
 TZ_LOCAL = pytz.timezone("Europe/Vienna")   # lokalna strefa czasu
-FN = max(OUTDIR.glob("deep_report_*.json")) # ostatni plik z deep_scrape
-print(f"[INFO] Analiza godzin publikacji w: {FN.name}")
+ARCHIVE = MessageArchive(OUTDIR / "archive")
 
 # ---- Wczytanie danych ----
-data = json.loads(FN.read_text(encoding="utf-8"))
-hours = collections.Counter()
-total_msgs = 0
-
-# ---- Zliczanie godzin ----
-for ch in data.get("channels", []):
-    for msg in ch.get("samples", []):
-        ts = msg.get("date")
-        if not ts:
-            continue
-        try:
-            dt = datetime.datetime.fromisoformat(ts.replace("Z", "+00:00"))
-            local_dt = dt.astimezone(TZ_LOCAL)
-            hours[local_dt.hour] += 1
-            total_msgs += 1
-        except Exception:
-            continue
+if ARCHIVE.channels():
+    # archiwum wiadomości: cała historia, strumieniowo (bez ładowania do pamięci)
+    print(f"[INFO] Analiza godzin publikacji w archiwum: {ARCHIVE.root}")
+
+    def dates():
+        return (r["date"] for r in ARCHIVE.iter_messages() if r.get("date"))
+else:
+    FN = max(OUTDIR.glob("deep_report_*.json")) # ostatni plik z deep_scrape
+    print(f"[INFO] Analiza godzin publikacji w: {FN.name}")
+    data = json.loads(FN.read_text(encoding="utf-8"))
+    samples = [msg.get("date") for ch in data.get("channels", []) for msg in ch.get("samples", []) if msg.get("date")]
+
+    def dates():
+        return iter(samples)
+
+# ---- Zliczanie godzin (detection/tzinfer): lokalne i UTC w jednym przejściu po archiwum ----
+local_hist, utc_hist = hour_histogram_tzs(dates(), (TZ_LOCAL, timezone.utc))
+hours = [int(c) for c in local_hist]
+total_msgs = sum(hours)
 
 # ---- Wyniki ----
 print(f"[OK] Przetworzono {total_msgs} wiadomości.")
@@ -43,3 +48,7 @@ with open(csv_path, "w", encoding="utf-8") as f:
     for h in range(24):
         f.write(f"{h},{hours[h]}\n")
 print(f"\n[OK] Zapisano histogram -> {csv_path}")
+
+off = infer_offsets([list(utc_hist)])[0]
+if off is not None:
+    print(f"[INFO] Godziny aktywności najlepiej pasują do UTC{off:+d}")
@@ -24,5 +24,11 @@ while True:
                 w.writerow([row["domain"], row["ip"], row["ipwhois"]["asn"], row["ipwhois"]["network"]["name"]])
     except Exception as e:
         pass
-    # 5) śpij
+    # 5) przyrostowe wnioskowanie o kraju (stan w SQLite, tylko nowe wiadomości)
+    accounts = "scam_hunter_out/country_watch.txt"
+    if os.path.exists(accounts):
+        with open(accounts, encoding="utf-8") as f:
+            for user in [l.strip() for l in f if l.strip() and not l.startswith("#")]:
+                subprocess.run([PY, "-m", "scamgeo_banking.tele.telegram", "--username", user, "--incremental"], check=False)
+    # 6) śpij
     time.sleep(LOOP_MIN*60)
@@ -1,54 +1,90 @@
 from __future__ import annotations
 from typing import Iterable, List, Dict
 from pathlib import Path
-import csv
-from ..platforms.youtube import fetch_channel_recent
-from ..platforms.tiktok import fetch_profile_recent
-from ..platforms.facebook import fetch_page_recent
-from ..platforms.common_fetch import WebItem
-from ..scoring.banking import score_text
+import asyncio, csv, logging
+from platforms.youtube import afetch_channel_recent
+from platforms.tiktok import afetch_profile_recent
+from platforms.facebook import afetch_page_recent
+from platforms.common_fetch import WebItem
+from platforms.fetch_engine import FetchEngine, host_of
+from scoring.banking import RULES_TAG, score_batch
+from scamgeo_banking.detection.textcache import TextCache, content_key
+
+log = logging.getLogger(__name__)
 
 
 SUPPORTED = {"youtube", "tiktok", "facebook"}
 
 
-def scan_targets(targets: Iterable[str], out_dir: Path) -> List[Dict]:
-out_dir.mkdir(parents=True, exist_ok=True)
-rows: List[Dict] = []
-for t in targets:
-t = t.strip()
-if not t:
-continue
-if t.startswith("yt:"):
-ch = t.split(":",1)[1]
-items = fetch_channel_recent(ch, limit=10)
-elif t.startswith("tt:"):
-handle = t.split(":",1)[1].lstrip("@")
-items = fetch_profile_recent(handle, limit=10)
-elif t.startswith("fb:"):
-page = t.split(":",1)[1]
-items = fetch_page_recent(page, limit=10)
-else:
-# raw URL: try best effort classification by hostname
-if "youtube.com/channel/" in t or "feeds/videos.xml?channel_id=" in t:
-ch = t.rsplit("/",1)[-1].split("=")[-1]
-items = fetch_channel_recent(ch, limit=10)
-else:
-items = []
-for it in items:
-sc = score_text(it.text or "", it.url)
-rows.append({
-"platform": it.platform,
-"source": it.source,
-"url": it.url,
-"title": it.title or "",
-"label": sc["label"],
-"score": sc["score"],
-"hits": sc["hits"],
-})
-# write csv
-out_csv = out_dir / "webscan_scored.csv"
-with out_csv.open("w", newline="", encoding="utf-8") as f:
-w = csv.DictWriter(f, fieldnames=["platform","source","url","title","label","score","hits"])
-w.writeheader(); w.writerows(rows)
-return rows
\ No newline at end of file
+async def fetch_target(engine: FetchEngine, t: str) -> List[WebItem]:
+    if t.startswith("yt:"):
+        ch = t.split(":",1)[1]
+        return await afetch_channel_recent(engine, ch, limit=10)
+    if t.startswith("tt:"):
+        handle = t.split(":",1)[1].lstrip("@")
+        return await afetch_profile_recent(engine, handle, limit=10)
+    if t.startswith("fb:"):
+        page = t.split(":",1)[1]
+        return await afetch_page_recent(engine, page, limit=10)
+    # raw URL: try best effort classification by hostname
+    if "youtube.com/channel/" in t or "feeds/videos.xml?channel_id=" in t:
+        ch = t.rsplit("/",1)[-1].split("=")[-1]
+        return await afetch_channel_recent(engine, ch, limit=10)
+    return []
+
+
+async def collect(targets: Iterable[str], engine: FetchEngine | None = None) -> List[WebItem]:
+    """Wszystkie cele naraz (limity globalne / na host z scanner.yaml); kolejność wyników = kolejność celów."""
+    ts = [t.strip() for t in targets if t.strip()]
+    eng = engine or FetchEngine.from_settings()
+    try:
+        results = await asyncio.gather(*(fetch_target(eng, t) for t in ts), return_exceptions=True)
+    finally:
+        if engine is None:
+            eng.close()
+    collected: List[WebItem] = []
+    for t, items in zip(ts, results):
+        if isinstance(items, BaseException):
+            # jeden niedostępny cel nie przerywa przebiegu po pozostałych
+            log.warning("webscan: %s: %r", t, items)
+            continue
+        collected.extend(items)
+    return collected
+
+
+def scan_targets(targets: Iterable[str], out_dir: Path, engine: FetchEngine | None = None) -> List[Dict]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    collected = asyncio.run(collect(targets, engine))
+    # scoring: powtórki (po normalizacji, na tym samym hoście) brane z cache, reszta jedną partią przez silnik reguł
+    cache = TextCache(path=out_dir / "score_cache.json", tag=RULES_TAG)
+    # z URL-a źródła RuleEngine.score bierze tylko host — ten sam tekst na innych filmach/stronach hosta trafia w cache
+    keys = [content_key(it.text or "", host_of(it.url or ""))[0] for it in collected]
+    scores = [cache.get(k) for k in keys]
+    todo = {}   # klucz -> pierwsza pozycja; powtórki w tej samej partii liczone raz
+    for i, (k, sc) in enumerate(zip(keys, scores)):
+        if sc is None:
+            todo.setdefault(k, i)
+    fresh = dict(zip(todo, score_batch([collected[i].text or "" for i in todo.values()],
+                                       [collected[i].url for i in todo.values()])))
+    for k, sc in fresh.items():
+        cache.put(k, sc)
+    scores = [sc if sc is not None else fresh[k] for k, sc in zip(keys, scores)]
+    rows: List[Dict] = []
+    for it, sc in zip(collected, scores):
+        rows.append({
+            "platform": it.platform,
+            "source": it.source,
+            "url": it.url,
+            "title": it.title or "",
+            "label": sc["label"],
+            "score": sc["score"],
+            "hits": sc["hits"],
+        })
+    # write csv
+    out_csv = out_dir / "webscan_scored.csv"
+    with out_csv.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=["platform","source","url","title","label","score","hits"])
+        w.writeheader(); w.writerows(rows)
+    cache.save()
+    log.info("webscan: %d pozycji, %s", len(rows), cache.summary())
+    return rows
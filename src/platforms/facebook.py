@@ -1,7 +1,8 @@
 from __future__ import annotations
 from typing import List
 from urllib.parse import quote
-from .common_fetch import _get, extract_visible_text, WebItem, rate_limit
+from .common_fetch import extract_visible_text, WebItem
+from .fetch_engine import FetchEngine, run
 
 
 # Public page feed via mbasic (lighter HTML). No login.
@@ -10,8 +11,12 @@ PAGE_TMPL = "https://mbasic.facebook.com/{page}"
 
 
 
+async def afetch_page_recent(engine: FetchEngine, page_id_or_name: str, limit: int = 10) -> List[WebItem]:
+    url = PAGE_TMPL.format(page=quote(page_id_or_name))
+    page = await engine.get(url)
+    text = extract_visible_text(page.text)
+    return [WebItem("facebook", page_id_or_name, url, title=f"Facebook {page_id_or_name}", text=text, extra={"limit": limit})]
+
+
 def fetch_page_recent(page_id_or_name: str, limit: int = 10) -> List[WebItem]:
-url = PAGE_TMPL.format(page=quote(page_id_or_name))
-page = _get(url)
-text = extract_visible_text(page.text)
-return [WebItem("facebook", page_id_or_name, url, title=f"Facebook {page_id_or_name}", text=text, extra={"limit": limit})]
\ No newline at end of file
+    return run(afetch_page_recent, page_id_or_name, limit)
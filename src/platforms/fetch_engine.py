@@ -0,0 +1,149 @@
+from __future__ import annotations
+import asyncio, random, time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .common_fetch import DEFAULT_UA
+
+
+# Async fetch engine for the platform scrapers.
+# - one pooled keep-alive requests.Session (urllib3 pool per host, size = per-host limit);
+# - global + per-host semaphores (configs/scanner.yaml -> scanner.concurrency_total / concurrency_per_host);
+# - polite per-host pacing: request starts on one host are at least `host_interval` apart;
+# - 429/503 and connection errors retried with backoff (Retry-After honoured).
+# Blocking I/O runs on a thread pool sized to the global limit, so the event loop
+# only schedules; no extra HTTP dependency beyond requests. Semaphores bind to the
+# first loop that uses them: one engine per asyncio.run (see run()).
+SCANNER_YAML = "configs/scanner.yaml"
+DEFAULTS = {"concurrency_total": 50, "concurrency_per_host": 3, "host_interval_sec": 0.5, "timeout_sec": 15, "max_retries": 2}
+RETRY_STATUS = (429, 503)
+MAX_RETRY_AFTER = 60.0
+
+
+def load_settings(path: str | Path = SCANNER_YAML) -> Dict[str, Any]:
+    cfg = dict(DEFAULTS)
+    p = Path(path)
+    if p.exists():
+        import yaml
+        y = yaml.safe_load(p.read_text(encoding="utf-8-sig")) or {}
+        cfg.update({k: v for k, v in (y.get("scanner") or {}).items() if k in DEFAULTS})
+    return cfg
+
+
+def host_of(url: str) -> str:
+    try:
+        return (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+class FetchEngine:
+    def __init__(self, concurrency_total: int = 50, concurrency_per_host: int = 3, host_interval: float = 0.5,
+                 timeout: float = 15, max_retries: int = 2, session: Optional[requests.Session] = None):
+        self.total = concurrency_total
+        self.per_host = concurrency_per_host
+        self.host_interval = host_interval
+        self.timeout = timeout
+        self.max_retries = max_retries
+        if session is None:
+            session = requests.Session()
+            session.headers["User-Agent"] = DEFAULT_UA
+        self.session = session
+        adapter = HTTPAdapter(pool_connections=concurrency_total, pool_maxsize=concurrency_per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=concurrency_total, thread_name_prefix="fetch")
+        self._global = asyncio.Semaphore(concurrency_total)
+        self._hosts: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        self._next_start: Dict[str, float] = defaultdict(float)
+        self.stats: Dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def from_settings(cls, path: str | Path = SCANNER_YAML, **kw) -> "FetchEngine":
+        c = load_settings(path)
+        opts = {"concurrency_total": int(c["concurrency_total"]), "concurrency_per_host": int(c["concurrency_per_host"]),
+                "host_interval": float(c["host_interval_sec"]), "timeout": float(c["timeout_sec"]),
+                "max_retries": int(c["max_retries"])}
+        opts.update(kw)
+        return cls(**opts)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+        self.session.close()
+
+    async def __aenter__(self) -> "FetchEngine":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    async def _pace(self, host: str) -> None:
+        # reserve the next start slot on this host (no lock needed: single event loop)
+        now = time.monotonic()
+        start = max(now, self._next_start[host])
+        self._next_start[host] = start + self.host_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def _request(self, method: str, url: str, kw: Dict[str, Any]) -> requests.Response:
+        kw.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kw)
+
+    async def request(self, method: str, url: str, **kw) -> requests.Response:
+        host = host_of(url)
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            async with self._hosts[host], self._global:
+                # paced after taking the global slot, so queueing for it cannot bunch starts on one host
+                await self._pace(host)
+                self.stats["requests"] += 1
+                try:
+                    r = await loop.run_in_executor(self._pool, self._request, method, url, dict(kw))
+                except (requests.Timeout, requests.ConnectionError):
+                    if attempt >= self.max_retries:
+                        raise
+                    self.stats["retries"] += 1
+                    delay = 2 ** attempt + random.random() * 0.1
+                    r = None
+            if r is not None:
+                if r.status_code not in RETRY_STATUS or attempt >= self.max_retries:
+                    r.raise_for_status()
+                    return r
+                self.stats["retries"] += 1
+                delay = _retry_after(r, 2 ** attempt)
+            # back off outside the host slot; later starts on this host wait as well
+            self._next_start[host] = max(self._next_start[host], time.monotonic() + delay)
+            await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    async def get(self, url: str, **kw) -> requests.Response:
+        return await self.request("GET", url, **kw)
+
+    async def get_many(self, urls: Iterable[str], **kw) -> List[Any]:
+        """Responses in input order; a failed URL yields its exception instead of aborting the batch."""
+        return await asyncio.gather(*(self.get(u, **kw) for u in urls), return_exceptions=True)
+
+
+def _retry_after(r: requests.Response, default: float) -> float:
+    try:
+        return min(float(r.headers.get("Retry-After", default)), MAX_RETRY_AFTER)
+    except ValueError:
+        return default
+
+
+def run(coro_fn, *args, engine: Optional[FetchEngine] = None, **kw):
+    """Sync entry point: runs coro_fn(engine, *args, **kw) on a fresh loop (engine from scanner.yaml if not given)."""
+    async def main():
+        eng = engine or FetchEngine.from_settings()
+        try:
+            return await coro_fn(eng, *args, **kw)
+        finally:
+            if engine is None:
+                eng.close()
+    return asyncio.run(main())
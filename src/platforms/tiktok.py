@@ -1,7 +1,8 @@
 from __future__ import annotations
 from typing import List
 from urllib.parse import quote
-from .common_fetch import _get, extract_visible_text, WebItem, rate_limit
+from .common_fetch import extract_visible_text, WebItem
+from .fetch_engine import FetchEngine, run
 
 
 # Public profile page scrape (no login). TikTok changes often; we only need visible text for IOC/keywords.
@@ -13,10 +14,14 @@ PROFILE_TMPL = "https://www.tiktok.com/@{handle}"
 
 
 
+async def afetch_profile_recent(engine: FetchEngine, handle: str, limit: int = 10) -> List[WebItem]:
+    url = PROFILE_TMPL.format(handle=quote(handle))
+    page = await engine.get(url)
+    text = extract_visible_text(page.text)
+    # We don't reliably parse individual post URLs here (heavy JS). We still feed text into IOC + keyword scorer.
+    # To keep schema, we return a single WebItem for the profile "recent" text block.
+    return [WebItem("tiktok", handle, url, title=f"TikTok @{handle}", text=text, extra={"limit": limit})]
+
+
 def fetch_profile_recent(handle: str, limit: int = 10) -> List[WebItem]:
-url = PROFILE_TMPL.format(handle=quote(handle))
-page = _get(url)
-text = extract_visible_text(page.text)
-# We don't reliably parse individual post URLs here (heavy JS). We still feed text into IOC + keyword scorer.
-# To keep schema, we return a single WebItem for the profile "recent" text block.
-return [WebItem("tiktok", handle, url, title=f"TikTok @{handle}", text=text, extra={"limit": limit})]
\ No newline at end of file
+    return run(afetch_profile_recent, handle, limit)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 from typing import Iterable, List
 from urllib.parse import quote
-from .common_fetch import _get, extract_visible_text, WebItem, rate_limit
+import xml.etree.ElementTree as ET
+from .common_fetch import extract_visible_text, WebItem
+from .fetch_engine import FetchEngine, run
 
 
 # Uses YouTube public RSS (stable, no auth)
@@ -11,21 +13,28 @@ RSS_TMPL = "https://www.youtube.com/feeds/videos.xml?channel_id={cid}"
 
 
 
+async def afetch_channel_recent(engine: FetchEngine, channel_id: str, limit: int = 10) -> List[WebItem]:
+    url = RSS_TMPL.format(cid=quote(channel_id))
+    r = await engine.get(url)
+    # Basic XML scrape without extra deps
+    # We extract <entry><link href>, <title>
+    root = ET.fromstring(r.text)
+    ns = {"a": "http://www.w3.org/2005/Atom"}
+    entries = []
+    for entry in root.findall("a:entry", ns)[:limit]:
+        link = entry.find("a:link", ns).attrib.get("href")
+        title = (entry.findtext("a:title", namespaces=ns) or "").strip()
+        entries.append((link, title))
+    # Watch pages for textual signals: fetched concurrently, the engine paces requests per host
+    pages = await engine.get_many(link for link, _ in entries)
+    items: List[WebItem] = []
+    for (link, title), page in zip(entries, pages):
+        if isinstance(page, BaseException):
+            items.append(WebItem("youtube", channel_id, link, title, None, extra={"error": repr(page)}))
+            continue
+        items.append(WebItem("youtube", channel_id, link, title, extract_visible_text(page.text), extra={}))
+    return items
+
+
 def fetch_channel_recent(channel_id: str, limit: int = 10) -> List[WebItem]:
-url = RSS_TMPL.format(cid=quote(channel_id))
-r = _get(url)
-# Basic XML scrape without extra deps
-# We extract <entry><link href>, <title>
-import xml.etree.ElementTree as ET
-root = ET.fromstring(r.text)
-ns = {"a": "http://www.w3.org/2005/Atom"}
-items: List[WebItem] = []
-for entry in root.findall("a:entry", ns)[:limit]:
-link = entry.find("a:link", ns).attrib.get("href")
-title = (entry.findtext("a:title", namespaces=ns) or "").strip()
-# Fetch the watch page for textual signals
-page = _get(link)
-text = extract_visible_text(page.text)
-items.append(WebItem("youtube", channel_id, link, title, text, extra={}))
-rate_limit(0.6)
-return items
\ No newline at end of file
+    return run(afetch_channel_recent, channel_id, limit)
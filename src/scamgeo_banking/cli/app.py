@@ -1,5 +1,6 @@
 ﻿from __future__ import annotations
 
+import asyncio
 import io
 import zipfile
 from pathlib import Path
@@ -101,6 +102,22 @@ def report(
     console.print(f"OK: raport → {pdf}")
 
 
+@cli.command("monitor", help="Tryb ciągły: nowe wiadomości z kanałów seedów (config.json) na żywo.")
+def monitor(
+    flush_secs: float | None = typer.Option(None, "--flush-secs", help="Zapis partii co N s (domyślnie scanner.yaml)"),
+    flush_every: int | None = typer.Option(None, "--flush-every", help="...albo po N wiadomościach"),
+    catchup: int | None = typer.Option(None, "--catchup", help="Partia nadrabiania po starcie (wiadomości na kanał)"),
+) -> None:
+    # Telethon ładowany dopiero tutaj — reszta CLI działa bez niego
+    from ..tele import monitor as tg_monitor
+
+    opts = {"flush_secs": flush_secs, "flush_every": flush_every, "catchup": catchup}
+    try:
+        asyncio.run(tg_monitor.main_async({k: v for k, v in opts.items() if v is not None}))
+    except KeyboardInterrupt:
+        console.print("Monitor zatrzymany.")
+
+
 def main() -> None:
     # alias do uruchamiania z -m
     cli()
@@ -1,6 +1,6 @@
-﻿@"
+import json, time
 from typing import Optional, Iterator
-from sqlmodel import SQLModel, Field, create_engine, Session, select, UniqueConstraint
+from sqlmodel import SQLModel, Field, create_engine, Session, select, delete, UniqueConstraint
 import os
 
 DEFAULT_DB_PATH = "scamgeo_banking.db"
@@ -39,6 +39,36 @@ class WhoisRecord(SQLModel, table=True):
     ts_utc: int = Field(index=True)
     raw_json: str
 
+class CountryState(SQLModel, table=True):
+    __tablename__ = "country_state"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str = Field(index=True, unique=True)   # @username / handle / ścieżka eksportu
+    ts_utc: int = Field(index=True)
+    state_json: str
+
+class CrawlNode(SQLModel, table=True):
+    # frontier + zbiór odwiedzonych crawlera grafu TG (tele/tg_crawl.py)
+    __tablename__ = "crawl_nodes"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    key: str = Field(index=True, unique=True)      # username (lowercase) albo "id:<peer_id>"
+    depth: int = Field(index=True)
+    priority: float = Field(index=True)            # ryzyko rodzica × waga krawędzi (seed = 100)
+    status: str = Field(default="queued", index=True)  # queued | done | user | failed
+    risk: Optional[int] = None                     # po odwiedzeniu: ryzyko samego kanału
+    peer_id: Optional[int] = None
+    access_hash: Optional[int] = None
+    title: Optional[str] = None
+    error: Optional[str] = None
+    ts_utc: int = Field(default=0, index=True)
+
+class CrawlEdge(SQLModel, table=True):
+    __tablename__ = "crawl_edges"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    src: str = Field(index=True)
+    dst: str = Field(index=True)
+    via: str                                       # linked_chat | about_mention | tg_link | text_mention
+    __table_args__ = (UniqueConstraint("src", "dst", "via", name="uq_crawl_edge"),)
+
 def init_db():
     engine = get_engine()
     SQLModel.metadata.create_all(engine)
@@ -59,8 +89,58 @@ def get_or_create_channel(s: Session, handle: str, platform: str = "telegram") -
     s.commit()
     s.refresh(ch)
     return ch
-"@ | Set-Content -Encoding utf8 .\src\scamgeo_banking\db.py
 
+def latest_snapshot(s: Session, channel_id: int) -> Optional[Snapshot]:
+    q = select(Snapshot).where(Snapshot.channel_id == channel_id).order_by(Snapshot.ts_utc.desc(), Snapshot.id.desc())
+    return s.exec(q).first()
+
+def load_channel_state(s: Session, handle: str, platform: str = "telegram") -> Optional[dict]:
+    """meta z ostatniego snapshotu kanału (np. last_msg_id + scalone IOC) albo None."""
+    ch = s.exec(select(Channel).where(Channel.handle == handle, Channel.platform == platform)).first()
+    snap = latest_snapshot(s, ch.id) if ch else None
+    return json.loads(snap.meta_json) if snap else None
+
+def save_channel_state(s: Session, handle: str, meta: dict, platform: str = "telegram") -> Snapshot:
+    """Upsert: jeden wiersz snapshots na kanał (nadpisuje ostatni, starsze kopie usuwa)."""
+    ch = get_or_create_channel(s, handle, platform)
+    ts, meta_json = int(time.time()), json.dumps(meta, ensure_ascii=False)
+    snap = latest_snapshot(s, ch.id)
+    if snap is None:
+        snap = Snapshot(channel_id=ch.id, ts_utc=ts, meta_json=meta_json)
+    else:
+        snap.ts_utc, snap.meta_json = ts, meta_json
+        s.exec(delete(Snapshot).where(Snapshot.channel_id == ch.id, Snapshot.id != snap.id))
+    s.add(snap)
+    s.commit()
+    s.refresh(snap)
+    return snap
+
+def load_country_state(s: Session, entity: str) -> Optional[CountryState]:
+    return s.exec(select(CountryState).where(CountryState.entity == entity)).first()
+
+def save_country_state(s: Session, entity: str, state_json: str, ts_utc: int) -> CountryState:
+    row = load_country_state(s, entity)
+    if row is None:
+        row = CountryState(entity=entity, ts_utc=ts_utc, state_json=state_json)
+    else:
+        row.ts_utc, row.state_json = ts_utc, state_json
+    s.add(row)
+    s.commit()
+    s.refresh(row)
+    return row
 
+def get_crawl_node(s: Session, key: str) -> Optional[CrawlNode]:
+    return s.exec(select(CrawlNode).where(CrawlNode.key == key)).first()
 
+def crawl_nodes(s: Session, status: Optional[str] = None) -> list[CrawlNode]:
+    q = select(CrawlNode)
+    if status:
+        q = q.where(CrawlNode.status == status)
+    return list(s.exec(q))
 
+def add_crawl_edge(s: Session, src: str, dst: str, via: str) -> bool:
+    """Dodaje krawędź (bez commita); False gdy już była."""
+    if s.exec(select(CrawlEdge).where(CrawlEdge.src == src, CrawlEdge.dst == dst, CrawlEdge.via == via)).first():
+        return False
+    s.add(CrawlEdge(src=src, dst=dst, via=via))
+    return True
@@ -1,22 +1,139 @@
-﻿import re, yaml, pathlib
+import hashlib, json, pathlib
+import yaml
+
+# Automat Aho-Corasick: wszystkie wzorce wszystkich brandów w jednym przejściu po tekście.
+# Format na dysku (JSON) pozwala nie budować automatu przy każdym starcie.
+_CACHE_VERSION = 1
+
 
 def load_brands(path:str):
-    y = yaml.safe_load(pathlib.Path(path).read_text(encoding='utf-8'))
+    y = yaml.safe_load(pathlib.Path(path).read_text(encoding='utf-8-sig'))
     brands=[]
     for b in y.get("brands", []):
-        pats = [re.escape(p.lower()) for p in b.get("patterns",[])]
+        # wzorce to zwykłe podciągi (bez re.escape) — dopasowanie robi automat
+        pats = [p.lower() for p in b.get("patterns",[]) if p]
         brands.append({"name":b["name"], "patterns":pats, "trusted": set(b.get("domains_trusted",[]))})
     return brands
 
-def match_brands(text:str, brands):
-    t = text.lower()
-    hits=[]
-    for b in brands:
-        for p in b["patterns"]:
-            if p in t:
-                hits.append(b["name"]); break
-    return list(dict.fromkeys(hits))
 
+class BrandMatcher:
+    """
+    Automat Aho-Corasick nad wzorcami brandów (małe litery, dopasowanie podciągów).
+    goto[s] — przejścia stanu s, fail[s] — link porażki, out[s] — indeksy brandów kończących się w s.
+    """
+
+    def __init__(self, names, goto, fail, out):
+        self.names = names
+        self.goto = goto
+        self.fail = fail
+        self.out = out
+
+    @classmethod
+    def from_brands(cls, brands) -> "BrandMatcher":
+        names = [b["name"] for b in brands]
+        goto = [{}]
+        out = [set()]
+        for bi, b in enumerate(brands):
+            for p in b["patterns"]:
+                s = 0
+                for ch in p:
+                    nxt = goto[s].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[s][ch] = nxt
+                        goto.append({})
+                        out.append(set())
+                    s = nxt
+                out[s].add(bi)
+        # BFS: linki porażki + scalanie wyjść po łańcuchu fail
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for s in queue:
+            for ch, nxt in goto[s].items():
+                queue.append(nxt)
+                f = fail[s]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                cand = goto[f].get(ch, 0)
+                fail[nxt] = cand if cand != nxt else 0
+                out[nxt] |= out[fail[nxt]]
+        return cls(names, goto, fail, [tuple(sorted(o)) for o in out])
+
+    def iter_hits(self, text: str):
+        """Zwraca (koniec_dopasowania, indeks_brandu) dla każdego trafienia."""
+        goto, fail, out = self.goto, self.fail, self.out
+        root = goto[0]
+        s = 0
+        for i, ch in enumerate(text.lower()):
+            if s == 0 and ch not in root:
+                continue
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            for bi in out[s]:
+                yield i + 1, bi
+
+    def match(self, text: str):
+        """Lista trafionych brandów w kolejności z pliku YAML (jak dawne match_brands)."""
+        if not text:
+            return []
+        seen = {}
+        for _, bi in self.iter_hits(text):
+            if bi not in seen:
+                seen[bi] = None
+                if len(seen) == len(self.names):
+                    break
+        return [self.names[bi] for bi in sorted(seen)]
 
+    def to_json(self, source_sha256: str = "") -> dict:
+        return {
+            "version": _CACHE_VERSION,
+            "source_sha256": source_sha256,
+            "names": self.names,
+            "goto": self.goto,
+            "fail": self.fail,
+            "out": self.out,
+        }
 
+    @classmethod
+    def from_json(cls, data: dict) -> "BrandMatcher":
+        return cls(data["names"], data["goto"], data["fail"], [tuple(o) for o in data["out"]])
 
+
+def load_matcher(path:str, cache_path:str|None=None) -> BrandMatcher:
+    """
+    Ładuje automat z cache (domyślnie <yaml>.ac.json obok pliku brandów).
+    Cache jest ważny, dopóki zgadza się sha256 pliku YAML; inaczej automat jest budowany i zapisywany.
+    """
+    src = pathlib.Path(path)
+    digest = hashlib.sha256(src.read_bytes()).hexdigest()
+    cache = pathlib.Path(cache_path) if cache_path else src.with_suffix(".ac.json")
+    if cache.exists():
+        try:
+            data = json.loads(cache.read_text(encoding="utf-8"))
+            if data.get("version") == _CACHE_VERSION and data.get("source_sha256") == digest:
+                return BrandMatcher.from_json(data)
+        except (ValueError, KeyError):
+            pass
+    matcher = BrandMatcher.from_brands(load_brands(path))
+    try:
+        cache.write_text(json.dumps(matcher.to_json(digest), ensure_ascii=False), encoding="utf-8")
+    except OSError:
+        pass
+    return matcher
+
+
+_MATCHER_CACHE = {}
+
+def _matcher_for(brands) -> BrandMatcher:
+    if isinstance(brands, BrandMatcher):
+        return brands
+    hit = _MATCHER_CACHE.get(id(brands))
+    if hit is None or hit[0] is not brands:
+        hit = (brands, BrandMatcher.from_brands(brands))
+        _MATCHER_CACHE.clear()  # zwykle jest jedna lista brandów na proces
+        _MATCHER_CACHE[id(brands)] = hit
+    return hit[1]
+
+def match_brands(text:str, brands):
+    return _matcher_for(brands).match(text)
@@ -1,36 +1,112 @@
-﻿import re
+import re
+
+# miękki import — ścieżka wsadowa działa też bez numpy (pętla w Pythonie)
+try:
+    import numpy as np
+except Exception:
+    np = None
 
 _IBAN_RE = re.compile(r'\b([A-Z]{2}\d{2}[A-Z0-9]{1,30})\b')
-_LENGTH = {"AT":20, "DE":22, "CH":21}
+
+# Rejestr IBAN (ISO 13616): kraj -> (długość IBAN, struktura BBAN w notacji SWIFT)
+# n = cyfry, a = wielkie litery, c = alfanumeryczne
+IBAN_REGISTRY = {
+    "AD": (24, "4n4n12c"),   "AE": (23, "3n16n"),      "AL": (28, "8n16c"),     "AT": (20, "5n11n"),
+    "AZ": (28, "4a20c"),     "BA": (20, "3n3n8n2n"),   "BE": (16, "3n7n2n"),    "BG": (22, "4a4n2n8c"),
+    "BH": (22, "4a14c"),     "BI": (27, "5n5n11n2n"),  "BR": (29, "8n5n10n1a1c"), "BY": (28, "4c4n16c"),
+    "CH": (21, "5n12c"),     "CR": (22, "4n14n"),      "CY": (28, "3n5n16c"),   "CZ": (24, "4n6n10n"),
+    "DE": (22, "8n10n"),     "DJ": (27, "5n5n11n2n"),  "DK": (18, "4n9n1n"),    "DO": (28, "4c20n"),
+    "EE": (20, "2n2n11n1n"), "EG": (29, "4n4n17n"),    "ES": (24, "4n4n1n1n10n"), "FI": (18, "3n11n"),
+    "FK": (18, "2a12n"),     "FO": (18, "4n9n1n"),     "FR": (27, "5n5n11c2n"), "GB": (22, "4a6n8n"),
+    "GE": (22, "2a16n"),     "GI": (23, "4a15c"),      "GL": (18, "4n9n1n"),    "GR": (27, "3n4n16c"),
+    "GT": (28, "4c20c"),     "HR": (21, "7n10n"),      "HU": (28, "3n4n1n15n1n"), "IE": (22, "4a6n8n"),
+    "IL": (23, "3n3n13n"),   "IQ": (23, "4a3n12n"),    "IS": (26, "4n2n6n10n"), "IT": (27, "1a5n5n12c"),
+    "JO": (30, "4a4n18c"),   "KW": (30, "4a22c"),      "KZ": (20, "3n13c"),     "LB": (28, "4n20c"),
+    "LC": (32, "4a24c"),     "LI": (21, "5n12c"),      "LT": (20, "5n11n"),     "LU": (20, "3n13c"),
+    "LV": (21, "4a13c"),     "LY": (25, "3n3n15n"),    "MC": (27, "5n5n11c2n"), "MD": (24, "2c18c"),
+    "ME": (22, "3n13n2n"),   "MK": (19, "3n10c2n"),    "MN": (20, "4n12n"),     "MR": (27, "5n5n11n2n"),
+    "MT": (31, "4a5n18c"),   "MU": (30, "4a2n2n12n3n3a"), "NI": (28, "4a20n"),  "NL": (18, "4a10n"),
+    "NO": (15, "4n6n1n"),    "OM": (23, "3n16c"),      "PK": (24, "4a16c"),     "PL": (28, "8n16n"),
+    "PS": (29, "4a21c"),     "PT": (25, "4n4n11n2n"),  "QA": (29, "4a21c"),     "RO": (24, "4a16c"),
+    "RS": (22, "3n13n2n"),   "RU": (33, "9n5n15c"),    "SA": (24, "2n18c"),     "SC": (31, "4a2n2n16n3a"),
+    "SD": (18, "2n12n"),     "SE": (24, "3n16n1n"),    "SI": (19, "5n8n2n"),    "SK": (24, "4n6n10n"),
+    "SM": (27, "1a5n5n12c"), "SO": (23, "4n3n12n"),    "ST": (25, "4n4n11n2n"), "SV": (28, "4a20n"),
+    "TL": (23, "3n14n2n"),   "TN": (24, "2n3n13n2n"),  "TR": (26, "5n1n16c"),   "UA": (29, "6n19c"),
+    "VA": (22, "3n15n"),     "VG": (24, "4a16n"),      "XK": (20, "4n10n2n"),
+}
+
+_SPEC_CLASS = {"n": "[0-9]", "a": "[A-Z]", "c": "[A-Z0-9]"}
+
+def _bban_regex(spec: str):
+    parts = re.findall(r'(\d+)([nac])', spec)
+    return re.compile("".join(f"{_SPEC_CLASS[k]}{{{n}}}" for n, k in parts) + r"\Z")
+
+_LENGTH = {cc: length for cc, (length, _) in IBAN_REGISTRY.items()}
+_BBAN = {cc: _bban_regex(spec) for cc, (_, spec) in IBAN_REGISTRY.items()}
+_MAX_LEN = max(_LENGTH.values())
+
+# wartość znaku w mod-97: cyfra -> (10, d), litera -> (100, 10..35) — litera to dwie cyfry
+_STEP = {c: (10, int(c)) for c in "0123456789"}
+_STEP.update({chr(o): (100, o - 55) for o in range(ord("A"), ord("Z") + 1)})
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9]')
 
 def _iban_clean(s:str)->str:
-    return re.sub(r'[^A-Z0-9]', '', s.upper())
+    u = s.upper()
+    # szybka ścieżka: kandydaci ze skanera są już zwartymi ciągami ASCII
+    if u.isalnum() and u.isascii():
+        return u
+    return _NON_ALNUM.sub('', u)
 
-def _mod97(numeric: str) -> int:
-    return int(numeric) % 97
+def _mod97(rearranged: str) -> int:
+    # reszta liczona przyrostowo znak po znaku — bez budowania długiego ciągu cyfr i int() na nim
+    r = 0
+    for c in rearranged:
+        mul, val = _STEP[c]
+        r = (r * mul + val) % 97
+    return r
 
-def _to_numeric(iban: str) -> str:
-    return ''.join(str(ord(c)-55) if c.isalpha() else c for c in iban)
+def _structure_ok(i: str) -> bool:
+    cc = i[:2]
+    if _LENGTH.get(cc) != len(i) or not i[2:4].isdigit():
+        return False
+    return _BBAN[cc].match(i, 4) is not None
 
 def validate_iban(iban: str) -> bool:
     i = _iban_clean(iban)
     if len(i) < 4: return False
-    cc = i[:2]
-    if cc not in _LENGTH or len(i) != _LENGTH[cc]: return False
-    rearr = i[4:] + i[:4]
-    return _mod97(_to_numeric(rearr)) == 1
-
-def find_ibans(text: str):
-    out=[]
-    for m in _IBAN_RE.finditer(text.upper()):
-        cand = m.group(1)
-        try:
-            if validate_iban(cand):
-                out.append(cand)
-        except Exception:
-            pass
-    return list(dict.fromkeys(out))
-
-
+    if not _structure_ok(i): return False
+    return _mod97(i[4:] + i[:4]) == 1
 
+def validate_ibans(ibans):
+    """
+    Wsadowa walidacja: długość + struktura BBAN per kraj, potem mod-97.
+    Z numpy mod-97 liczony jest kolumnowo (schemat Hornera) dla całej partii naraz.
+    Zwraca listę bool w kolejności wejścia.
+    """
+    cleaned = [_iban_clean(str(s)) for s in ibans]
+    ok = [len(i) >= 4 and _structure_ok(i) for i in cleaned]
+    idx = [k for k, good in enumerate(ok) if good]
+    if not idx:
+        return ok
+    rearr = [cleaned[k][4:] + cleaned[k][:4] for k in idx]
+    if np is None:
+        for k, s in zip(idx, rearr):
+            ok[k] = _mod97(s) == 1
+        return ok
+    # macierz N x _MAX_LEN (wyrównanie do prawej; wiodące "0" nie zmieniają reszty)
+    buf = np.frombuffer("".join(s.rjust(_MAX_LEN, "0") for s in rearr).encode("ascii"), dtype=np.uint8)
+    buf = buf.reshape(len(rearr), _MAX_LEN)
+    is_alpha = buf >= ord("A")
+    val = np.where(is_alpha, buf.astype(np.int64) - 55, buf.astype(np.int64) - 48)
+    mul = np.where(is_alpha, 100, 10)
+    r = np.zeros(len(rearr), dtype=np.int64)
+    for col in range(_MAX_LEN):
+        r = (r * mul[:, col] + val[:, col]) % 97
+    for k, good in zip(idx, (r == 1).tolist()):
+        ok[k] = good
+    return ok
 
+def find_ibans(text: str):
+    cands = list(dict.fromkeys(m.group(1) for m in _IBAN_RE.finditer(text.upper())))
+    return [c for c, good in zip(cands, validate_ibans(cands)) if good]
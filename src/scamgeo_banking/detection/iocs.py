@@ -0,0 +1,132 @@
+"""
+Jednoprzebiegowy skaner IOC.
+
+Wszystkie wzorce (URL, IBAN, BIC, BTC, ETH, TRC20, @handle TG, linki
+zaproszeń, WhatsApp) są skompilowane w jedną alternatywę z nazwanymi grupami,
+więc każdy tekst jest przechodzony raz. Tanie wstępne sito odrzuca wiadomości,
+w których żaden IOC nie może wystąpić.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+__all__ = ["IocSpan", "KINDS", "PATTERNS_TAG", "scan_iocs", "iter_iocs", "group_iocs"]
+
+KINDS = ("url", "iban", "bic", "btc", "eth", "trc20", "tg_handle", "tg_join", "whatsapp")
+
+_B58 = r"1-9A-HJ-NP-Za-km-z"
+
+# Kolejność alternatyw ma znaczenie: dłuższe / bardziej specyficzne formy
+# (URL, link t.me bez schematu) muszą wygrać z fragmentami, które zawierają.
+_COMBINED = re.compile(
+    r"(?P<url>https?://[^\s<>\"\)\]]+)"
+    r"|(?<![\w./])(?:t|telegram)\.me/(?:(?P<tg_join>joinchat/[\w-]+|\+[\w-]{10,})|(?P<tg_link>[A-Za-z0-9_]{5,32}))"
+    r"|(?<![\w./])wa\.me/(?P<wa_link>\d{6,15})"
+    r"|(?i:whatsapp)\s*[:=]\s*(?P<wa_num>\+?\d[\d ]{5,18}\d)"
+    r"|(?<![\w@])@(?P<tg_handle>[A-Za-z0-9_]{5,32})\b"
+    r"|\b(?P<eth>0x[a-fA-F0-9]{40})\b"
+    r"|\b(?P<btc>bc1[a-z0-9]{25,59}|[13][" + _B58 + r"]{25,34})\b"
+    r"|\b(?P<trc20>T[" + _B58 + r"]{33})\b"
+    r"|\b(?P<iban>[A-Z]{2}\d{2}[A-Z0-9]{11,30})\b"
+    r"|\b(?P<bic>[A-Z]{6}[A-Z0-9]{2}(?:[A-Z0-9]{3})?)\b"
+)
+
+# Wstępne sito: w praktyce każdy IOC zawiera cyfrę, "@", "://", ".me/" albo
+# ciąg co najmniej 6 wielkich liter (BIC). Pojedyncze search() z klasą znaków jest
+# znacznie tańsze niż pełne finditer() z dziesięcioma alternatywami.
+_PREFILTER = re.compile(r"[0-9@]|://|\.me/|[A-Z]{6}")
+
+# IOC płatnicze wewnątrz URL-a (etherscan.io/address/0x..., ?iban=DE...) — alternatywa
+# "url" pochłania cały link, więc jego treść skanujemy osobno tymi grupami
+_IN_URL = re.compile(
+    r"\b(?P<eth>0x[a-fA-F0-9]{40})\b"
+    r"|\b(?P<btc>bc1[a-z0-9]{25,59}|[13][" + _B58 + r"]{25,34})\b"
+    r"|\b(?P<trc20>T[" + _B58 + r"]{33})\b"
+    r"|\b(?P<iban>[A-Z]{2}\d{2}[A-Z0-9]{11,30})\b"
+)
+
+# pod-klasyfikacja URL-i, które są jednocześnie linkami TG/WhatsApp
+_URL_TG = re.compile(r"^https?://(?:www\.)?(?:t|telegram)\.me/(?:(joinchat/[\w-]+|\+[\w-]{10,})|([A-Za-z0-9_]{5,32}))", re.I)
+_URL_WA = re.compile(r"^https?://(?:wa\.me/|api\.whatsapp\.com/send\?phone=)(\d{6,15})", re.I)
+
+# odcisk wzorców — unieważnia zapisane na dysku cache ekstrakcji po zmianie skanera
+PATTERNS_TAG = hashlib.sha256(
+    "\n".join(rx.pattern for rx in (_COMBINED, _PREFILTER, _IN_URL, _URL_TG, _URL_WA)).encode()
+).hexdigest()[:16]
+
+_GROUP_KIND = {
+    "url": "url", "tg_join": "tg_join", "tg_link": "tg_handle", "wa_link": "whatsapp",
+    "wa_num": "whatsapp", "tg_handle": "tg_handle", "eth": "eth", "btc": "btc",
+    "trc20": "trc20", "iban": "iban", "bic": "bic",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class IocSpan:
+    kind: str       # jedno z KINDS
+    value: str      # znormalizowana wartość (handle bez "@", numer bez spacji, "t.me/+kod")
+    start: int      # pozycja w tekście źródłowym
+    end: int
+
+
+def _url_children(value: str, start: int, end: int) -> List[IocSpan]:
+    out = [IocSpan(m.lastgroup, m.group(m.lastgroup), start + m.start(), start + m.end())
+           for m in _IN_URL.finditer(value)]
+    if ".me/" not in value and "whatsapp" not in value.lower():
+        return out
+    m = _URL_TG.match(value)
+    if m:
+        if m.group(1):
+            return [IocSpan("tg_join", "t.me/" + m.group(1), start, end)] + out
+        return [IocSpan("tg_handle", m.group(2), start, end)] + out
+    m = _URL_WA.match(value)
+    if m:
+        return [IocSpan("whatsapp", m.group(1), start, end)] + out
+    return out
+
+
+def scan_iocs(text: str | None) -> List[IocSpan]:
+    """Zwraca wszystkie IOC z tekstu (w kolejności wystąpienia) w jednym przebiegu."""
+    if not text or not _PREFILTER.search(text):
+        return []
+    out: List[IocSpan] = []
+    for m in _COMBINED.finditer(text):
+        group = m.lastgroup
+        value = m.group(group)
+        start, end = m.span(group)
+        kind = _GROUP_KIND[group]
+        if group == "wa_num":
+            value = value.replace(" ", "")
+        elif group == "tg_join":
+            value = "t.me/" + value
+        out.append(IocSpan(kind, value, start, end))
+        if kind == "url":
+            out.extend(_url_children(value, start, end))
+    return out
+
+
+def iter_iocs(texts: Iterable[str | None]) -> Iterator[Tuple[int, List[IocSpan]]]:
+    """
+    Strumieniowo skanuje teksty; zwraca (indeks, spans) tylko dla tekstów z trafieniami.
+    Nie materializuje wejścia, więc nadaje się do iter_messages() / dużych eksportów.
+    """
+    for i, text in enumerate(texts):
+        spans = scan_iocs(text)
+        if spans:
+            yield i, spans
+
+
+def group_iocs(spans: Iterable[IocSpan]) -> Dict[str, List[str]]:
+    """Grupuje spans po typie (z zachowaniem kolejności, bez duplikatów)."""
+    out: Dict[str, List[str]] = {k: [] for k in KINDS}
+    seen = set()
+    for s in spans:
+        key = (s.kind, s.value)
+        if key in seen:
+            continue
+        seen.add(key)
+        out[s.kind].append(s.value)
+    return out
@@ -0,0 +1,264 @@
+"""
+Warstwa identyfikacji języka dla wnioskowania o kraju.
+
+- cache po hashu znormalizowanej treści (powtórki spamu liczone raz),
+- próg minimalnej długości (krótkie "ok", "+", emoji nic nie mówią o języku),
+- limit próbek na autora,
+- tryb wsadowy na puli procesów,
+- wymienne backendy: "langdetect" (domyślny, oryginalny algorytm) i "ngram"
+  (opt-in: SCAMGEO_LANGID_BACKEND=ngram albo backend="ngram") — ten sam
+  profil n-gramów langdetect, ale jednoprzebiegowy naiwny Bayes zamiast 7 prób
+  po ≤1000 losowań. Oba respektują DetectorFactory.seed: "ngram" losuje
+  podzbiór n-gramów (tylko dla długich tekstów) generatorem z tym ziarnem.
+"""
+from __future__ import annotations
+
+import math
+import os
+import random
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from langdetect import DetectorFactory, LangDetectException, detect
+from langdetect import detector_factory as _df
+from langdetect.detector import Detector
+from langdetect.utils.ngram import NGram
+from langdetect.utils.unicode_block import unicode_block as _unicode_block
+
+from .textcache import TextCache, content_key
+
+# miękki import — backend "ngram" działa też bez numpy (sumowanie w Pythonie)
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+__all__ = [
+    "MIN_CHARS", "DEFAULT_BACKEND", "register_backend", "detect_language",
+    "detect_languages", "sample_per_author", "cache_stats",
+]
+
+MIN_CHARS = 12              # mniej liter niż tyle -> brak decyzji (None)
+MAX_NGRAMS = 600            # dłuższe teksty: losowa próbka n-gramów (ziarno z DetectorFactory.seed)
+POOL_MIN_BATCH = 5000       # poniżej tego pula procesów się nie opłaca
+DEFAULT_BACKEND = os.environ.get("SCAMGEO_LANGID_BACKEND", "langdetect")
+
+_BACKENDS: Dict[str, Callable[[str], Optional[str]]] = {}
+_NORM: Dict[str, str] = {}          # znak -> NGram.normalize(znak)
+_BLOCKS: Dict[str, Any] = {}
+_WS_RUN = re.compile(r"  +")
+_CACHE = TextCache(maxsize=200_000)
+
+
+def register_backend(name: str, fn: Callable[[str], Optional[str]]) -> None:
+    """Rejestruje backend: funkcja tekst -> kod języka (ISO 639-1) albo None."""
+    _BACKENDS[name] = fn
+
+
+def _langdetect_backend(text: str) -> Optional[str]:
+    try:
+        return detect(text)
+    except LangDetectException:
+        return None
+
+
+class _NgramModel:
+    """Profile langdetect jako macierz log-prawdopodobieństw; wiersze dokładane leniwie per n-gram."""
+
+    def __init__(self):
+        _df.init_factory()
+        self.factory = _df._factory
+        self.langs = self.factory.get_lang_list()
+        self.probs = self.factory.word_lang_prob_map
+        self.smooth = 0.5 / 10000   # alpha / BASE_FREQ jak w Detector
+        self.index: Dict[str, int] = {}
+        self.mat = np.empty((4096, len(self.langs))) if np is not None else []
+
+    def _row(self, gram: str) -> int:
+        i = self.index.get(gram)
+        if i is None:
+            i = self.index[gram] = len(self.index)
+            vals = [math.log(p + self.smooth) for p in self.probs[gram]]
+            if np is not None:
+                if i >= len(self.mat):
+                    self.mat = np.concatenate([self.mat, np.empty_like(self.mat)])
+                self.mat[i] = vals
+            else:
+                self.mat.append(vals)
+        return i
+
+    def ngrams(self, text: str) -> List[str]:
+        """
+        Czyszczenie i ekstrakcja n-gramów jak Detector.append/cleaning_text/_extract_ngrams
+        w langdetect, ale z normalizacją znaków zapamiętaną per znak.
+        """
+        text = Detector.URL_RE.sub(" ", text)
+        text = Detector.MAIL_RE.sub(" ", text)
+        text = _WS_RUN.sub(" ", NGram.normalize_vi(text)[:10000])
+        latin = non_latin = 0
+        for ch in text:
+            if "A" <= ch <= "z":
+                latin += 1
+            elif ch >= "\u0300" and _block(ch) != "Latin Extended Additional":
+                non_latin += 1
+        if latin * 2 < non_latin:
+            text = "".join(ch for ch in text if ch < "A" or "z" < ch)
+
+        norm, probs = _NORM, self.probs
+        out: List[str] = []
+        grams, capital = " ", False
+        for ch in text:
+            n = norm.get(ch)
+            if n is None:
+                n = norm[ch] = NGram.normalize(ch)
+            last = grams[-1]
+            if last == " ":
+                grams, capital = " ", False
+                if n == " ":
+                    continue
+            elif len(grams) >= 3:
+                grams = grams[1:]
+            grams += n
+            if n.isupper():
+                if last.isupper():
+                    capital = True
+            else:
+                capital = False
+            if capital:
+                continue
+            if n != " " and n in probs:
+                out.append(n)
+            if len(grams) >= 2:
+                w = grams[-2:]
+                if w in probs:
+                    out.append(w)
+                if len(grams) >= 3:
+                    w = grams
+                    if w in probs:
+                        out.append(w)
+        return out
+
+    def detect(self, text: str) -> Optional[str]:
+        grams = self.ngrams(text)
+        if not grams:
+            return None
+        if len(grams) > MAX_NGRAMS:
+            grams = random.Random(DetectorFactory.seed).sample(grams, MAX_NGRAMS)
+        counts = Counter(grams)
+        rows = [self._row(g) for g in counts]
+        if np is not None:
+            total = np.fromiter(counts.values(), dtype=float, count=len(rows)) @ self.mat[rows]
+            return self.langs[int(np.argmax(total))]
+        total = [0.0] * len(self.langs)
+        for r, c in zip(rows, counts.values()):
+            for i, v in enumerate(self.mat[r]):
+                total[i] += c * v
+        return self.langs[max(range(len(total)), key=total.__getitem__)]
+
+
+_MODEL: Optional[_NgramModel] = None
+
+
+def _block(ch: str):
+    b = _BLOCKS.get(ch)
+    if b is None:
+        b = _BLOCKS[ch] = _unicode_block(ch)
+    return b
+
+
+def _ngram_backend(text: str) -> Optional[str]:
+    global _MODEL
+    if _MODEL is None:
+        _MODEL = _NgramModel()
+    return _MODEL.detect(text)
+
+
+register_backend("langdetect", _langdetect_backend)
+register_backend("ngram", _ngram_backend)
+
+
+def _letters(text: str) -> int:
+    return sum(1 for c in text if c.isalpha())
+
+
+def _run(text: str, backend: str) -> Optional[str]:
+    if _letters(text) < MIN_CHARS:
+        return None
+    return _BACKENDS[backend](text)
+
+
+def _worker_init(seed, backend: str) -> None:
+    DetectorFactory.seed = seed
+    if backend == "ngram":
+        _ngram_backend("warm up")
+
+
+def _run_chunk(args) -> List[Optional[str]]:
+    texts, backend = args
+    return [_run(t, backend) for t in texts]
+
+
+def detect_language(text: str, backend: Optional[str] = None) -> Optional[str]:
+    """Kod języka albo None (za krótki tekst / brak cech). Wynik z cache, jeśli był."""
+    return detect_languages([text], backend=backend)[0]
+
+
+def detect_languages(
+    texts: Sequence[str],
+    backend: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> List[Optional[str]]:
+    """
+    Języki dla listy tekstów (w kolejności wejścia). Każda unikalna treść
+    (po normalizacji) jest wykrywana raz; przy dużych partiach i workers != 1
+    nowe treści idą do puli procesów (workers=None -> os.cpu_count()).
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in _BACKENDS:
+        raise ValueError(f"nieznany backend języka: {backend}")
+    keys = [f"{backend}:{content_key(t or '')[0]}" for t in texts]
+    results: Dict[str, str] = {}
+    todo: Dict[str, str] = {}
+    for k, t in zip(keys, texts):
+        if k in results or k in todo:
+            continue
+        hit = _CACHE.get(k)
+        if hit is None:
+            todo[k] = t or ""
+        else:
+            results[k] = hit
+    if todo:
+        pending = list(todo.items())
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+        if workers > 1 and len(pending) >= POOL_MIN_BATCH:
+            size = max(200, len(pending) // (workers * 4))
+            chunks = [[t for _, t in pending[i:i + size]] for i in range(0, len(pending), size)]
+            with ProcessPoolExecutor(workers, initializer=_worker_init, initargs=(DetectorFactory.seed, backend)) as ex:
+                found = [lang for part in ex.map(_run_chunk, [(c, backend) for c in chunks]) for lang in part]
+        else:
+            found = [_run(t, backend) for _, t in pending]
+        for (k, _), lang in zip(pending, found):
+            results[k] = lang or ""     # "" = brak decyzji (None nie jest trzymany w cache)
+            _CACHE.put(k, results[k])
+    return [results[k] or None for k in keys]
+
+
+def sample_per_author(records: Iterable[Dict[str, Any]], cap: int = 200, key: str = "author") -> List[Dict[str, Any]]:
+    """Najwyżej `cap` rekordów na autora (kolejność zachowana); rekordy bez autora bez limitu."""
+    seen: Dict[Any, int] = {}
+    out = []
+    for r in records:
+        a = r.get(key)
+        if a:
+            n = seen.get(a, 0)
+            if n >= cap:
+                continue
+            seen[a] = n + 1
+        out.append(r)
+    return out
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _CACHE.stats()
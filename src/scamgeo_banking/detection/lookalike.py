@@ -0,0 +1,239 @@
+"""
+Indeks domen-sobowtórów (typosquat / homoglify) względem zaufanych domen banków.
+
+Trzy sygnały, każdy w czasie niezależnym od liczby zaufanych domen:
+- szkielet (skeleton): homoglify, cyrylica, IDN/punycode i diakrytyki sprowadzone
+  do wspólnej postaci — "raiffe1sen" i "raiffeisen" mają ten sam szkielet,
+- sąsiedztwo usunięć (jak w SymSpell): literówki w odległości edycyjnej ≤ 2
+  (≤ 1 od 7 znaków szkieletu, krótsze tylko dokładnie),
+- zawieranie tokenu brandu ("erste-bonus-secure.com") — automat z detection/brand.
+
+Ta sama etykieta pod inną TLD ("raiffeisen.top" zamiast "raiffeisen.at") to osobny
+powód "tld_swap" — tylko dla charakterystycznych nazw (≥ _BRAND_TOKEN_MIN znaków)
+należących do jednego brandu. Trafienie w subdomenie cudzej domeny
+("raiffeisen.at.evil.com") to "subdomain".
+"""
+from __future__ import annotations
+
+import logging
+import pathlib
+import unicodedata
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from .brand import BrandMatcher, load_brands
+
+__all__ = ["LookalikeHit", "LookalikeIndex", "skeleton", "load_index", "DEFAULT_BRANDS_YAML"]
+
+DEFAULT_BRANDS_YAML = "configs/brands_bank_edition.yaml"
+_REPO_ROOT = pathlib.Path(__file__).resolve().parents[3]   # src/scamgeo_banking/detection -> repo
+
+log = logging.getLogger(__name__)
+
+# klasy mylonych znaków -> reprezentant (stosowane po obu stronach porównania)
+_CONFUSABLE = str.maketrans({
+    "0": "o", "1": "l", "i": "l", "|": "l", "!": "l", "3": "e", "4": "a", "5": "s",
+    "7": "t", "8": "b", "9": "g", "6": "b", "$": "s", "@": "a",
+    # cyrylica / greka podobne do łacinki
+    "а": "a", "е": "e", "о": "o", "р": "p", "с": "c", "у": "y", "х": "x", "і": "l",
+    "ї": "l", "ѕ": "s", "ј": "j", "ԁ": "d", "ɡ": "g", "һ": "h", "к": "k", "м": "m",
+    "т": "t", "в": "b", "н": "h", "ο": "o", "α": "a", "ε": "e", "ι": "l", "ν": "v",
+    "κ": "k", "ρ": "p", "τ": "t", "υ": "u", "χ": "x",
+})
+_MULTI = (("rn", "m"), ("vv", "w"), ("cl", "d"), ("nn", "m"))
+_TRUSTED_TOKEN_MIN = 4   # krótsze etykiety zaufane nie są indeksowane pod literówki
+_BRAND_TOKEN_MIN = 5     # krótsze wzorce brandów ("rbi") dają za dużo fałszywych trafień
+_TYPO_MIN = 7            # krótsze szkielety: tylko dokładne trafienie ("georg" to nie "george")
+# drugi poziom sufiksów dwuczłonowych (raiffeisen.co.at, bank.com.pl) — bez pełnej listy PSL
+_SECOND_LEVEL = {"co", "com", "net", "org", "or", "gv", "ac", "gov", "edu"}
+
+
+def _idna(label: str) -> str:
+    if label.startswith("xn--"):
+        try:
+            return label.encode("ascii").decode("idna")
+        except UnicodeError:
+            return label
+    return label
+
+
+def skeleton(s: str) -> str:
+    """Kanoniczna postać etykiety/nazwy: IDN, diakrytyki, homoglify, bez '-' i '_'."""
+    s = _idna(s.lower())
+    s = "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
+    s = s.translate(_CONFUSABLE)
+    for a, b in _MULTI:
+        s = s.replace(a, b)
+    return s.replace("-", "").replace("_", "")
+
+
+def _max_dist(n: int) -> int:
+    return 2 if n >= 8 else (1 if n >= _TYPO_MIN else 0)
+
+
+def _deletes(s: str, d: int):
+    yield s
+    for k in range(1, min(d, len(s) - 1) + 1):
+        for idx in combinations(range(len(s)), k):
+            yield "".join(c for i, c in enumerate(s) if i not in idx)
+
+
+def _osa(a: str, b: str, cap: int) -> int:
+    """Odległość Damerau (OSA) z wczesnym przerwaniem po przekroczeniu cap."""
+    if abs(len(a) - len(b)) > cap:
+        return cap + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+        if min(cur) > cap:
+            return cap + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+@dataclass(frozen=True)
+class LookalikeHit:
+    brand: str
+    trusted_domain: str
+    reason: str         # "homoglyph" | "tld_swap" | "typo" | "subdomain" | "brand_token"
+    distance: int       # odległość edycyjna szkieletów (0 dla homoglifu / tokenu)
+    token: str          # etykieta domeny, która wywołała trafienie
+
+
+class LookalikeIndex:
+    def __init__(self, brands):
+        self.trusted: Dict[str, str] = {}                 # domena zaufana -> brand
+        self._exact: Dict[str, List[Tuple[str, str]]] = {}    # szkielet -> [(brand, domena)]
+        self._dels: Dict[str, set] = {}                   # usunięcie -> {szkielet}
+        self._lengths: set = set()                        # długości zaindeksowanych szkieletów
+        self._label_brands: Dict[str, set] = {}           # etykieta / wzorzec -> brandy, które go używają
+        for b in brands:
+            for p in b.get("patterns") or ():
+                self._label_brands.setdefault(p.lower(), set()).add(b["name"])
+            for dom in b.get("trusted") or ():
+                dom = dom.lower()
+                self.trusted[dom] = b["name"]
+                label = dom.split(".")[0]
+                self._label_brands.setdefault(label, set()).add(b["name"])
+                sk = skeleton(label)
+                if len(sk) < _TRUSTED_TOKEN_MIN:
+                    continue
+                self._exact.setdefault(sk, []).append((b["name"], dom))
+                self._lengths.add(len(sk))
+                for d in _deletes(sk, _max_dist(len(sk))):
+                    self._dels.setdefault(d, set()).add(sk)
+        tokens = [
+            {"name": b["name"], "patterns": [skeleton(p) for p in b["patterns"] if len(p) >= _BRAND_TOKEN_MIN]}
+            for b in brands
+        ]
+        self._tokens = BrandMatcher.from_brands(tokens)
+        self._brand_domain = {b["name"]: sorted(b.get("trusted") or [""])[0] for b in brands}
+
+    def is_trusted(self, host: str) -> bool:
+        host = host.lower().rstrip(".")
+        return any(host == t or host.endswith("." + t) for t in self._suffixes(host))
+
+    def _suffixes(self, host: str):
+        parts = host.split(".")
+        for k in range(len(parts) - 1):
+            cand = ".".join(parts[k:])
+            if cand in self.trusted:
+                yield cand
+
+    def match(self, domain: str) -> Optional[LookalikeHit]:
+        """Który zaufany brand imituje domena? None dla domen zaufanych i niepodobnych."""
+        host = (domain or "").lower().strip().rstrip(".")
+        if "://" in host:
+            host = host.split("://", 1)[1]
+        host = host.split("/", 1)[0].split(":", 1)[0]
+        if not host or self.is_trusted(host):
+            return None
+        parts = host.split(".")
+        # etykieta rejestrowalna = ostatnia przed sufiksem (TLD albo np. "co.at"); wcześniejsze to subdomeny
+        n_suffix = 2 if len(parts) > 2 and parts[-2] in _SECOND_LEVEL else min(1, len(parts) - 1)
+        labels, suffix = parts[:len(parts) - n_suffix], ".".join(parts[len(parts) - n_suffix:])
+        if labels and labels[0] == "www":
+            labels = labels[1:]
+        best: Optional[LookalikeHit] = None
+        for i, label in enumerate(labels):
+            for tok in dict.fromkeys([label] + label.split("-")):
+                hit = self._match_token(tok, suffix if i == len(labels) - 1 else None)
+                if hit and (best is None or hit.distance < best.distance):
+                    best = hit
+                    if hit.distance == 0:
+                        return best
+        if best:
+            return best
+        shared = self._label_brands.get(_idna(labels[-1])) if labels else None
+        if shared and len(shared) > 1:
+            return None   # sama nazwa wspólna kilku brandów — nie wiadomo, który jest imitowany
+        names = self._tokens.match(skeleton(".".join(labels)))
+        if names:
+            return LookalikeHit(names[0], self._brand_domain.get(names[0], ""), "brand_token", 0, host)
+        return None
+
+    def _match_token(self, tok: str, suffix: Optional[str] = None) -> Optional[LookalikeHit]:
+        """suffix: sufiks domeny, gdy tok pochodzi z etykiety rejestrowalnej; None — z subdomeny."""
+        sk = skeleton(tok)
+        if len(sk) < _TRUSTED_TOKEN_MIN:
+            return None
+        exact = self._exact.get(sk)
+        if exact:
+            raw = _idna(tok.lower())
+            same = [(b, d) for b, d in exact if d.split(".")[0] == raw]
+            if not same:
+                brand, dom = exact[0]
+                hit = LookalikeHit(brand, dom, "homoglyph", 0, tok)
+                return hit if suffix is not None else replace(hit, reason="subdomain")
+            # dosłownie ta sama etykieta: tylko charakterystyczna nazwa jednego brandu
+            brands = self._label_brands.get(raw, ())
+            if len(raw) < _BRAND_TOKEN_MIN or len(brands) != 1:
+                return None
+            brand, dom = same[0]
+            if suffix is None:
+                return LookalikeHit(brand, dom, "subdomain", 0, tok)
+            if self.trusted.get(f"{raw}.{suffix}") == brand:
+                return None
+            return LookalikeHit(brand, dom, "tld_swap", 0, tok)
+        cap = _max_dist(len(sk))
+        if not any(abs(len(sk) - n) <= cap for n in self._lengths):
+            return None  # żaden szkielet nie jest w zasięgu — bez generowania usunięć
+        cands = set()
+        for d in _deletes(sk, cap):
+            cands |= self._dels.get(d, set())
+        best = None
+        for c in cands:
+            dist = _osa(sk, c, cap)
+            if dist <= min(cap, _max_dist(len(c))) and (best is None or dist < best[0]):
+                best = (dist, c)
+        if best is None:
+            return None
+        brand, dom = self._exact[best[1]][0]
+        return LookalikeHit(brand, dom, "typo" if suffix is not None else "subdomain", best[0], tok)
+
+
+def load_index(path: str = DEFAULT_BRANDS_YAML) -> LookalikeIndex:
+    """
+    Indeks z pliku brandów. Ścieżka względna: z katalogu bieżącego, a gdy tam jej
+    nie ma — względem repozytorium. Brak pliku -> pusty indeks (z ostrzeżeniem w logu).
+    """
+    p = pathlib.Path(path)
+    if not p.is_absolute() and not p.exists():
+        p = _REPO_ROOT / p
+    return _load_index(str(p.resolve()))
+
+
+@lru_cache(maxsize=4)
+def _load_index(path: str) -> LookalikeIndex:
+    if not pathlib.Path(path).exists():
+        log.warning("lookalike: brak pliku brandów %s — pusty indeks, domeny nie będą oznaczane", path)
+        return LookalikeIndex([])
+    return LookalikeIndex(load_brands(path))
@@ -0,0 +1,160 @@
+"""
+Czasy odpowiedzi dla każdej pary autorów w rozmowie.
+
+Odpowiedź B na wiadomość A = pierwsza wiadomość B w chwili tej wiadomości lub
+później. Daty są zamieniane na sekundy raz i grupowane w posortowane tablice
+per autor; dla pary (A, B) odpowiedzi to jedno wyszukiwanie binarne czasów A
+w czasach B (numpy.searchsorted, bez numpy bisect). Pary są brane tylko wtedy,
+gdy B choć raz pisze bezpośrednio po A — w dużych grupach to pomija k² par,
+które nigdy ze sobą nie rozmawiają.
+
+Wynik pary (A, B): n, średnia, mediana, percentyle, histogram opóźnień oraz
+histogram godzin UTC odpowiedzi B — wejście dla detection/tzinfer.
+"""
+from __future__ import annotations
+
+import bisect
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from .tzinfer import infer_offsets
+
+# miękki import — bez numpy te same wyniki z bisect w Pythonie
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+__all__ = [
+    "MAX_GAP", "PERCENTILES", "HIST_EDGES", "epoch", "percentile",
+    "reply_latencies", "summarize", "reply_report",
+]
+
+MAX_GAP = 24 * 3600   # dłuższa przerwa to nowa rozmowa, nie odpowiedź
+PERCENTILES = (10, 25, 50, 75, 90, 95)
+# granice przedziałów histogramu w sekundach: [0,10), [10,30), ..., [86400, ∞)
+HIST_EDGES = (0, 10, 30, 60, 120, 300, 600, 1800, 3600, 7200, 21600, 43200, 86400)
+
+
+def epoch(d: Any) -> Optional[float]:
+    """datetime / ISO-8601 -> sekundy epoki (data bez strefy traktowana jako UTC)."""
+    if isinstance(d, str):
+        try:
+            d = datetime.fromisoformat(d.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(d, datetime):
+        return None
+    if d.tzinfo is None:
+        d = d.replace(tzinfo=timezone.utc)
+    return d.timestamp()
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Percentyl q (0..100) posortowanej listy, interpolacja liniowa (jak numpy domyślnie)."""
+    if not len(values):
+        return None
+    k = (len(values) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return float(values[lo] + (values[hi] - values[lo]) * (k - lo))
+
+
+def _pair(a_ts, b_ts, max_gap):
+    """(opóźnienia, godziny UTC odpowiedzi B) dla posortowanych czasów A i B."""
+    if np is not None:
+        idx = np.searchsorted(b_ts, a_ts, side="left")
+        ok = idx < len(b_ts)
+        lat = b_ts[idx[ok]] - a_ts[ok]
+        idx = idx[ok]
+        if max_gap is not None:
+            keep = lat <= max_gap
+            lat, idx = lat[keep], idx[keep]
+        # idx niemalejące (czasy A posortowane): unikalne = różne od poprzedniego
+        first = idx[np.concatenate(([True], idx[1:] != idx[:-1]))] if len(idx) else idx
+        hours = np.bincount((b_ts[first] // 3600 % 24).astype(np.int64), minlength=24)
+        return lat, [int(h) for h in hours]
+    lat, used = [], set()
+    for t in a_ts:
+        i = bisect.bisect_left(b_ts, t)
+        if i < len(b_ts) and (max_gap is None or b_ts[i] - t <= max_gap):
+            lat.append(b_ts[i] - t)
+            used.add(i)
+    hours = [0] * 24
+    for i in used:
+        hours[int(b_ts[i] // 3600 % 24)] += 1
+    return lat, hours
+
+
+def reply_latencies(
+    messages: Iterable[Tuple[Hashable, Any]],
+    max_gap: Optional[float] = MAX_GAP,
+) -> Dict[Tuple[Hashable, Hashable], Dict[str, Any]]:
+    """
+    messages: (autor, data) w dowolnej kolejności. Zwraca
+    {(A, B): {"latencies": sekundy (ndarray albo lista), "hours": [24]}} — opóźnienia odpowiedzi B na
+    wiadomości A (w kolejności wiadomości A) i godziny UTC tych odpowiedzi.
+    max_gap=None: bez limitu.
+    """
+    # sort stabilny po samym czasie: remisy zostają w kolejności wejścia
+    rows = sorted(((t, a) for a, d in messages if a is not None and (t := epoch(d)) is not None), key=lambda r: r[0])
+    by_author: Dict[Hashable, List[float]] = defaultdict(list)
+    pairs = {}
+    prev = None
+    for t, a in rows:
+        by_author[a].append(t)
+        if prev is not None and prev != a:
+            pairs[(prev, a)] = None   # B pisze bezpośrednio po A: para rozmawia
+        prev = a
+    if np is not None:
+        by_author = {a: np.asarray(ts, dtype=np.float64) for a, ts in by_author.items()}
+    out = {}
+    for a, b in pairs:
+        lat, hours = _pair(by_author[a], by_author[b], max_gap)
+        out[(a, b)] = {"latencies": lat, "hours": hours}
+    return out
+
+
+def summarize(
+    latencies: Iterable[float],
+    percentiles: Sequence[int] = PERCENTILES,
+    edges: Sequence[float] = HIST_EDGES,
+) -> Dict[str, Any]:
+    """n, średnia, mediana, percentyle i histogram (przedziały od `edges`) opóźnień w sekundach."""
+    if np is not None:
+        vals = np.sort(np.asarray(latencies, dtype=np.float64))
+        hist = np.bincount(np.maximum(np.searchsorted(edges, vals, side="right") - 1, 0), minlength=len(edges))
+        hist = [int(c) for c in hist]
+        mean = float(vals.mean()) if len(vals) else None
+    else:
+        vals = sorted(latencies)
+        hist = [0] * len(edges)
+        for v in vals:
+            hist[max(bisect.bisect_right(edges, v) - 1, 0)] += 1
+        mean = sum(vals) / len(vals) if vals else None
+    return {
+        "n": len(vals),
+        "mean": mean,
+        "median": percentile(vals, 50),
+        "percentiles": {f"p{q}": percentile(vals, q) for q in percentiles},
+        "histogram": [{"from": lo, "count": c} for lo, c in zip(edges, hist)],
+    }
+
+
+def reply_report(
+    messages: Iterable[Tuple[Hashable, Any]],
+    max_gap: Optional[float] = MAX_GAP,
+    min_replies: int = 1,
+) -> List[Dict[str, Any]]:
+    """
+    Statystyki każdej pary (author A, responder B) z co najmniej min_replies odpowiedziami,
+    z offsetem UTC odpowiadającego wyliczonym z godzin odpowiedzi; malejąco po n.
+    """
+    pairs = [(k, v) for k, v in reply_latencies(messages, max_gap).items() if len(v["latencies"]) >= min_replies]
+    offsets = infer_offsets([v["hours"] for _, v in pairs]) if pairs else []
+    out = []
+    for ((a, b), v), off in zip(pairs, offsets):
+        out.append({"author": a, "responder": b, **summarize(v["latencies"]), "reply_hours_utc": v["hours"], "utc_offset": off})
+    out.sort(key=lambda r: (-r["n"], str(r["author"]), str(r["responder"])))
+    return out
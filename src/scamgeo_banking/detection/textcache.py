@@ -0,0 +1,138 @@
+"""
+Cache wyników ekstrakcji/scoringu dla powtarzanych wiadomości.
+
+Kanały scamowe publikują ten sam tekst setki razy z drobnymi zmianami (emoji,
+białe znaki). Klucz cache to hash tekstu po normalizacji:
+- URL-e w całości (reguły patrzą na ścieżkę: t.me/…, wa.me/…, IBAN w query),
+- bez emoji / selektorów wariantów / ZWJ, białe znaki zwinięte,
+- casefold tylko dla scoringu (fold=True); ekstrakcja trzyma wielkość liter,
+  bo portfele i IBAN-y są na nią wrażliwe.
+
+URL-e tekstu są zwracane osobno, więc wywołujący zawsze ma URL-e bieżącej kopii.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import pathlib
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+__all__ = ["normalize_text", "content_key", "TextCache"]
+
+# ten sam kształt URL co grupa "url" w detection/iocs
+_URL_RE = re.compile(r"https?://[^\s<>\"\)\]]+")
+# ZWJ, selektory wariantów, modyfikatory koloru skóry, znaczniki flag
+_INVISIBLE = {0x200D, 0x200C, 0xFE0E, 0xFE0F, 0x20E3}
+
+
+def _is_decoration(ch: str) -> bool:
+    o = ord(ch)
+    if o < 0x2000:
+        return False
+    if o in _INVISIBLE or 0x1F3FB <= o <= 0x1F3FF or 0xE0020 <= o <= 0xE007F:
+        return True
+    return unicodedata.category(ch) in ("So", "Sk", "Cs", "Co")
+
+
+class _DecorationTable(dict):
+    """Tablica dla str.translate: dekoracja -> spacja, reszta bez zmian; znak klasyfikowany raz (potem lookup w C)."""
+
+    def __missing__(self, o: int) -> int:
+        v = self[o] = 0x20 if _is_decoration(chr(o)) else o
+        return v
+
+
+_DECORATIONS = _DecorationTable()
+
+
+def normalize_text(text: str, fold: bool = True) -> Tuple[str, List[str]]:
+    """Zwraca (tekst znormalizowany, URL-e z oryginału w kolejności wystąpienia)."""
+    s = text or ""
+    urls = _URL_RE.findall(s) if "://" in s else []
+    if fold:
+        s = s.casefold()
+    if not s.isascii():
+        s = s.translate(_DECORATIONS)
+    return " ".join(s.split()), urls
+
+
+def content_key(text: str, extra: str = "", fold: bool = True) -> Tuple[str, List[str]]:
+    """
+    (hash znormalizowanej treści, URL-e z oryginału); `extra` to dodatkowy
+    kontekst klucza, np. URL źródła. fold=False — klucz rozróżnia wielkość liter.
+    """
+    norm, urls = normalize_text(text, fold)
+    return hashlib.blake2b(f"{extra}\x00{norm}".encode("utf-8"), digest_size=16).hexdigest(), urls
+
+
+class TextCache:
+    """
+    Ograniczony cache LRU (klucz -> wynik JSON-owalny) z licznikami trafień.
+    Z `path` zawartość jest wczytywana przy starcie i zapisywana przez save();
+    plik z innym `tag` (np. po zmianie reguł) jest ignorowany.
+    """
+
+    def __init__(self, maxsize: int = 50_000, path: Optional[str | pathlib.Path] = None, tag: str = ""):
+        self.maxsize = maxsize
+        self.path = pathlib.Path(path) if path else None
+        self.tag = tag
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        if self.path and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("tag") == tag:
+                    self._data.update(data.get("entries") or {})
+            except (ValueError, OSError, AttributeError):
+                pass
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any:
+        val = self._data.get(key)
+        if val is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return val
+
+    def put(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_compute(self, key: str, fn: Callable[[], Any]) -> Any:
+        val = self.get(key)
+        if val is None:
+            val = fn()
+            self.put(key, val)
+        return val
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "size": len(self._data),
+        }
+
+    def summary(self) -> str:
+        st = self.stats()
+        return f"cache: {st['hits']}/{st['hits'] + st['misses']} trafień ({st['hit_rate']:.0%}), wpisów {st['size']}"
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"tag": self.tag, "entries": self._data}, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
@@ -0,0 +1,135 @@
+"""
+Wnioskowanie o strefie czasowej z godzin aktywności.
+
+Wiadomości są zliczane w jeden 24-przedziałowy histogram godzin UTC. Wynik
+offsetu `off` to suma histogramu pod maską "godzin czuwania" przesuniętą o
+`off` — czyli splot cykliczny histogramu z maską. Liczymy go naraz dla
+wszystkich 24 przesunięć (mnożenie przez macierz cyrkulantną maski), także dla
+macierzy (encje × 24), więc offsety tysięcy autorów/kanałów to jedno wywołanie.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone, tzinfo
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+# miękki import — bez numpy te same wyniki z pętli w Pythonie
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+__all__ = [
+    "UTC_OFFSETS", "AWAKE_WINDOWS", "awake_mask", "hour_histogram", "hour_histogram_tzs", "hour_histograms",
+    "offset_scores", "infer_offset", "infer_offsets",
+]
+
+UTC_OFFSETS = list(range(-12, 15))  # plausible UTC offsets
+
+AWAKE_WINDOWS = [
+    (8, 12),   # morning active
+    (12, 14),  # lunch
+    (18, 23),  # evening peak
+]
+
+
+def awake_mask(windows: Sequence[Tuple[int, int]] = AWAKE_WINDOWS) -> List[int]:
+    """Waga godziny lokalnej = liczba okien (włącznie z końcami), które ją zawierają."""
+    mask = [0] * 24
+    for a, b in windows:
+        for h in range(a, b + 1):
+            mask[h % 24] += 1
+    return mask
+
+
+def _hour(d: Any, tz: tzinfo) -> Optional[int]:
+    if isinstance(d, str):
+        try:
+            d = datetime.fromisoformat(d.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(d, datetime):
+        return None
+    return d.astimezone(tz).hour
+
+
+def hour_histogram(dates: Iterable[Any], tz: tzinfo = timezone.utc):
+    """Histogram godzin (24 przedziały) w strefie `tz`; daty jako datetime albo ISO-8601."""
+    counts = [0] * 24
+    for d in dates:
+        h = _hour(d, tz)
+        if h is not None:
+            counts[h] += 1
+    return np.asarray(counts, dtype=np.int64) if np is not None else counts
+
+
+def hour_histogram_tzs(dates: Iterable[Any], tzs: Sequence[tzinfo]):
+    """Histogramy godzin dla kilku stref w jednym przejściu po datach (np. strumień z archiwum)."""
+    counts = [[0] * 24 for _ in tzs]
+    for d in dates:
+        if isinstance(d, str):
+            try:
+                d = datetime.fromisoformat(d.replace("Z", "+00:00"))
+            except ValueError:
+                continue
+        if not isinstance(d, datetime):
+            continue
+        for row, tz in zip(counts, tzs):
+            row[d.astimezone(tz).hour] += 1
+    return [np.asarray(c, dtype=np.int64) for c in counts] if np is not None else counts
+
+
+def hour_histograms(groups: Dict[Hashable, Iterable[Any]], tz: tzinfo = timezone.utc):
+    """(klucze, macierz encje × 24) dla słownika encja -> daty."""
+    keys = list(groups)
+    rows = [hour_histogram(groups[k], tz) for k in keys]
+    if np is not None:
+        return keys, (np.vstack(rows) if rows else np.zeros((0, 24), dtype=np.int64))
+    return keys, rows
+
+
+def _circulant(mask: Sequence[int]):
+    # C[h, s] = mask[(h + s) % 24]: hist @ C daje wynik każdego przesunięcia s
+    idx = (np.arange(24)[:, None] + np.arange(24)[None, :]) % 24
+    return np.asarray(mask, dtype=np.int64)[idx]
+
+
+def offset_scores(hist, offsets: Sequence[int] = UTC_OFFSETS, windows=AWAKE_WINDOWS):
+    """
+    Wyniki offsetów dla histogramu (24,) albo macierzy (N, 24).
+    Zwraca tablicę (len(offsets),) albo (N, len(offsets)).
+    """
+    mask = awake_mask(windows)
+    cols = [o % 24 for o in offsets]
+    if np is not None:
+        return (np.asarray(hist, dtype=np.int64) @ _circulant(mask))[..., cols]
+
+    def scores(row):
+        return [sum(row[h] * mask[(h + c) % 24] for h in range(24)) for c in cols]
+
+    if len(hist) and isinstance(hist[0], (list, tuple)):
+        return [scores(r) for r in hist]
+    return scores(hist)
+
+
+def infer_offsets(hists, offsets: Sequence[int] = UTC_OFFSETS, windows=AWAKE_WINDOWS) -> List[Optional[int]]:
+    """Najlepszy offset dla każdego wiersza (N, 24); pusty histogram -> None. Remis: pierwszy offset."""
+    if np is not None:
+        hists = np.asarray(hists, dtype=np.int64).reshape(-1, 24)
+        if not len(hists):
+            return []
+        best = np.argmax(offset_scores(hists, offsets, windows), axis=1)
+        empty = hists.sum(axis=1) == 0
+        return [None if e else offsets[int(b)] for b, e in zip(best, empty)]
+    out: List[Optional[int]] = []
+    for row in hists:
+        if not sum(row):
+            out.append(None)
+            continue
+        scores = offset_scores(list(row), offsets, windows)
+        out.append(offsets[scores.index(max(scores))])
+    return out
+
+
+def infer_offset(dates: Iterable[Any], offsets: Sequence[int] = UTC_OFFSETS) -> Optional[int]:
+    """Offset UTC dla jednej listy dat (None gdy brak dat)."""
+    return infer_offsets([list(hour_histogram(dates))], offsets)[0]
@@ -0,0 +1,200 @@
+"""
+Walidacja sum kontrolnych adresów portfeli krypto.
+
+- BTC legacy (1.../3...): Base58Check, wersja 0x00 / 0x05
+- BTC segwit (bc1...):    bech32 (v0) / bech32m (v1+), BIP-173 / BIP-350
+- ETH (0x...):            EIP-55 — adres mieszanej wielkości liter musi zgadzać się z keccak256
+- TRON (T...):            Base58Check, wersja 0x41
+
+Wyniki są cache'owane per adres (te same portfele wracają w setkach wiadomości).
+"""
+from __future__ import annotations
+
+import hashlib
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+__all__ = ["is_valid_wallet", "validate_wallets", "filter_wallets", "keccak256"]
+
+# miękki import — szybszy keccak z pycryptodome, jeśli jest; inaczej implementacja w Pythonie
+try:
+    from Crypto.Hash import keccak as _ck
+except Exception:
+    _ck = None
+
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_IDX = {c: i for i, c in enumerate(_B58)}
+_BECH32 = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+_BECH32_IDX = {c: i for i, c in enumerate(_BECH32)}
+_BECH32M_CONST = 0x2BC830A3
+
+
+# ─── Base58Check ────────────────────────────────────────────────────────────────
+
+def _b58decode(s: str) -> bytes | None:
+    n = 0
+    for c in s:
+        v = _B58_IDX.get(c)
+        if v is None:
+            return None
+        n = n * 58 + v
+    body = n.to_bytes((n.bit_length() + 7) // 8, "big")
+    pad = len(s) - len(s.lstrip("1"))
+    return b"\x00" * pad + body
+
+
+def _b58check(s: str, versions: tuple) -> bool:
+    raw = _b58decode(s)
+    if raw is None or len(raw) != 25 or raw[0] not in versions:
+        return False
+    return hashlib.sha256(hashlib.sha256(raw[:21]).digest()).digest()[:4] == raw[21:]
+
+
+# ─── bech32 / bech32m ──────────────────────────────────────────────────────────
+
+def _polymod(values: List[int]) -> int:
+    gen = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+    chk = 1
+    for v in values:
+        top = chk >> 25
+        chk = (chk & 0x1FFFFFF) << 5 ^ v
+        for i in range(5):
+            if (top >> i) & 1:
+                chk ^= gen[i]
+    return chk
+
+
+def _convertbits(data: List[int], frombits: int, tobits: int) -> List[int] | None:
+    acc = bits = 0
+    out = []
+    maxv = (1 << tobits) - 1
+    for v in data:
+        acc = (acc << frombits) | v
+        bits += frombits
+        while bits >= tobits:
+            bits -= tobits
+            out.append((acc >> bits) & maxv)
+    if bits >= frombits or ((acc << (tobits - bits)) & maxv):
+        return None
+    return out
+
+
+def _segwit_ok(addr: str) -> bool:
+    if addr.lower() != addr and addr.upper() != addr:
+        return False
+    addr = addr.lower()
+    pos = addr.rfind("1")
+    hrp, data = addr[:pos], addr[pos + 1:]
+    if hrp != "bc" or len(data) < 6 or len(addr) > 90:
+        return False
+    try:
+        values = [_BECH32_IDX[c] for c in data]
+    except KeyError:
+        return False
+    const = _polymod([ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp] + values)
+    witver = values[0]
+    if const != (1 if witver == 0 else _BECH32M_CONST):
+        return False
+    prog = _convertbits(values[1:-6], 5, 8)
+    if prog is None or witver > 16 or not 2 <= len(prog) <= 40:
+        return False
+    return witver != 0 or len(prog) in (20, 32)
+
+
+# ─── keccak256 / EIP-55 ────────────────────────────────────────────────────────
+
+_RC = (
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+)
+# offsety rotacji r[x][y]
+_ROT = ((0, 36, 3, 41, 18), (1, 44, 10, 45, 2), (62, 6, 43, 15, 61), (28, 55, 25, 21, 56), (27, 20, 39, 8, 14))
+_M64 = (1 << 64) - 1
+
+
+def _keccak_f(a: List[int]) -> None:
+    for rc in _RC:
+        c = [a[x] ^ a[x + 5] ^ a[x + 10] ^ a[x + 15] ^ a[x + 20] for x in range(5)]
+        for x in range(5):
+            r = c[(x + 1) % 5]
+            d = c[(x - 1) % 5] ^ (((r << 1) | (r >> 63)) & _M64)
+            for y in range(0, 25, 5):
+                a[x + y] ^= d
+        b = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                v, n = a[x + 5 * y], _ROT[x][y]
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = ((v << n) | (v >> (64 - n))) & _M64 if n else v
+        for y in range(0, 25, 5):
+            for x in range(5):
+                a[x + y] = b[x + y] ^ (~b[(x + 1) % 5 + y] & b[(x + 2) % 5 + y])
+        a[0] ^= rc
+
+
+def keccak256(data: bytes) -> bytes:
+    """Keccak-256 (wariant Ethereum, padding 0x01 — to NIE jest hashlib.sha3_256)."""
+    if _ck is not None:
+        return _ck.new(digest_bits=256, data=data).digest()
+    rate = 136
+    msg = bytearray(data) + b"\x01" + b"\x00" * ((-len(data) - 1) % rate)
+    msg[-1] |= 0x80
+    state = [0] * 25
+    for off in range(0, len(msg), rate):
+        block = msg[off:off + rate]
+        for i in range(rate // 8):
+            state[i] ^= int.from_bytes(block[8 * i:8 * i + 8], "little")
+        _keccak_f(state)
+    return b"".join(state[i].to_bytes(8, "little") for i in range(4))
+
+
+def _eip55_ok(addr: str) -> bool:
+    body = addr[2:]
+    if len(body) != 40 or not addr.startswith("0x"):
+        return False
+    try:
+        int(body, 16)
+    except ValueError:
+        return False
+    if body == body.lower() or body == body.upper():
+        return True  # brak sumy kontrolnej w zapisie — format poprawny
+    digest = keccak256(body.lower().encode("ascii")).hex()
+    for c, h in zip(body, digest):
+        if c.isalpha() and (c.isupper() != (int(h, 16) >= 8)):
+            return False
+    return True
+
+
+# ─── API ───────────────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=65536)
+def is_valid_wallet(kind: str, addr: str) -> bool:
+    """kind: "btc" | "eth" | "trc20"."""
+    if not addr:
+        return False
+    if kind == "btc":
+        if addr[:3].lower() == "bc1":
+            return _segwit_ok(addr)
+        return addr[0] in "13" and _b58check(addr, (0x00, 0x05))
+    if kind == "eth":
+        return _eip55_ok(addr)
+    if kind == "trc20":
+        return addr[0] == "T" and _b58check(addr, (0x41,))
+    raise ValueError(f"nieznany typ portfela: {kind}")
+
+
+def validate_wallets(kind: str, addrs: Iterable[str]) -> List[bool]:
+    """Walidacja wsadowa (w kolejności wejścia); duplikaty trafiają w cache."""
+    return [is_valid_wallet(kind, a) for a in addrs]
+
+
+def filter_wallets(found: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Zostawia tylko poprawne adresy w listach btc/eth/trc20 (pozostałe klucze bez zmian)."""
+    out = dict(found)
+    for kind in ("btc", "eth", "trc20"):
+        if kind in out:
+            out[kind] = [a for a in out[kind] if is_valid_wallet(kind, a)]
+    return out
@@ -3,6 +3,8 @@
 import json, glob, os
 from urllib.parse import urlparse
 
+from scamgeo_banking.storage.archive import MessageArchive
+
 OUT = "scam_hunter_out/domains_to_check.txt"
 
 def add_domain(s, acc):
@@ -24,9 +26,18 @@ def add_domain(s, acc):
 def main():
     acc = set()
 
-    # 1) ostatni deep_report_*.json
+    # 1) archiwum wiadomości (strumieniowo, URL-e z IOC i ukrytych linków w encjach),
+    #    a gdy go brak — ostatni deep_report_*.json
+    archive = MessageArchive("scam_hunter_out/archive")
     reps = sorted(glob.glob("scam_hunter_out/deep_report_*.json"))
-    if reps:
+    if archive.channels():
+        for r in archive.iter_messages():
+            for u in r.get("iocs", {}).get("url", []):
+                add_domain(u, acc)
+            for e in r.get("entities", []):
+                if e.get("url"):
+                    add_domain(e["url"], acc)
+    elif reps:
         p = reps[-1]
         with open(p, "r", encoding="utf-8") as f:
             data = json.load(f)
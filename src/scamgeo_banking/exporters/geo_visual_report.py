@@ -12,6 +12,8 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
 
+from scamgeo_banking.detection.lookalike import load_index
+
 OUTDIR = os.path.join("scam_hunter_out")
 WHOIS_JSON = os.path.join(OUTDIR, "whois_last.json")  # wymagane
 BAR_PNG = os.path.join(OUTDIR, "geo_bar_chart.png")
@@ -92,9 +94,10 @@ def best_country_guess(entry):
         return "US"
     return "?"
 
-def risk_score(entry):
+def risk_score(entry, lookalike=None):
     """
-    Zwraca (score:int 0..100, label:str)
+    Zwraca (score:int 0..100, label:str); lookalike — wynik load_index().match(domena)
+    policzony przez wywołującego (main używa go też w raporcie)
     Zasady:
       +100 SAFE pin: jeÅ¼eli w SAFE_DOMAINS â†’ score max 20 i label SAFE
       bazowy 20 dla unknown
@@ -102,6 +105,7 @@ def risk_score(entry):
       +25 registrar na liÅ›cie podejrzanych (jeÅ›li nie w SAFE_DOMAINS)
       +20 CDN (Cloudflare/Akamai) + tld podejrzany i nieznany brand
       +30 sÅ‚owo-klucz w domenie
+      +35 domena-sobowtór zaufanej domeny banku (homoglif / podmiana TLD / literówka / brand w subdomenie / token brandu)
       ciÄ™cie do [0,100], progi: >=70 HIGH/SCAM, 40..69 WATCH, <40 SAFE
     """
     domain = (entry.get("domain") or "").lower()
@@ -143,6 +147,10 @@ def risk_score(entry):
     if any(k in domain for k in SUSPICIOUS_KEYWORDS):
         score += 30
 
+    # podszywanie się pod bank
+    if lookalike:
+        score += 35
+
     score = max(0, min(100, score))
     if score >= 70:
         label = "SCAM"
@@ -193,7 +201,8 @@ def main():
         created = (r.get("whois") or {}).get("creation_date")
         vend = vendor_hint(r)
         country = best_country_guess(r)
-        sc, label = risk_score(r)
+        hit = load_index().match(domain or "")
+        sc, label = risk_score(r, hit)
 
         country_counts[country] += 1
 
@@ -206,7 +215,8 @@ def main():
             "vendor": vend,
             "country": country,
             "risk_score": sc,
-            "risk_label": label
+            "risk_label": label,
+            "imitates": f"{hit.trusted_domain} ({hit.reason})" if hit else ""
         })
 
     # wykres
@@ -215,10 +225,10 @@ def main():
     # CSV z ryzykiem
     with open(CSV_RISK, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
-        w.writerow(["domain","ip","asn","registrar","created","vendor","country","risk_score","risk_label"])
+        w.writerow(["domain","ip","asn","registrar","created","vendor","country","risk_score","risk_label","imitates"])
         for e in enriched:
             w.writerow([e["domain"], e["ip"], e["asn"], e["registrar"], e["created"],
-                        e["vendor"], e["country"], e["risk_score"], e["risk_label"]])
+                        e["vendor"], e["country"], e["risk_score"], e["risk_label"], e["imitates"]])
 
     # PDF
     doc = SimpleDocTemplate(PDF_PATH, pagesize=A4)
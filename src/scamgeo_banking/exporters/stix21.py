@@ -62,6 +62,8 @@ def export_stix21(iocs, case_id:str=None):
     for i in iocs or []:
         o = ioc_to_observable(i)
         if o:
+            if i.get("imitates"):
+                o["x_imitates"] = i["imitates"]
             objs.append(o)
     bundle = {
         "type": "bundle",
@@ -3,6 +3,8 @@ from pathlib import Path
 from datetime import datetime
 import csv, json, hashlib, zipfile, re
 
+from scamgeo_banking.detection.lookalike import load_index
+
 def score_and_export_iocs(out_dir: Path, cfg: dict) -> list[dict]:
     out_dir = Path(out_dir)
     ioc_csv = out_dir / "iocs.csv"; iocs = []
@@ -22,6 +24,13 @@ def score_and_export_iocs(out_dir: Path, cfg: dict) -> list[dict]:
             w = csv.DictWriter(f, fieldnames=["type","url","score"])
             w.writeheader()
             for i in iocs: w.writerow({"type":i["type"], "url":i["value"], "score":i["score"]})
+    # domeny-sobowtóry zaufanych domen banków
+    index = load_index()
+    for i in iocs:
+        hit = index.match(extract_domain(i["value"]))
+        if hit:
+            i["imitates"] = hit.trusted_domain
+            i["imitates_reason"] = hit.reason
     (out_dir / "iocs.txt").write_text("\n".join(i["value"] for i in iocs), encoding="utf-8")
     return iocs
 
@@ -64,8 +73,11 @@ def export_stix(out_dir: Path, iocs: list[dict]):
                 "type":"indicator","spec_version":"2.1","id":f"indicator--demo-{idx:04d}",
                 "created":now,"modified":now,"pattern_type":"stix",
                 "pattern": f"[url:value = '{i['value']}']","valid_from": now,
-                "labels": ["fraud","banking-abuse"],"confidence": min(100, int(i["score"]))
+                "labels": ["fraud","banking-abuse"] + (["typosquat"] if i.get("imitates") else []),
+                "confidence": min(100, int(i["score"]))
             })
+            if i.get("imitates"):
+                objs[-1]["x_imitates"] = i["imitates"]
     stix = {"type":"bundle","id":"bundle--demo","objects":objs}
     stix_path.write_text(json.dumps(stix, indent=2), encoding="utf-8")
 
@@ -0,0 +1,294 @@
+"""
+Skompilowany silnik reguł ryzyka.
+
+Wszystkie paczki reguł (keywords.RISK_KEYWORDS / AD_MARKERS, BANK_KEYWORDS ze
+scoring/banking) są sklejane w jeden regex z nazwanymi grupami r0..rN; nazwa
+grupy → reguła → waga. Wynik zawiera wyjaśnienie każdego trafienia.
+
+Moduł `re` nie ma optymalizacji prefiksów dla długich alternatyw, więc pełne
+search() po każdej pozycji tekstu jest drogie. Z każdej reguły wyciągamy
+literalne prefiksy jej alternatyw ("triggery"); matcher jest uruchamiany
+zakotwiczonym match() tylko w miejscach, gdzie któryś trigger występuje.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from .. import keywords
+
+__all__ = ["Rule", "ScoreHit", "RuleEngine", "rules_from_patterns", "default_rules"]
+
+_INLINE_GROUP = re.compile(r"\((?!\?)")
+_META = set(".^$*+?{}[]()|\\")
+_QUANT = set("*+?{")
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str               # identyfikator w wyjaśnieniu, np. "kw:3" / "risk:0"
+    pattern: str            # regex (flagi: IGNORECASE)
+    weight: int             # waga domyślna
+    per_term: bool = False  # True: każdy inny dopasowany termin liczony osobno (wagi z WEIGHTS)
+
+
+@dataclass
+class ScoreHit:
+    rule: str
+    weight: int
+    match: str
+
+
+def rules_from_patterns(prefix: str, patterns: Sequence[str], weight: int, per_term: bool = False) -> List[Rule]:
+    return [Rule(f"{prefix}:{i}", p, weight, per_term) for i, p in enumerate(patterns)]
+
+
+def default_rules() -> List[Rule]:
+    """Paczki z keywords.py: frazy ryzyka (wagi z WEIGHTS) i markery reklam."""
+    return (
+        rules_from_patterns("risk", keywords.RISK_KEYWORDS, 5, per_term=True)
+        + rules_from_patterns("ad", keywords.AD_MARKERS, 5, per_term=True)
+    )
+
+
+def _noncapturing(pattern: str) -> str:
+    # grupy wewnątrz reguł nie są potrzebne — zostaje tylko nazwana grupa reguły
+    return _INLINE_GROUP.sub("(?:", pattern.replace(r"\(", "\x00")).replace("\x00", r"\(")
+
+
+def _split_top(pattern: str) -> List[str]:
+    """Dzieli wzorzec po "|" na najwyższym poziomie zagnieżdżenia."""
+    parts, cur, depth, i = [], [], 0, 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            cur.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            parts.append("".join(cur))
+            cur = []
+            i += 1
+            continue
+        cur.append(ch)
+        i += 1
+    parts.append("".join(cur))
+    return parts
+
+
+def _wrapped(pattern: str) -> bool:
+    """True gdy cały wzorzec to jedna grupa "( ... )"."""
+    if not pattern.startswith("(") or pattern.startswith("(?") or not pattern.endswith(")"):
+        return False
+    depth, i = 0, 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i == len(pattern) - 1
+        i += 1
+    return False
+
+
+def _literal_prefix(alt: str) -> str:
+    """Literalny prefiks alternatywy (małe litery) albo "" gdy go nie ma."""
+    out: List[str] = []
+    i = 0
+    while i < len(alt):
+        ch = alt[i]
+        if ch == "\\":
+            nxt = alt[i + 1:i + 2]
+            if not nxt or nxt.isalnum():   # \s, \d, \b ... — koniec literału
+                break
+            lit, step = nxt, 2
+        elif ch in _META:
+            break
+        else:
+            lit, step = ch, 1
+        if alt[i + step:i + step + 1] in _QUANT:   # "s?" — znak opcjonalny, nie wchodzi do prefiksu
+            break
+        out.append(lit.lower())
+        i += step
+    return "".join(out)
+
+
+def _triggers(pattern: str) -> Optional[List[str]]:
+    """
+    Literalne prefiksy wszystkich alternatyw reguły; None gdy któraś ich nie ma
+    (takie reguły są skanowane osobnym finditer()).
+    """
+    p = pattern
+    while p.startswith(r"\b"):
+        p = p[2:]
+    while p.endswith(r"\b") and not p.endswith(r"\\b"):
+        p = p[:-2]
+    alts = _split_top(p)
+    if len(alts) == 1 and _wrapped(p):
+        alts = _split_top(p[1:-1])
+    out = []
+    for a in alts:
+        pre = _literal_prefix(a)
+        if not pre:
+            return None
+        out.append(pre)
+    return out
+
+
+class _Matcher:
+    """Jeden combined regex nad zestawem reguł + triggery do zakotwiczonego dopasowania."""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self.rx = re.compile(
+            "|".join(f"(?P<r{i}>{_noncapturing(r.pattern)})" for i, r in enumerate(rules)),
+            re.IGNORECASE,
+        )
+        self.singles = [re.compile(r.pattern, re.IGNORECASE) for r in rules]
+        triggers: set = set()
+        self.loose: List[int] = []
+        for i, r in enumerate(rules):
+            t = _triggers(r.pattern)
+            if t is None:
+                self.loose.append(i)
+            else:
+                triggers.update(t)
+        # trigger będący prefiksem krótszego jest zbędny ("ad" pokrywa "advertisement")
+        self.triggers = sorted(t for t in triggers if not any(o != t and t.startswith(o) for o in triggers))
+
+    def positions(self, text: str) -> Optional[List[int]]:
+        low = text.lower()
+        if len(low) != len(text):
+            return None  # lower() zmienił długość (np. "İ") — pozycje by się rozjechały
+        pos = set()
+        find = low.find
+        for t in self.triggers:
+            i = find(t)
+            while i != -1:
+                pos.add(i)
+                i = find(t, i + 1)
+        for j in self.loose:
+            for m in self.singles[j].finditer(text):
+                pos.add(m.start())
+        return sorted(pos)
+
+
+class RuleEngine:
+    """
+    Silnik reguł: matcher tekstu i osobny matcher fragmentów hosta URL.
+    Każda reguła liczy się raz na tekst (per_term: raz na termin).
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[Rule],
+        url_rules: Iterable[Rule] = (),
+        weights: Optional[Dict[str, int]] = None,
+        thresholds: tuple[int, int] = (40, 25),
+    ):
+        self.rules = list(rules)
+        self.url_rules = list(url_rules)
+        self.weights = {k.lower(): v for k, v in (weights if weights is not None else keywords.WEIGHTS).items()}
+        # dłuższe klucze najpierw: "sure profit" przed "sure"
+        self._weight_prefixes = sorted(self.weights, key=len, reverse=True)
+        self.thresholds = thresholds
+        self._text = _Matcher(self.rules) if self.rules else None
+        self._url = _Matcher(self.url_rules) if self.url_rules else None
+
+    def _term_weight(self, rule: Rule, term: str) -> int:
+        w = self.weights.get(term)
+        if w is not None:
+            return w
+        for k in self._weight_prefixes:
+            if term.startswith(k):
+                return self.weights[k]
+        return rule.weight
+
+    def _scan(self, mt: Optional[_Matcher], text: str, hits: List[ScoreHit]) -> None:
+        if mt is None or not text:
+            return
+        rules, singles = mt.rules, mt.singles
+        seen = set()
+        covered: Dict[str, int] = {}
+
+        def take(rule: Rule, m: re.Match) -> None:
+            # ogon trafienia tej samej reguły ("00%" w "100%") nie jest nowym terminem
+            if m.end() <= covered.get(rule.name, -1):
+                return
+            covered[rule.name] = m.end()
+            term = m.group(0).lower()
+            key = (rule.name, term) if rule.per_term else rule.name
+            if key in seen:
+                return
+            seen.add(key)
+            weight = self._term_weight(rule, term) if rule.per_term else rule.weight
+            hits.append(ScoreHit(rule.name, weight, m.group(0)[:120]))
+
+        def at(m: re.Match) -> None:
+            start = m.start()
+            i = int(m.lastgroup[1:])
+            take(rules[i], m)
+            # alternatywa zwraca pierwszą pasującą regułę; późniejsze reguły mogą pasować
+            # w tym samym miejscu — sprawdzamy je zakotwiczonym match()
+            for j in range(i + 1, len(rules)):
+                mj = singles[j].match(text, start)
+                if mj:
+                    take(rules[j], mj)
+
+        positions = mt.positions(text)
+        if positions is None:
+            # ścieżka awaryjna: search() od każdego start+1, żeby reguły zagnieżdżone
+            # w dłuższym trafieniu ("whatsapp" w "skontaktuj ... WhatsApp") też były widoczne
+            pos = 0
+            while True:
+                m = mt.rx.search(text, pos)
+                if m is None:
+                    break
+                at(m)
+                pos = m.start() + 1
+            return
+        match = mt.rx.match
+        for p in positions:
+            m = match(text, p)
+            if m:
+                at(m)
+
+    def label(self, score: int) -> str:
+        high, mid = self.thresholds
+        return "banking_scam" if score >= high else ("suspicious" if score >= mid else "unknown")
+
+    def score(self, text: str, url: Optional[str] = None) -> Dict:
+        hits: List[ScoreHit] = []
+        self._scan(self._text, text or "", hits)
+        if url and self._url is not None:
+            try:
+                host = (urlsplit(url).hostname or "").lower()
+            except ValueError:
+                host = ""
+            self._scan(self._url, host, hits)
+        score = sum(h.weight for h in hits)
+        return {
+            "score": min(score, 100),
+            "label": self.label(score),
+            "hits": [h.__dict__ for h in hits],
+        }
+
+    def score_batch(self, texts: Sequence[str], urls: Optional[Sequence[Optional[str]]] = None) -> List[Dict]:
+        """Scoring wielu tekstów jednym wywołaniem; urls (opcjonalnie) równoległe do texts."""
+        if urls is None:
+            return [self.score(t) for t in texts]
+        if len(urls) != len(texts):
+            raise ValueError("texts i urls muszą mieć tę samą długość")
+        score = self.score
+        return [score(t, u) for t, u in zip(texts, urls)]
@@ -0,0 +1,242 @@
+"""
+Archiwum wiadomości: append-only, per kanał, skompresowane segmenty JSONL.
+
+Układ katalogu:
+    <root>/<kanał>/seg-000001.jsonl.zst   — sklejone ramki zstd (zstandard w requirements.txt;
+                                            bez niego gzip, .jsonl.gz)
+    <root>/<kanał>/index.jsonl            — jedna linia na ramkę: plik, offset, długość,
+                                            zakres msg_id i dat, liczba rekordów
+
+Każde append() to nowa ramka na końcu bieżącego segmentu, więc czytnik dekompresuje
+tylko ramki, których zakres z indeksu pasuje do filtra (msg_id / data) — historia
+z wielu miesięcy jest czytana strumieniowo, ramka po ramce. Bajty segmentu bez linii
+w indeksie (przerwany zapis) są ignorowane.
+
+Archiwum jest tylko „w przód”: rekordy w kanale idą rosnąco po msg_id, append()
+pomija id ≤ ostatniego zapisanego. Historii starszej niż pierwsza ramka kanału
+(backfill, np. deep scrape --full po przebiegach przyrostowych) nie da się dopisać —
+takie rekordy są pomijane z ostrzeżeniem w logu.
+Zapis kanału trzyma blokadę pliku <kanał>/.lock (monitor i deep scrape w osobnych
+procesach), a indeks jest pod nią czytany od nowa z dysku.
+"""
+from __future__ import annotations
+
+import contextlib
+import gzip
+import json
+import logging
+import pathlib
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# miękki import — bez zstandard segmenty są zapisywane jako gzip (.jsonl.gz)
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+__all__ = ["MessageArchive", "iso_utc", "SEGMENT_BYTES", "FRAME_RECORDS"]
+
+log = logging.getLogger(__name__)
+
+SEGMENT_BYTES = 64 * 1024 * 1024   # po przekroczeniu rozmiaru nowy segment
+FRAME_RECORDS = 1000               # maks. rekordów w jednej ramce (granulacja odczytu)
+_SAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def iso_utc(d: Any) -> Optional[str]:
+    """Data jako ISO-8601 w UTC (jednolity zapis => porównywalne leksykograficznie)."""
+    if isinstance(d, str):
+        try:
+            d = datetime.fromisoformat(d.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(d, datetime):
+        return None
+    if d.tzinfo is None:
+        d = d.replace(tzinfo=timezone.utc)
+    return d.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+class _Codec:
+    def __init__(self, name: str):
+        self.name = name
+        self.suffix = ".jsonl.zst" if name == "zstd" else ".jsonl.gz"
+
+    def compress(self, raw: bytes) -> bytes:
+        if self.name == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(raw)
+        return gzip.compress(raw, compresslevel=6)
+
+    @staticmethod
+    def decompress(path: str, blob: bytes) -> bytes:
+        if path.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError(f"{path}: segment zstd, a moduł zstandard nie jest zainstalowany")
+            return zstandard.ZstdDecompressor().decompress(blob)
+        return gzip.decompress(blob)
+
+
+@contextlib.contextmanager
+def _locked(path: pathlib.Path) -> Iterator[None]:
+    """Wyłączna blokada między procesami (flock / msvcrt.locking), zwalniana przy zamknięciu pliku."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:   # LK_LOCK poddaje się po ~10 s
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class MessageArchive:
+    def __init__(self, root: str | pathlib.Path, codec: Optional[str] = None):
+        self.root = pathlib.Path(root)
+        self.codec = _Codec(codec or ("zstd" if zstandard is not None else "gzip"))
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+
+    # ─── zapis ─────────────────────────────────────────────────────────────────
+
+    def _dir(self, channel: str) -> pathlib.Path:
+        return self.root / (_SAFE.sub("_", channel.lstrip("@")) or "_")
+
+    def index(self, channel: str) -> List[Dict[str, Any]]:
+        """Wpisy indeksu kanału (ramki w kolejności zapisu)."""
+        if channel not in self._index:
+            p = self._dir(channel) / "index.jsonl"
+            rows = []
+            if p.exists():
+                with open(p, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            rows.append(json.loads(line))
+                        except ValueError:
+                            break  # ucięta ostatnia linia po przerwanym zapisie
+            self._index[channel] = rows
+        return self._index[channel]
+
+    def last_id(self, channel: str) -> int:
+        idx = self.index(channel)
+        return idx[-1]["max_id"] if idx else 0
+
+    def append(self, channel: str, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Dopisuje rekordy (wymagane "id"; "date" normalizowana do ISO UTC).
+        Zwraca liczbę zapisanych; id ≤ last_id(channel) są pomijane (już w archiwum
+        albo — poniżej pierwszej ramki — starsza historia, której archiwum nie przyjmuje).
+        """
+        records = [r for r in records if r.get("id") is not None]
+        if not records:
+            return 0
+        d = self._dir(channel)
+        d.mkdir(parents=True, exist_ok=True)
+        with _locked(d / ".lock"):
+            self._index.pop(channel, None)   # inny proces mógł dopisać ramki od ostatniego odczytu
+            last = self.last_id(channel)
+            idx = self.index(channel)
+            older = sum(1 for r in records if idx and r["id"] < idx[0]["min_id"])
+            if older:
+                log.warning("archive: %s: pominięto %d rekordów starszych niż początek archiwum (id %d) — "
+                            "archiwum przyjmuje tylko nowe wiadomości", channel, older, idx[0]["min_id"])
+            recs = sorted((r for r in records if r["id"] > last), key=lambda r: r["id"])
+            recs = [dict(r, channel=channel, date=iso_utc(r.get("date"))) for r in dict((r["id"], r) for r in recs).values()]
+            for i in range(0, len(recs), FRAME_RECORDS):
+                self._write_frame(channel, d, recs[i:i + FRAME_RECORDS])
+        return len(recs)
+
+    def _write_frame(self, channel: str, d: pathlib.Path, recs: List[Dict[str, Any]]) -> None:
+        idx = self.index(channel)
+        seg = idx[-1]["file"] if idx else None
+        if seg is None or not seg.endswith(self.codec.suffix) or (d / seg).stat().st_size >= SEGMENT_BYTES:
+            seg = f"seg-{len({e['file'] for e in idx}) + 1:06d}{self.codec.suffix}"
+        raw = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in recs).encode("utf-8")
+        blob = self.codec.compress(raw)
+        with open(d / seg, "ab") as f:
+            offset = f.tell()
+            f.write(blob)
+        dates = [r["date"] for r in recs if r["date"]]
+        entry = {
+            "channel": channel, "file": seg, "offset": offset, "length": len(blob), "count": len(recs),
+            "min_id": recs[0]["id"], "max_id": recs[-1]["id"],
+            "min_date": min(dates) if dates else None, "max_date": max(dates) if dates else None,
+        }
+        with open(d / "index.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        idx.append(entry)
+
+    # ─── odczyt ────────────────────────────────────────────────────────────────
+
+    def channels(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        out = []
+        for p in sorted(self.root.iterdir()):
+            idx = p / "index.jsonl"
+            if idx.exists():
+                with idx.open("r", encoding="utf-8") as f:
+                    first = f.readline()
+                out.append(json.loads(first)["channel"] if first.strip() else p.name)
+        return out
+
+    def iter_messages(
+        self,
+        channel: Optional[str] = None,
+        min_id: Optional[int] = None,
+        max_id: Optional[int] = None,
+        since: Any = None,
+        until: Any = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Strumień rekordów (kanał po kanale, rosnąco po msg_id). Filtry włącznie:
+        min_id ≤ id ≤ max_id, since ≤ date ≤ until (datetime albo ISO). Ramki spoza
+        zakresu nie są dekompresowane.
+        """
+        since, until = iso_utc(since) if since else None, iso_utc(until) if until else None
+        for ch in ([channel] if channel else self.channels()):
+            d = self._dir(ch)
+            for e in self.index(ch):
+                if (min_id is not None and e["max_id"] < min_id) or (max_id is not None and e["min_id"] > max_id):
+                    continue
+                if (since and e["max_date"] and e["max_date"] < since) or (until and e["min_date"] and e["min_date"] > until):
+                    continue
+                path = str(d / e["file"])
+                with open(path, "rb") as f:
+                    f.seek(e["offset"])
+                    raw = _Codec.decompress(path, f.read(e["length"]))
+                for line in raw.decode("utf-8").splitlines():
+                    r = json.loads(line)
+                    if (min_id is not None and r["id"] < min_id) or (max_id is not None and r["id"] > max_id):
+                        continue
+                    if (since and (not r["date"] or r["date"] < since)) or (until and (not r["date"] or r["date"] > until)):
+                        continue
+                    yield r
+
+    def stats(self) -> Dict[str, Any]:
+        chans = self.channels()
+        frames = [e for ch in chans for e in self.index(ch)]
+        return {
+            "channels": len(chans),
+            "frames": len(frames),
+            "messages": sum(e["count"] for e in frames),
+            "bytes": sum(e["length"] for e in frames),
+            "codec": self.codec.name,
+        }
@@ -0,0 +1,115 @@
+# entity_cache.py — trwały cache username -> (id, access_hash, typ) dla Telethona
+#
+# client.get_entity("nazwa") ZAWSZE woła contacts.ResolveUsername (najciaśniejszy
+# limit w API), nawet gdy sesja zna encję. Z zapamiętanym (id, access_hash)
+# budujemy InputPeer* i pobieramy encję przez channels.GetChannels / users.GetUsers,
+# które mają luźne limity. Wpis nieaktualny (zmiana nazwy, błędny hash) jest
+# usuwany i nazwa rozwiązywana od nowa.
+import json, time
+from pathlib import Path
+
+from telethon import errors, utils
+from telethon.tl.types import Channel, Chat, User, InputPeerChannel, InputPeerChat, InputPeerUser
+
+DEFAULT_PATH = Path("scam_hunter_out") / "entity_cache.json"
+
+
+def entity_type(entity):
+    if isinstance(entity, User):
+        return "user"
+    if isinstance(entity, Chat):
+        return "chat"
+    return "channel"
+
+
+def entity_usernames(entity):
+    names = {(getattr(entity, "username", None) or "").lower()}
+    for u in getattr(entity, "usernames", None) or ():
+        names.add((u.username or "").lower())
+    names.discard("")
+    return names
+
+
+class EntityCache:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+        if self.path and self.path.exists():
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8")).get("entities") or {}
+            except (ValueError, OSError, AttributeError):
+                self._data = {}
+
+    def __len__(self):
+        return len(self._data)
+
+    @staticmethod
+    def key(handle):
+        """Klucz cache dla nazwy / @nazwy / linku t.me; None dla id, telefonów i zaproszeń."""
+        if not isinstance(handle, str):
+            return None
+        name, is_invite = utils.parse_username(handle.strip())
+        if not name or is_invite:
+            return None
+        return name.lower()
+
+    def get(self, handle):
+        k = self.key(handle)
+        return self._data.get(k) if k else None
+
+    def put(self, handle, entity):
+        k = self.key(handle)
+        if not k or getattr(entity, "id", None) is None:
+            return
+        self._data[k] = {
+            "id": entity.id,
+            "access_hash": getattr(entity, "access_hash", None),
+            "type": entity_type(entity),
+            "ts": int(time.time()),
+        }
+
+    def forget(self, handle):
+        k = self.key(handle)
+        if k:
+            self._data.pop(k, None)
+
+    @staticmethod
+    def input_peer(rec):
+        if rec["type"] == "user":
+            return InputPeerUser(rec["id"], rec["access_hash"] or 0)
+        if rec["type"] == "chat":
+            return InputPeerChat(rec["id"])
+        return InputPeerChannel(rec["id"], rec["access_hash"] or 0)
+
+    async def resolve(self, client, handle):
+        """Encja dla handle; z cache bez ResolveUsername, inaczej get_entity + zapis do cache."""
+        rec = self.get(handle)
+        if rec:
+            try:
+                entity = await client.get_entity(self.input_peer(rec))
+                if rec["type"] == "chat" or self.key(handle) in entity_usernames(entity):
+                    self.hits += 1
+                    return entity
+            except errors.FloodWaitError:
+                raise
+            except (ValueError, TypeError, errors.RPCError):
+                pass
+            self.forget(handle)   # nieaktualny wpis
+        self.misses += 1
+        entity = await client.get_entity(handle)
+        self.put(handle, entity)
+        return entity
+
+    def summary(self):
+        total = self.hits + self.misses
+        return f"entity cache: {self.hits}/{total} bez ResolveUsername, wpisów {len(self._data)}"
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"entities": self._data}, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
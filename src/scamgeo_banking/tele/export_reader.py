@@ -0,0 +1,125 @@
+# export_reader.py — strumieniowe czytanie eksportów Telegram Desktop (result.json)
+#
+# Zamiast json.load całego pliku: bufor stałej wielkości, w nim szukamy klucza
+# "messages": [ i dekodujemy wiadomość po wiadomości przez JSONDecoder.raw_decode
+# (parser w C), więc pamięć zależy od rozmiaru bufora i najdłuższej wiadomości,
+# a nie od rozmiaru eksportu. Obsługuje eksport jednego czatu i pełny eksport
+# konta (wiele tablic "messages" w chats.list). Daty w stałym formacie Telegrama
+# idą przez datetime.fromisoformat; dateutil tylko jako zapas.
+import json, os, re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from dateutil import parser as dateparser
+
+CHUNK = 1 << 20    # znaków czytanych naraz
+
+# klucz (nie wartość): po stringu-wartości nigdy nie stoi ":", a cudzysłowy w treści są escapowane
+_MSG_KEY = re.compile(r'"messages"\s*:\s*\[')
+_SEP = re.compile(r'[\s,]*')
+_URL_RE = re.compile(r"https?://[^\s]+")
+
+
+def iter_export_messages(path, chunk_size=CHUNK):
+    """Surowe słowniki wiadomości ze wszystkich tablic "messages" w pliku, po kolei."""
+    dec = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        buf, pos, eof, in_array = "", 0, False, False
+        while True:
+            if not in_array:
+                m = _MSG_KEY.search(buf, pos)
+                if m:
+                    pos, in_array = m.end(), True
+                    continue
+                if eof:
+                    return
+                buf, pos = buf[max(pos, len(buf) - 64):], 0   # ogon: klucz może być przecięty
+            else:
+                pos = _SEP.match(buf, pos).end()
+                if pos < len(buf):
+                    if buf[pos] == "]":
+                        pos, in_array = pos + 1, False
+                        continue
+                    try:
+                        obj, pos = dec.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        # wiadomość przecięta granicą bufora — doczytaj i spróbuj jeszcze raz
+                    else:
+                        yield obj
+                        if pos > chunk_size:
+                            buf, pos = buf[pos:], 0
+                        continue
+                elif eof:
+                    raise ValueError(f"{path}: ucięta tablica messages")
+                buf, pos = buf[pos:], 0
+            part = f.read(chunk_size)
+            eof = not part
+            buf += part
+
+
+def fast_date(s):
+    """'2024-03-01T18:22:05' (format eksportu) bez dateutil; inne formaty przez dateutil."""
+    if not s:
+        return None
+    try:
+        return datetime.fromisoformat(s)
+    except (TypeError, ValueError):
+        return dateparser.parse(s)
+
+
+def message_record(m):
+    """Lekki rekord {id, date, text, urls, author} (jak dawne parse_telegram_export) albo None."""
+    if m.get("type") != "message":
+        return None
+    raw = m.get("text")
+    urls = []
+    if isinstance(raw, list):
+        # Telegram sometimes gives rich pieces; join text items
+        parts = []
+        for part in raw:
+            if isinstance(part, str):
+                parts.append(part)
+            elif isinstance(part, dict):
+                parts.append(part.get("text", ""))
+                if part.get("type") == "link":
+                    urls.append(part.get("text"))
+        txt = "".join(parts)
+    else:
+        txt = raw or ""
+    if "://" in txt:
+        urls += _URL_RE.findall(txt)
+    return {"id": m.get("id"), "date": fast_date(m.get("date")), "text": txt,
+            "urls": list(set(urls)), "author": m.get("from_id") or m.get("from")}
+
+
+def iter_telegram_export(path, chunk_size=CHUNK):
+    """Strumień rekordów wiadomości z result.json (stała pamięć)."""
+    for m in iter_export_messages(path, chunk_size):
+        r = message_record(m)
+        if r is not None:
+            yield r
+
+
+def export_files(path):
+    """Plik -> [plik]; katalog -> wszystkie result*.json w drzewie (posortowane)."""
+    p = Path(path)
+    if p.is_dir():
+        return sorted(str(x) for x in p.rglob("result*.json"))
+    return [str(p)]
+
+
+def map_exports(paths, fn, workers=None):
+    """
+    fn(ścieżka) dla każdego eksportu, równolegle w puli procesów (workers=None ->
+    os.cpu_count()); fn powinna zwracać mały wynik (agregat), nie listę rekordów.
+    Zwraca [(ścieżka, wynik)] w kolejności wejścia.
+    """
+    paths = list(paths)
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        return [(p, fn(p)) for p in paths]
+    with ProcessPoolExecutor(workers) as ex:
+        return list(zip(paths, ex.map(fn, paths)))
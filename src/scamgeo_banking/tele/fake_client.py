@@ -0,0 +1,328 @@
+# fake_client.py — offline zastępca TelegramClient do testów obciążeniowych scraperów
+#
+# Wybór w config.json: "telegram_backend": "fake" (+ opcje w "fake_telegram")
+# albo TG_BACKEND=fake — zob. session_pool.new_client. Obsługuje to, czego używają
+# tg_deep_scrape, tg_admin_dump, tg_crawl i telegram.fetch_messages_live:
+# get_entity, iter_messages, iter_participants, download_media, wywołania
+# JoinChannel / GetFullChannel / GetHistory / GetMessages, a dla tele/monitor
+# add_event_handler + run_until_disconnected (publish() doręcza nowe wiadomości).
+#
+# Świat jest deterministyczny: kanał i wiadomość powstają z (seed, kanał, id) przy
+# każdym odczycie, więc nic nie siedzi w pamięci, a dwa przebiegi widzą to samo.
+# Koszty jak w prawdziwym API: każde wywołanie (także strona historii po 100
+# wiadomości) czeka `latency` ± `jitter`, a co `flood_every`-te wywołanie konta
+# kończy się FloodWaitError(`flood_seconds`). access_hash zależy od sesji —
+# encja z innego konta daje ChannelInvalidError, a zdjęcie — FileReferenceInvalidError,
+# jak naprawdę.
+import asyncio, functools, random, zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from telethon import errors, utils
+from telethon.tl.types import (
+    Channel, User, ChatPhotoEmpty, ChannelParticipantCreator, ChannelParticipantAdmin,
+    ChatAdminRights, MessageEntityMention, MessageEntityUrl,
+)
+
+CHANNEL_ID_BASE = 1_000_000
+USER_ID_BASE = 5_000_000
+PAGE = 100                     # wiadomości na jedno wywołanie GetHistory
+WORLD_KEYS = ("channels", "messages", "seed", "admins", "photo_rate")
+_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_DOMAINS = ("bonus-pay", "eu-invest", "crypto-gain", "fast-loan", "bank-verify")
+_WORDS = ("Zarobek", "dziennie", "bez ryzyka", "napisz", "wypłata", "dziś", "bonus", "Aufgabe", "Gewinn", "sofort")
+
+
+def _iban(rnd):
+    """Poprawny (mod-97) niemiecki IBAN."""
+    bban = "".join(str(rnd.randrange(10)) for _ in range(18))
+    num = int("".join(str(int(c, 36)) for c in bban + "DE00"))
+    return f"DE{98 - num % 97:02d}{bban}"
+
+
+def _syncable(fn):
+    # jak telethon.sync: bez działającej pętli wywołanie wykonuje się od razu
+    @functools.wraps(fn)
+    def wrapper(*a, **k):
+        coro = fn(*a, **k)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        return coro
+    return wrapper
+
+
+class FakeMessage:
+    __slots__ = ("id", "date", "message", "entities", "sender_id", "reply_to_msg_id", "views", "photo", "document", "media")
+
+    def __init__(self, **kw):
+        for k in self.__slots__:
+            setattr(self, k, kw.get(k))
+
+    @property
+    def raw_text(self):
+        return self.message
+
+
+class FakeWorld:
+    """Syntetyczne kanały fake_chan_00000..., ich admini i wiadomości z IOC."""
+
+    def __init__(self, channels=100, messages=1000, seed=0, admins=3, photo_rate=0.05):
+        self.n = channels
+        self.messages = messages
+        self.seed = seed
+        self.admins = admins
+        self.photo_rate = photo_rate
+        self.extra = 0   # wiadomości dopisane przez advance()
+
+    def advance(self, n):
+        """Każdy kanał dostaje n nowych wiadomości (przebieg przyrostowy)."""
+        self.extra += n
+
+    @staticmethod
+    def handle(i):
+        return f"fake_chan_{i:05d}"
+
+    def handles(self):
+        return [self.handle(i) for i in range(self.n)]
+
+    def index(self, handle):
+        name = (utils.parse_username(handle or "")[0] or "").lower()
+        if name.startswith("fake_chan_") and name[10:].isdigit() and int(name[10:]) < self.n:
+            return int(name[10:])
+        return None
+
+    def top_id(self, i):
+        return self.messages + self.extra
+
+    def linked(self, i):
+        return (i * 7 + 1) % self.n if i % 3 == 0 and self.n > 1 else None
+
+    def channel(self, i, session):
+        cid = CHANNEL_ID_BASE + i
+        return Channel(id=cid, title=f"Fake kanał {i}", photo=ChatPhotoEmpty(), date=_START,
+                       broadcast=i % 2 == 0, megagroup=i % 2 == 1, scam=i % 11 == 0,
+                       access_hash=zlib.crc32(f"{session}:{cid}".encode()), username=self.handle(i))
+
+    def user(self, i, k, session):
+        uid = USER_ID_BASE + i * 100 + k
+        u = User(id=uid, first_name=f"Admin {k}", username=f"fake_admin_{i}_{k}",
+                 access_hash=zlib.crc32(f"{session}:{uid}".encode()))
+        rights = ChatAdminRights()
+        u.participant = ChannelParticipantCreator(user_id=uid, admin_rights=rights) if k == 0 else \
+            ChannelParticipantAdmin(user_id=uid, promoted_by=uid, date=_START, admin_rights=rights)
+        return u
+
+    def about(self, i):
+        return f"Kanał {i}. Kontakt: @fake_admin_{i}_0 | https://{_DOMAINS[i % len(_DOMAINS)]}-{i}.example/start"
+
+    def message(self, i, mid, session):
+        rnd = random.Random(f"{self.seed}:{i}:{mid}")
+        parts = [" ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(3, 8)))]
+        roll = rnd.random()
+        if roll < 0.3:
+            parts.append(f"https://{rnd.choice(_DOMAINS)}-{rnd.randrange(50)}.example/p/{mid}")
+        elif roll < 0.4:
+            parts.append(f"IBAN {_iban(rnd)}")
+        elif roll < 0.5:
+            parts.append(f"pisz do @fake_admin_{i}_{rnd.randrange(self.admins)}")
+        elif roll < 0.6 and self.n > 1:
+            parts.append(f"t.me/{self.handle(rnd.randrange(self.n))}")
+        text = " ".join(parts)
+        ents = []
+        for token in text.split(" "):
+            if token.startswith("@"):
+                ents.append(MessageEntityMention(offset=text.index(token), length=len(token)))
+            elif token.startswith("https://"):
+                ents.append(MessageEntityUrl(offset=text.index(token), length=len(token)))
+        photo = None
+        if rnd.random() < self.photo_rate:
+            # mała pula zdjęć = reposty tych samych banerów
+            pid = rnd.randrange(20)
+            photo = SimpleNamespace(id=9_000_000 + pid, sizes=[SimpleNamespace(size=40_000 + pid)],
+                                    access_hash=zlib.crc32(f"{session}:{9_000_000 + pid}".encode()))
+        return FakeMessage(
+            id=mid, date=_START + timedelta(minutes=mid * 7 + i), message=text, entities=ents,
+            sender_id=USER_ID_BASE + i * 100 + rnd.randrange(self.admins), reply_to_msg_id=None,
+            views=rnd.randrange(50, 5000), photo=photo, media=photo,
+        )
+
+
+class FakeTelegramClient:
+    def __init__(self, session="fake", api_id=None, api_hash=None, world=None,
+                 latency=0.0, jitter=0.0, flood_every=0, flood_seconds=5, **world_opts):
+        self.session = str(session)
+        self.world = world or FakeWorld(**{k: v for k, v in world_opts.items() if k in WORLD_KEYS})
+        self.latency = latency
+        self.jitter = jitter
+        self.flood_every = flood_every
+        self.flood_seconds = flood_seconds
+        self.calls = Counter()
+        self._n = 0
+        self._rnd = random.Random(self.session)
+        self._handlers = []
+        self._disconnected = None
+
+    async def _api(self, kind):
+        self._n += 1
+        self.calls[kind] += 1
+        if self.flood_every and self._n % self.flood_every == 0:
+            self.calls["flood_wait"] += 1
+            raise errors.FloodWaitError(request=None, capture=self.flood_seconds)
+        delay = self.latency + (self._rnd.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        await asyncio.sleep(max(delay, 0.0))
+
+    # ─── połączenie ────────────────────────────────────────────────────────────
+
+    @_syncable
+    async def start(self, *a, **k):
+        return self
+
+    @_syncable
+    async def connect(self):
+        return True
+
+    @_syncable
+    async def disconnect(self):
+        if self._disconnected is not None:
+            self._disconnected.set()
+
+    def is_connected(self):
+        return True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    @_syncable
+    async def get_me(self):
+        return User(id=USER_ID_BASE - 1, is_self=True, first_name=f"fake:{self.session}")
+
+    # ─── aktualizacje ──────────────────────────────────────────────────────────
+
+    def add_event_handler(self, callback, event=None):
+        self._handlers.append(callback)
+
+    async def run_until_disconnected(self):
+        if self._disconnected is None:
+            self._disconnected = asyncio.Event()
+        await self._disconnected.wait()
+
+    async def publish(self, n=1):
+        """n nowych wiadomości w każdym kanale świata, doręczonych handlerom jak NewMessage."""
+        self.world.advance(n)
+        for i in range(self.world.n):
+            peer = utils.get_peer_id(self.world.channel(i, self.session))
+            top = self.world.top_id(i)
+            for mid in range(top - n + 1, top + 1):
+                msg = self.world.message(i, mid, self.session)
+                msg.date = datetime.now(timezone.utc)   # świeża wiadomość: opóźnienie wykrycia mierzalne
+                event = SimpleNamespace(chat_id=peer, message=msg)
+                for cb in self._handlers:
+                    await cb(event)
+
+    # ─── encje ─────────────────────────────────────────────────────────────────
+
+    def _channel_index(self, entity):
+        """Indeks kanału dla encji/InputPeer; obcy access_hash -> ChannelInvalidError."""
+        i = getattr(entity, "channel_id", None) or getattr(entity, "id", None)
+        i = (i or 0) - CHANNEL_ID_BASE
+        if not 0 <= i < self.world.n:
+            raise errors.ChannelInvalidError(request=None)
+        if getattr(entity, "access_hash", None) != self.world.channel(i, self.session).access_hash:
+            raise errors.ChannelInvalidError(request=None)
+        return i
+
+    def _index_any(self, x):
+        if isinstance(x, str):
+            i = self.world.index(x)
+            if i is None:
+                raise ValueError(f'No user has "{x}" as username')
+            return i
+        return self._channel_index(x)
+
+    @_syncable
+    async def get_entity(self, x):
+        if isinstance(x, str):
+            await self._api("resolve")
+            i = self.world.index(x)
+            if i is not None:
+                return self.world.channel(i, self.session)
+            name = (utils.parse_username(x)[0] or "").lower()
+            if name.startswith("fake_admin_"):
+                ci, k = (int(p) for p in name[11:].split("_")[:2])
+                return self.world.user(ci, k, self.session)
+            raise ValueError(f'No user has "{x}" as username')
+        await self._api("get_entity")
+        if isinstance(x, int):
+            if 0 <= x - CHANNEL_ID_BASE < self.world.n:
+                return self.world.channel(x - CHANNEL_ID_BASE, self.session)
+            raise ValueError(f"Could not find the input entity for {x}")
+        return self.world.channel(self._channel_index(x), self.session)
+
+    async def iter_messages(self, entity, limit=None, offset_id=0, min_id=0, reverse=False, **kw):
+        i = self._channel_index(entity)
+        top = self.world.top_id(i)
+        if reverse:
+            # od najstarszej; jak w Telethonie offset_id jest wtedy dolną granicą
+            lo = max(min_id, offset_id)
+            ids = range(lo + 1, (top if limit is None else min(top, lo + limit)) + 1)
+        else:
+            start = min(offset_id - 1, top) if offset_id else top
+            ids = range(start, max(min_id, start - limit if limit is not None else 0), -1)
+        for n, mid in enumerate(ids):
+            if n % PAGE == 0:
+                await self._api("history")
+            yield self.world.message(i, mid, self.session)
+
+    async def iter_participants(self, entity, filter=None, aggressive=False, **kw):
+        i = self._channel_index(entity)
+        await self._api("participants")
+        for k in range(self.world.admins):
+            yield self.world.user(i, k, self.session)
+
+    @_syncable
+    async def download_media(self, msg, file=None, **kw):
+        await self._api("download")
+        media = getattr(msg, "photo", None) or getattr(msg, "document", None)
+        if media is None:
+            return None
+        if getattr(media, "access_hash", None) != zlib.crc32(f"{self.session}:{media.id}".encode()):
+            raise errors.FileReferenceInvalidError(request=None)   # zdjęcie z wiadomości innego konta
+        blob = f"FAKEIMG:{media.id}:".encode() * 64
+        return blob if file is bytes else None
+
+    @_syncable
+    async def __call__(self, request, ordered=False):
+        name = type(request).__name__
+        if name == "JoinChannelRequest":
+            await self._api("join")
+            return SimpleNamespace(chats=[self.world.channel(self._index_any(request.channel), self.session)])
+        if name == "LeaveChannelRequest":
+            await self._api("leave")
+            return None
+        if name == "GetFullChannelRequest":
+            i = self._channel_index(request.channel)
+            await self._api("full")
+            linked = self.world.linked(i)
+            chats = [self.world.channel(i, self.session)]
+            if linked is not None:
+                chats.append(self.world.channel(linked, self.session))
+            full = SimpleNamespace(id=CHANNEL_ID_BASE + i, about=self.world.about(i), pinned_msg_id=self.world.top_id(i),
+                                   linked_chat_id=CHANNEL_ID_BASE + linked if linked is not None else None)
+            return SimpleNamespace(full_chat=full, chats=chats, users=[])
+        if name == "GetHistoryRequest":
+            i = self._channel_index(request.peer)
+            await self._api("history")
+            top = min(request.offset_id - 1, self.world.top_id(i)) if request.offset_id else self.world.top_id(i)
+            ids = range(top, max(request.min_id or 0, top - request.limit), -1)
+            return SimpleNamespace(messages=[self.world.message(i, mid, self.session) for mid in ids], chats=[], users=[])
+        if name == "GetMessagesRequest":
+            # bez peera (czaty/prywatne) — kanały fake'a tu nic nie zwracają
+            await self._api("messages")
+            return SimpleNamespace(messages=[], chats=[], users=[])
+        raise NotImplementedError(f"FakeTelegramClient: {name}")
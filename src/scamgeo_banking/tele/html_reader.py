@@ -0,0 +1,210 @@
+# html_reader.py — strumieniowe czytanie eksportów HTML Telegram Desktop (messages*.html)
+#
+# Jeden czytnik dla wszystkich skryptów (geo_linguistic_probe, extract_seeds_*):
+# wiadomość po wiadomości (autor, czas, tekst, linki) przez wszystkie pliki
+# podziału eksportu (messages.html, messages2.html, ...), bez budowania DOM-u.
+# Z lxml: etree.iterparse + czyszczenie przetworzonych elementów; bez lxml:
+# html.parser.HTMLParser karmiony kawałkami. W obu przypadkach pamięć nie zależy
+# od rozmiaru eksportu.
+#
+# Struktura eksportu: div.message.default[id=messageN] > div.body >
+#   div.from_name (brak w wiadomościach "joined" — autor jak w poprzedniej),
+#   div.date.details[title="21.10.2025 18:26:04 UTC+01:00"], div.text (<br> = nowa linia);
+#   przekazane wiadomości mają własny div.forwarded.body (ich autor jest pomijany).
+import re
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from html.parser import HTMLParser
+from pathlib import Path
+
+# miękki import — bez lxml ten sam wynik daje parser z biblioteki standardowej
+try:
+    from lxml import etree
+except Exception:
+    etree = None
+
+HtmlMessage = namedtuple("HtmlMessage", "id author timestamp text links")
+
+CHUNK = 1 << 20
+_FILE_RE = re.compile(r"^messages(\d*)\.html$")
+_TITLE_RE = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4}) (\d{1,2}):(\d{2})(?::(\d{2}))?(?: UTC([+-])(\d{2}):?(\d{2}))?")
+
+
+def export_html_files(path):
+    """messages.html (albo jego katalog) -> wszystkie pliki podziału w kolejności numerów."""
+    p = Path(path)
+    d = p if p.is_dir() else p.parent
+    files = [(int(m.group(1) or 1), f) for f in d.iterdir() if (m := _FILE_RE.match(f.name))]
+    if not files and p.is_file():
+        return [str(p)]
+    return [str(f) for _, f in sorted(files)]
+
+
+def parse_title_date(s):
+    """Atrybut title daty: '21.10.2025 18:26:04 UTC+01:00' -> datetime (z strefą, jeśli podana)."""
+    m = _TITLE_RE.search(s or "")
+    if not m:
+        return None
+    d, mo, y, h, mi, sec, sign, oh, om = m.groups()
+    tz = None
+    if sign:
+        off = timedelta(hours=int(oh), minutes=int(om))
+        tz = timezone(-off if sign == "-" else off)
+    return datetime(int(y), int(mo), int(d), int(h), int(mi), int(sec or 0), tzinfo=tz)
+
+
+def _classes(attrs):
+    return set((attrs.get("class") or "").split())
+
+
+def _is_message(cls):
+    return "message" in cls and "default" in cls
+
+
+def _link(href):
+    return href if href and "://" in href else None
+
+
+class _StdlibParser(HTMLParser):
+    """Maszyna stanów na zdarzeniach start/end/data; gotowe wiadomości trafią do self.out."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.depth = 0           # głębokość div-ów
+        self.msg = None          # bieżąca wiadomość (dict) albo None
+        self.msg_depth = 0
+        self.capture = None      # "author" | "text" — do czego idą dane
+        self.capture_depth = 0
+        self.fwd_depth = 0       # >0: jesteśmy w przekazanej wiadomości
+
+    def handle_starttag(self, tag, attrs_list):
+        attrs = dict(attrs_list)
+        if tag == "br":
+            if self.capture == "text":
+                self.msg["text"][-1] += "\n"
+            return
+        if tag == "a" and self.msg is not None:
+            href = _link(attrs.get("href"))
+            if href:
+                self.msg["links"].append(href)
+            return
+        if tag != "div":
+            return
+        self.depth += 1
+        cls = _classes(attrs)
+        if self.msg is None:
+            if _is_message(cls):
+                self.msg = {"id": attrs.get("id"), "author": None, "title": None, "text": [], "links": []}
+                self.msg_depth = self.depth
+            return
+        if "forwarded" in cls and "body" in cls and not self.fwd_depth:
+            self.fwd_depth = self.depth
+        if self.capture:
+            return
+        if "from_name" in cls and not self.fwd_depth and self.msg["author"] is None:
+            self.capture, self.capture_depth, self.msg["author"] = "author", self.depth, ""
+        elif "date" in cls and "details" in cls and not self.fwd_depth and attrs.get("title") and not self.msg["title"]:
+            self.msg["title"] = attrs["title"]
+        elif "text" in cls:
+            self.capture, self.capture_depth = "text", self.depth
+            self.msg["text"].append("")
+
+    def handle_startendtag(self, tag, attrs_list):
+        self.handle_starttag(tag, attrs_list)
+        if tag == "div":
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag != "div":
+            return
+        if self.capture and self.depth == self.capture_depth:
+            self.capture = None
+        if self.fwd_depth == self.depth:
+            self.fwd_depth = 0
+        if self.msg is not None and self.depth == self.msg_depth:
+            self.out.append(self.msg)
+            self.msg = None
+        self.depth -= 1
+
+    def handle_data(self, data):
+        if self.capture == "author":
+            self.msg["author"] += data
+        elif self.capture == "text":
+            self.msg["text"][-1] += data
+
+
+def _iter_stdlib(path, chunk_size):
+    p = _StdlibParser()
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        while True:
+            part = f.read(chunk_size)
+            if part:
+                p.feed(part)
+            else:
+                p.close()
+            yield from p.out
+            p.out = []
+            if not part:
+                return
+
+
+def _el_text(el):
+    parts = [el.text or ""]
+    for ch in el:
+        parts.append("\n" if ch.tag == "br" else _el_text(ch))
+        parts.append(ch.tail or "")
+    return "".join(parts)
+
+
+def _has(cls_name):
+    return f'contains(concat(" ", normalize-space(@class), " "), " {cls_name} ")'
+
+
+def _iter_lxml(path):
+    from_name = etree.XPath(f'./div[{_has("body")}]/div[{_has("from_name")}]')
+    date = etree.XPath(f'./div[{_has("body")}]/div[{_has("date")}][@title]/@title')
+    texts = etree.XPath(f'.//div[{_has("text")}]')
+    links = etree.XPath('.//a/@href')
+    for _, el in etree.iterparse(path, events=("end",), tag="div", html=True, encoding="utf-8", recover=True):
+        if not _is_message(_classes(el.attrib)):
+            continue
+        a = from_name(el)
+        t = date(el)
+        yield {
+            "id": el.get("id"),
+            "author": _el_text(a[0]) if a else None,
+            "title": t[0] if t else None,
+            "text": [_el_text(x) for x in texts(el)],
+            "links": [h for h in map(_link, links(el)) if h],
+        }
+        # przetworzone wiadomości wylatują z drzewa — stała pamięć
+        el.clear()
+        parent = el.getparent()
+        while parent is not None and el.getprevious() is not None:
+            del parent[0]
+
+
+def iter_html_messages(path, chunk_size=CHUNK):
+    """
+    HtmlMessage(id, author, timestamp, text, links) dla każdej wiadomości eksportu
+    (wszystkie pliki messages*.html). Wiadomości "joined" dziedziczą autora.
+    """
+    author = None
+    for fn in export_html_files(path):
+        raw = _iter_lxml(fn) if etree is not None else _iter_stdlib(fn, chunk_size)
+        for m in raw:
+            if m["author"] is not None:
+                author = " ".join(m["author"].split())
+            text = "\n".join(t.strip() for t in m["text"] if t.strip())
+            yield HtmlMessage(m["id"], author or "", parse_title_date(m["title"]), text, m["links"])
+
+
+def for_each_message(path, *sinks):
+    """Jeden przebieg po eksporcie dla wielu konsumentów: każdy sink(msg) dostaje każdą wiadomość."""
+    n = 0
+    for msg in iter_html_messages(path):
+        n += 1
+        for sink in sinks:
+            sink(msg)
+    return n
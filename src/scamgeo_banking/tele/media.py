@@ -0,0 +1,186 @@
+# media.py — pobieranie zdjęć / obrazów z kanałów TG pod OCR (opcjonalny etap tg_deep_scrape)
+#
+# Deduplikacja w dwóch krokach:
+#   1) id pliku Telegrama (photo.id / document.id) — repost tego samego pliku nie
+#      jest w ogóle pobierany, wystarczy wpis w manifeście;
+#   2) sha256 treści — ten sam obraz wgrany od nowa (inne id) zapisujemy raz.
+# Pliki: <root>/<sha[:2]>/<sha><ext>; manifest.jsonl: jedna linia na wiadomość
+# (kanał, msg_id, id pliku, sha256, ścieżka), więc OCR obrabia każdy sha256 raz,
+# a wynik wraca do wszystkich wiadomości z tym obrazem.
+import asyncio, hashlib, json, mimetypes, os, time
+from collections import Counter
+from pathlib import Path
+
+from telethon import utils
+from telethon.errors import FloodWaitError
+from telethon.tl.types import DocumentAttributeSticker
+
+DEFAULT_ROOT = Path("scam_hunter_out") / "media"
+MEDIA_CONCURRENCY = int(os.getenv("TG_MEDIA_CONCURRENCY", "4"))
+MAX_PHOTO_BYTES = int(os.getenv("TG_MEDIA_MAX_PHOTO_MB", "10")) * 1024 * 1024
+MAX_DOC_BYTES = int(os.getenv("TG_MEDIA_MAX_DOC_MB", "20")) * 1024 * 1024
+MAX_FLOOD_WAIT = 900   # s; dłuższy FloodWait -> plik pominięty w tym przebiegu
+
+
+def _photo_bytes(photo):
+    """Rozmiar największego wariantu zdjęcia (ten pobiera download_media)."""
+    best = 0
+    for s in getattr(photo, "sizes", None) or ():
+        n = getattr(s, "size", None)
+        if n is None:
+            n = max(getattr(s, "sizes", None) or [len(getattr(s, "bytes", b"") or b"")])
+        best = max(best, n)
+    return best
+
+
+def media_info(msg):
+    """(rodzaj, id pliku, rozmiar, mime) dla zdjęcia albo dokumentu-obrazu; inaczej None."""
+    photo = getattr(msg, "photo", None)
+    if photo is not None and getattr(photo, "id", None) is not None:
+        return "photo", photo.id, _photo_bytes(photo), "image/jpeg"
+    doc = getattr(msg, "document", None)
+    if doc is None or getattr(doc, "id", None) is None:
+        return None
+    mime = getattr(doc, "mime_type", None) or ""
+    if not mime.startswith("image/"):
+        return None
+    if any(isinstance(a, DocumentAttributeSticker) for a in getattr(doc, "attributes", None) or ()):
+        return None   # naklejki to nie zrzuty ekranu
+    return "document", doc.id, getattr(doc, "size", 0) or 0, mime
+
+
+def _ext(msg, kind, mime):
+    if kind == "photo":
+        return ".jpg"
+    try:
+        ext = utils.get_extension(msg.document)
+    except Exception:
+        ext = ""
+    return ext or mimetypes.guess_extension(mime) or ".bin"
+
+
+class MediaStore:
+    def __init__(self, root=DEFAULT_ROOT, concurrency=None, max_photo_bytes=MAX_PHOTO_BYTES, max_doc_bytes=MAX_DOC_BYTES):
+        self.root = Path(root)
+        self.manifest = self.root / "manifest.jsonl"
+        self.caps = {"photo": max_photo_bytes, "document": max_doc_bytes}
+        self.sem = asyncio.Semaphore(concurrency or MEDIA_CONCURRENCY)
+        self.stats = Counter()
+        self._by_file = {}     # "photo:123" -> sha256
+        self._by_sha = {}      # sha256 -> ścieżka względna
+        self._refs = set()     # (kanał, msg_id) już w manifeście
+        self._pending = {}     # "photo:123" -> Future(sha256) — ten sam plik pobierany raz naraz
+        if self.manifest.exists():
+            with open(self.manifest, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        r = json.loads(line)
+                    except ValueError:
+                        break   # ucięta ostatnia linia po przerwanym zapisie
+                    self._by_file[r["file_id"]] = r["sha256"]
+                    self._by_sha[r["sha256"]] = r["path"]
+                    self._refs.add((r["channel"], r["msg_id"]))
+
+    def __len__(self):
+        return len(self._by_sha)
+
+    def wants(self, msg):
+        """Czy wiadomość ma obraz w limicie rozmiaru (do zebrania przez scraper)."""
+        info = media_info(msg)
+        return info is not None and info[2] <= self.caps[info[0]]
+
+    def _write(self, rec):
+        with open(self.manifest, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    async def _download(self, client, msg, kind, mime):
+        async with self.sem:
+            for _ in range(2):
+                try:
+                    data = await client.download_media(msg, file=bytes)
+                    break
+                except FloodWaitError as e:
+                    if e.seconds > MAX_FLOOD_WAIT:
+                        raise
+                    await asyncio.sleep(e.seconds)
+            else:
+                return None
+        if not data:
+            return None
+        sha = hashlib.sha256(data).hexdigest()
+        if sha in self._by_sha:
+            self.stats["dup_sha256"] += 1
+            return sha
+        rel = f"{sha[:2]}/{sha}{_ext(msg, kind, mime)}"
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        self._by_sha[sha] = rel
+        self.stats["stored"] += 1
+        self.stats["bytes"] += len(data)
+        return sha
+
+    async def fetch(self, client, channel, msg):
+        """Pobiera (albo deduplikuje) obraz wiadomości i dopisuje ją do manifestu; zwraca sha256 albo None."""
+        info = media_info(msg)
+        if info is None:
+            return None
+        kind, fid, size, mime = info
+        if size > self.caps[kind]:
+            self.stats["too_big"] += 1
+            return None
+        if (channel, msg.id) in self._refs:
+            return self._by_file.get(f"{kind}:{fid}")
+        key = f"{kind}:{fid}"
+        sha = self._by_file.get(key)
+        if sha is not None:
+            self.stats["dup_file_id"] += 1
+        elif key in self._pending:
+            self.stats["dup_file_id"] += 1
+            sha = await self._pending[key]
+        else:
+            fut = self._pending[key] = asyncio.get_running_loop().create_future()
+            try:
+                sha = await self._download(client, msg, kind, mime)
+            except Exception as e:
+                self.stats["errors"] += 1
+                sha = None
+                print(f"[MEDIA] {channel}/{msg.id}: {e!r}")
+            finally:
+                fut.set_result(sha)
+                del self._pending[key]
+            if sha is not None:
+                self._by_file[key] = sha
+        if sha is None:
+            return None
+        self._refs.add((channel, msg.id))
+        self._write({
+            "channel": channel, "msg_id": msg.id, "date": str(getattr(msg, "date", None) or ""),
+            "file_id": key, "mime": mime, "size": size, "sha256": sha, "path": self._by_sha[sha],
+            "ts": int(time.time()),
+        })
+        return sha
+
+    async def fetch_all(self, client, channel, msgs):
+        """Wszystkie obrazy kanału naraz (limit współbieżności wspólny dla wszystkich kanałów)."""
+        return await asyncio.gather(*(self.fetch(client, channel, m) for m in msgs))
+
+    def summary(self):
+        s = self.stats
+        return (f"media: +{s['stored']} plików ({s['bytes'] / 1e6:.1f} MB), duplikaty id={s['dup_file_id']} "
+                f"sha256={s['dup_sha256']}, za duże={s['too_big']}, błędy={s['errors']}, razem unikalnych {len(self)}")
+
+
+def iter_manifest(root=DEFAULT_ROOT):
+    """Wpisy manifestu (kanał, wiadomość -> sha256, ścieżka)."""
+    p = Path(root) / "manifest.jsonl"
+    if not p.exists():
+        return
+    with open(p, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
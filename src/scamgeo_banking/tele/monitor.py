@@ -0,0 +1,227 @@
+# monitor.py — tryb ciągły: nowe wiadomości z kanałów seedów przez aktualizacje Telethona
+#
+# Zamiast watchdoga (co 15 min trzy procesy, każdy od nowa loguje sesję i
+# przechodzi wszystkie kanały) jeden proces trzyma sesję i dostaje
+# events.NewMessage dla seedów. Każda wiadomość od razu przechodzi ekstrakcję
+# (tg_deep_scrape.extract_cached) i scoring (scoring/rules); trafienia i rekordy
+# archiwum czekają w buforze i są zapisywane partiami — co `flush_secs` albo po
+# `flush_every` wiadomościach: ARCHIVE, stan kanału w bazie (high-water mark +
+# IOC jak w deep scrape) i scam_hunter_out/monitor_hits.jsonl.
+#
+# Po starcie: najpierw subskrypcja, potem nadrabianie od last_msg_id z bazy
+# w przód (od najstarszej, partiami po `catchup` wiadomości, każda zapisana przed
+# następną) — nic nie ginie między przebiegami.
+# Ustawienia: configs/scanner.yaml, sekcja telegram_monitor.
+import asyncio, json, time
+from collections import defaultdict
+from pathlib import Path
+
+import yaml
+from sqlmodel import Session
+from telethon import events, utils
+
+from scamgeo_banking.db import init_db, load_channel_state, save_channel_state
+from scamgeo_banking.scoring.rules import RuleEngine, default_rules
+from scamgeo_banking.tele import tg_deep_scrape as ds
+from scamgeo_banking.tele.session_pool import load_accounts, new_client
+
+SCANNER_YAML = "configs/scanner.yaml"
+DEFAULTS = {"flush_secs": 5.0, "flush_every": 200, "catchup": 200}
+HITS = ds.OUTDIR / "monitor_hits.jsonl"
+PAYMENT_IOCS = ("iban", "btc", "eth", "trc20")
+
+
+def load_settings(path=SCANNER_YAML):
+    cfg = dict(DEFAULTS)
+    p = Path(path)
+    if p.exists():
+        y = yaml.safe_load(p.read_text(encoding="utf-8-sig")) or {}
+        cfg.update({k: v for k, v in (y.get("telegram_monitor") or {}).items() if k in DEFAULTS})
+    return cfg
+
+
+def _lag(date):
+    return max(0.0, time.time() - date.timestamp()) if date is not None else 0.0
+
+
+class Monitor:
+    def __init__(self, engine, settings=None, archive=None, hits_path=HITS, rules=None):
+        self.engine = engine
+        self.cfg = {**DEFAULTS, **(settings or {})}
+        self.archive = archive if archive is not None else ds.ARCHIVE
+        self.hits_path = Path(hits_path)
+        self.rules = rules or RuleEngine(default_rules())
+        self.chats = {}                    # peer id -> handle
+        self.titles = {}
+        self.first_live = {}               # handle -> id pierwszej wiadomości z aktualizacji (koniec nadrabiania)
+        self._buf = defaultdict(dict)      # handle -> {msg_id: (rekord, wynik scoringu)}
+        self._pending = 0
+        self._lags = []
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.stats = defaultdict(int)
+
+    # ─── wiadomości ────────────────────────────────────────────────────────────
+
+    def handle(self, handle, msg, buf=None):
+        """Ekstrakcja + scoring jednej wiadomości; wynik czeka w buforze (wspólnym albo `buf`) na zapis."""
+        text = msg.raw_text or getattr(msg, "message", None)
+        target = self._buf if buf is None else buf
+        if not text or msg.id in target[handle]:
+            return None
+        urls, ibans, btc, eth, trc20 = ds.extract_cached(text)
+        rec = ds.message_record(msg, text, urls, ibans, btc, eth, trc20)
+        score = self.rules.score(text, urls[0] if urls else None)
+        target[handle][msg.id] = (rec, score)
+        if buf is None:   # opóźnienie liczy się dla aktualizacji; strony nadrabiania są z definicji stare
+            self._lags.append(_lag(msg.date))
+            self._pending += 1
+            if self._pending >= self.cfg["flush_every"]:
+                self._wake.set()
+        return score
+
+    async def _on_message(self, event):
+        handle = self.chats.get(event.chat_id)
+        if handle is not None:
+            self.first_live.setdefault(handle, event.message.id)
+            self.handle(handle, event.message)
+
+    # ─── zapis partiami ────────────────────────────────────────────────────────
+
+    def _is_hit(self, rec, score):
+        return score["label"] != "unknown" or any(k in rec["iocs"] for k in PAYMENT_IOCS)
+
+    def _write(self, batch):
+        """Jedna partia: archiwum, stan kanałów w bazie i trafienia (w wątku — nie blokuje aktualizacji)."""
+        hits = []
+        with Session(self.engine) as s:
+            for handle, items in batch.items():
+                recs = [rec for rec, _ in items.values()]
+                self.stats["archived"] += self.archive.append(handle, recs)
+                data = ds._new_result(handle)
+                data["title"] = self.titles.get(handle)
+                for rec, score in sorted(items.values(), key=lambda x: -x[0]["id"]):
+                    for key, k in (("urls", "url"), ("ibans", "iban"), ("btc", "btc"), ("eth", "eth"), ("trc20", "trc20")):
+                        data[key].extend(rec["iocs"].get(k, ()))
+                    if rec["iocs"]:
+                        data["samples"].append({"id": rec["id"], "date": str(rec["date"]), "text": rec["text"].replace("\n", " ")[:280]})
+                    if self._is_hit(rec, score):
+                        hits.append({"channel": handle, "msg_id": rec["id"], "date": str(rec["date"]), "score": score["score"],
+                                     "label": score["label"], "iocs": rec["iocs"], "text": rec["text"][:280],
+                                     "rules": [h["rule"] for h in score["hits"]], "ts": int(time.time())})
+                ds.finalize_result(data)
+                data.update(ok=True, _max_id=max(items), _new=len(items))
+                _, state = ds.merge_channel_state(load_channel_state(s, handle), data)
+                if state is not None:
+                    save_channel_state(s, handle, state)
+        if hits:
+            with open(self.hits_path, "a", encoding="utf-8") as f:
+                for h in hits:
+                    f.write(json.dumps(h, ensure_ascii=False) + "\n")
+        self.stats["hits"] += len(hits)
+        return hits
+
+    async def flush(self, batch=None):
+        """Zapisuje wspólny bufor (albo podaną partię, np. stronę nadrabiania)."""
+        async with self._lock:
+            lags = []
+            if batch is None:
+                batch, self._buf = self._buf, defaultdict(dict)
+                lags, self._lags = self._lags, []
+                self._pending = 0
+                self._wake.clear()
+            batch = {h: items for h, items in batch.items() if items}
+            if not batch:
+                return []
+            n = sum(len(items) for items in batch.values())
+            hits = await asyncio.to_thread(self._write, batch)
+            ds.TEXT_CACHE.save()   # w pętli: handle() dopisuje do cache równolegle z wątkiem zapisu
+            self.stats["messages"] += n
+            print(f"[MONITOR] +{n} wiadomości z {len(batch)} kanałów, trafienia={len(hits)}, "
+                  f"opóźnienie max={max(lags, default=0.0):.1f}s")
+            return hits
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.cfg["flush_secs"])
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[MONITOR] zapis partii nieudany: {e!r}")
+
+    # ─── przebieg ──────────────────────────────────────────────────────────────
+
+    async def subscribe(self, client, handles):
+        """Rozwiązuje seedy (z dołączeniem do publicznych) i rejestruje handler NewMessage."""
+        entities = []
+        for h in handles:
+            try:
+                entity, _ = await ds.get_or_join(client, h)
+            except Exception as e:
+                print(f"[MONITOR] {h}: {e!r}")
+                continue
+            if entity is None:
+                print(f"[MONITOR] {h}: kanał niedostępny — pominięty")
+                continue
+            if getattr(entity, "chats", None):   # JoinChannelRequest zwraca Updates
+                entity = entity.chats[0]
+            self.chats[utils.get_peer_id(entity)] = h
+            self.titles[h] = getattr(entity, "title", None)
+            entities.append((h, entity))
+        client.add_event_handler(self._on_message, events.NewMessage(chats=[e for _, e in entities]))
+        return entities
+
+    async def catch_up(self, client, entities):
+        """Wiadomości, które przyszły, gdy monitor nie działał (od last_msg_id z bazy)."""
+        with Session(self.engine) as s:
+            last = {h: (load_channel_state(s, h) or {}).get("last_msg_id", 0) for h, _ in entities}
+        page = self.cfg["catchup"]
+        for h, entity in entities:
+            min_id = last[h]
+            if not min_id:
+                continue   # nowy kanał: historię bierze deep scrape, monitor tylko nowe
+            # reverse=True: od najstarszej nieprzetworzonej, więc high-water mark nie przeskakuje luki;
+            # strony zapisywane osobno — nowe wiadomości z aktualizacji czekają we wspólnym buforze,
+            # aż archiwum (append-only, rosnąco po id) dojdzie do nich
+            done = False
+            while not done:
+                buf, n = defaultdict(dict), 0
+                async for msg in client.iter_messages(entity, limit=page, min_id=min_id, reverse=True):
+                    if msg.id >= self.first_live.get(h, msg.id + 1):
+                        done = True   # dalej są już wiadomości z aktualizacji
+                        break
+                    self.handle(h, msg, buf)
+                    min_id, n = max(min_id, msg.id), n + 1
+                await self.flush(buf)
+                done = done or n < page
+
+    async def run(self, client, handles):
+        entities = await self.subscribe(client, handles)
+        print(f"[MONITOR] subskrypcja {len(entities)}/{len(handles)} kanałów")
+        await self.catch_up(client, entities)
+        flusher = asyncio.create_task(self._flusher())
+        try:
+            await client.run_until_disconnected()
+        finally:
+            flusher.cancel()
+            await self.flush()
+
+
+async def main_async(settings=None):
+    _, _, session_name, seeds = ds.load_config()
+    accounts = load_accounts(default_session=session_name)
+    if not accounts:
+        raise SystemExit("config.json: brak danych konta Telegram (telegram / telegram_accounts)")
+    acc = accounts[0]   # aktualizacje przychodzą na konto, które jest w kanałach
+    client = new_client(acc["session_name"], acc["api_id"], acc["api_hash"])
+    await client.start()
+    handles = [s.lstrip("@") for s in seeds if isinstance(s, str) and len(s) >= 5]
+    monitor = Monitor(init_db(), {**load_settings(), **(settings or {})})
+    try:
+        await monitor.run(client, handles)
+    finally:
+        await client.disconnect()
+        print(f"[MONITOR] koniec: {dict(monitor.stats)}")
@@ -0,0 +1,205 @@
+# session_pool.py — pula kont Telegrama: seedy dzielone między sesje, failover przy FloodWait
+#
+# Każde konto ma własne limity API, więc kilka sesji = kilka razy większa
+# przepustowość. Seed ma stałego "właściciela" (crc32 nazwy % liczba kont) —
+# między uruchomieniami trafia na to samo konto (sesja i cache encji znają już
+# jego access_hash). Gdy właściciel jest w FloodWait albo wyczerpał swój limit
+# zadań, zadanie bierze najmniej obciążone wolne konto; gdy wszystkie stoją,
+# czekamy do końca najkrótszego FloodWait.
+#
+# config.json:
+#   "telegram_accounts": [{"api_id": 1, "api_hash": "...", "session_name": "konto1"}, ...]
+# albo dotychczasowe pojedyncze "telegram": {...} / api_id w korzeniu.
+#   "telegram_backend": "fake" (albo TG_BACKEND=fake) — klienci z tele/fake_client
+#   (offline, opcje w "fake_telegram"); new_client() wybiera backend dla wszystkich narzędzi.
+import asyncio, json, os, time, zlib
+from collections import Counter
+from contextlib import asynccontextmanager
+
+
+CONFIG = "config.json"
+PER_CLIENT = int(os.getenv("TG_POOL_PER_CLIENT", "4"))           # zadań naraz na konto
+MIN_INTERVAL = float(os.getenv("TG_POOL_MIN_INTERVAL", "0.5"))   # s między startami zadań na koncie
+
+
+def _account(d, default_session):
+    return {"api_id": int(d["api_id"]), "api_hash": d["api_hash"],
+            "session_name": d.get("session_name") or default_session}
+
+
+def load_accounts(path=CONFIG, default_session="session"):
+    """Lista kont {api_id, api_hash, session_name} z config.json (pusta, gdy brak pliku/kluczy)."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    if cfg.get("telegram_accounts"):
+        out = [_account(a, f"{default_session}{i + 1}") for i, a in enumerate(cfg["telegram_accounts"])]
+    elif "telegram" in cfg:
+        out = [_account(cfg["telegram"], default_session)]
+    elif "api_id" in cfg:
+        out = [_account(cfg, default_session)]
+    else:
+        return []
+    names = [a["session_name"] for a in out]
+    if len(set(names)) != len(names):
+        raise ValueError("telegram_accounts: session_name musi być unikalny dla każdego konta")
+    return out
+
+
+def telegram_backend(path=CONFIG):
+    """("telethon" | "fake", opcje fake_telegram) z TG_BACKEND albo config.json."""
+    cfg = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    backend = os.getenv("TG_BACKEND") or cfg.get("telegram_backend") or "telethon"
+    if backend not in ("telethon", "fake"):
+        raise ValueError(f"telegram_backend: nieznany backend {backend!r} (telethon | fake)")
+    return backend, cfg.get("fake_telegram") or {}
+
+
+def new_client(session_name, api_id, api_hash, path=CONFIG):
+    """TelegramClient albo FakeTelegramClient — zależnie od konfiguracji backendu."""
+    backend, opts = telegram_backend(path)
+    if backend == "fake":
+        from scamgeo_banking.tele.fake_client import FakeTelegramClient
+        return FakeTelegramClient(session_name, api_id, api_hash, **opts)
+    from telethon import TelegramClient   # tu, nie na górze: tryb --export w telegram.py działa bez Telethona
+    return TelegramClient(session_name, api_id, api_hash)
+
+
+def owner_index(key, n):
+    """Stały numer konta dla seeda (niezależny od PYTHONHASHSEED)."""
+    return zlib.crc32((key or "").lstrip("@").lower().encode("utf-8")) % n
+
+
+class PooledClient:
+    """Klient z pulą: licznik zadań, FloodWait do `flood_until` i statystyki konta."""
+
+    def __init__(self, name, client, limit=None, min_interval=0.0):
+        self.name = name
+        self.client = client
+        self.limit = limit
+        self.min_interval = min_interval
+        self.active = 0
+        self.flood_until = 0.0
+        self.next_start = 0.0
+        self.stats = Counter()
+
+    def available(self, now):
+        return now >= self.flood_until and (self.limit is None or self.active < self.limit)
+
+
+class SessionPool:
+    def __init__(self, clients, per_client=PER_CLIENT, min_interval=MIN_INTERVAL):
+        """clients: [(nazwa, TelegramClient)]."""
+        if not clients:
+            raise ValueError("SessionPool: brak kont")
+        self.members = [PooledClient(name, c, per_client, min_interval) for name, c in clients]
+        self._cond = asyncio.Condition()
+
+    @classmethod
+    def of(cls, client):
+        """Jeden klient bez limitów puli (dotychczasowe zachowanie narzędzi)."""
+        return cls([("default", client)], per_client=None, min_interval=0.0)
+
+    @classmethod
+    def from_accounts(cls, accounts, factory=new_client, **kw):
+        return cls([(a["session_name"], factory(a["session_name"], a["api_id"], a["api_hash"])) for a in accounts], **kw)
+
+    def __len__(self):
+        return len(self.members)
+
+    async def start(self):
+        for pc in self.members:
+            await pc.client.start()
+            print(f"[POOL] {pc.name}: {await pc.client.get_me()!r}")
+
+    async def stop(self):
+        for pc in self.members:
+            await pc.client.disconnect()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # ─── harmonogram ───────────────────────────────────────────────────────────
+
+    def owner(self, key):
+        return self.members[owner_index(key, len(self.members))]
+
+    def shard(self, keys):
+        """{nazwa konta: [seedy]} — podział, od którego startuje harmonogram."""
+        out = {pc.name: [] for pc in self.members}
+        for k in keys:
+            out[self.owner(k).name].append(k)
+        return out
+
+    def _pick(self, key, now, member=None):
+        if member is not None:
+            return member if member.available(now) else None
+        pc = self.owner(key) if key is not None else None
+        if pc is not None and pc.available(now):
+            return pc
+        free = [m for m in self.members if m.available(now)]
+        return min(free, key=lambda m: (m.active, m.stats["leases"])) if free else None
+
+    def wait_time(self):
+        """Sekundy do końca najkrótszego FloodWait (0, gdy któreś konto nie czeka)."""
+        now = time.monotonic()
+        return max(0.0, min(pc.flood_until for pc in self.members) - now)
+
+    async def acquire(self, key=None, member=None):
+        """Konto dla seeda `key`; z `member` — dokładnie to konto (czeka, aż będzie wolne)."""
+        async with self._cond:
+            while True:
+                now = time.monotonic()
+                pc = self._pick(key, now, member)
+                if pc is not None:
+                    break
+                # wszystkie zajęte albo w FloodWait: budzi release() albo koniec najkrótszego FloodWait
+                ends = [m.flood_until - now for m in self.members if m.flood_until > now]
+                try:
+                    await asyncio.wait_for(self._cond.wait(), min(ends) if ends else None)
+                except asyncio.TimeoutError:
+                    pass
+            pc.active += 1
+            pc.stats["leases"] += 1
+            if key is not None and member is None and pc is not self.owner(key):
+                pc.stats["failover"] += 1
+            start = max(now, pc.next_start)
+            pc.next_start = start + pc.min_interval
+        if start > now:
+            await asyncio.sleep(start - now)   # tempo startów na koncie
+        return pc
+
+    async def release(self, pc, busy=0.0):
+        async with self._cond:
+            pc.active -= 1
+            pc.stats["busy_s"] += busy
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def lease(self, key=None, member=None):
+        """Konto dla seeda `key` na czas bloku (właściciel albo failover; `member` — to konto)."""
+        pc = await self.acquire(key, member)
+        t0 = time.monotonic()
+        try:
+            yield pc
+        finally:
+            await self.release(pc, time.monotonic() - t0)
+
+    def flood(self, pc, seconds):
+        """FloodWait na koncie: do końca kary harmonogram omija je."""
+        pc.flood_until = max(pc.flood_until, time.monotonic() + seconds)
+        pc.stats["floods"] += 1
+        pc.stats["flood_s"] += seconds
+
+    def summary(self):
+        return {pc.name: {"leases": pc.stats["leases"], "failover": pc.stats["failover"], "floods": pc.stats["floods"],
+                          "flood_s": pc.stats["flood_s"], "busy_s": round(pc.stats["busy_s"], 1)}
+                for pc in self.members}
@@ -20,36 +20,48 @@ import argparse
 import json
 import os
 import re
+import time
 from collections import Counter, defaultdict
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 
-from dateutil import parser as dateparser
-from langdetect import detect, DetectorFactory, LangDetectException
+from langdetect import DetectorFactory
 import tldextract
 
+from scamgeo_banking.detection import langid, tzinfer
+from scamgeo_banking.tele.export_reader import export_files, iter_telegram_export, map_exports
+from scamgeo_banking.tele.session_pool import load_accounts, new_client, owner_index
+
 # Optional: only used for LIVE mode
 try:
     from telethon import TelegramClient
+    from telethon.errors import FloodWaitError
     from telethon.tl.functions.users import GetFullUserRequest
     from telethon.tl.functions.messages import GetHistoryRequest
     TELETHON_OK = True
 except Exception:
     TELETHON_OK = False
 
+# Optional: country names for flags outside FLAG_COUNTRY_NAMES
+try:
+    import pycountry
+except Exception:
+    pycountry = None
+
 DetectorFactory.seed = 0  # reproducible langdetect
 
 REGIONAL_FLAG_RE = re.compile(r"[\U0001F1E6-\U0001F1FF]{2}")  # emoji flags (regional indicators)
 CURRENCY_SIGNALS = {
-    "PLN": {"patterns": [r"\bPLN\b", r"zÅ‚", r"zl"], "countries": ["Poland"]},
-    "EUR": {"patterns": [r"\bEUR\b", r"â‚¬"], "countries": ["Germany","Austria","Italy","Spain","France","Netherlands","Belgium","Portugal","Finland","Ireland","Estonia","Latvia","Lithuania","Slovakia","Slovenia","Greece","Cyprus","Luxembourg","Malta"]},
+    "PLN": {"patterns": [r"\bPLN\b", r"zł", r"zl"], "countries": ["Poland"]},
+    "EUR": {"patterns": [r"\bEUR\b", r"€"], "countries": ["Germany","Austria","Italy","Spain","France","Netherlands","Belgium","Portugal","Finland","Ireland","Estonia","Latvia","Lithuania","Slovakia","Slovenia","Greece","Cyprus","Luxembourg","Malta"]},
     "USD": {"patterns": [r"\bUSD\b", r"\$"], "countries": ["United States"]},
-    "UAH": {"patterns": [r"\bUAH\b", r"Ð³Ñ€Ð½", r"uah"], "countries": ["Ukraine"]},
-    "TRY": {"patterns": [r"\bTRY\b", r"â‚º"], "countries": ["Turkey"]},
-    "RUB": {"patterns": [r"\bRUB\b", r"â‚½", r"Ñ€ÑƒÐ±"], "countries": ["Russia"]},
+    "UAH": {"patterns": [r"\bUAH\b", r"грн", r"uah"], "countries": ["Ukraine"]},
+    "TRY": {"patterns": [r"\bTRY\b", r"₺"], "countries": ["Turkey"]},
+    "RUB": {"patterns": [r"\bRUB\b", r"₽", r"руб"], "countries": ["Russia"]},
     "RON": {"patterns": [r"\bRON\b", r"lei", r"leu"], "countries": ["Romania"]},
     "HUF": {"patterns": [r"\bHUF\b", r"Ft\b"], "countries": ["Hungary"]},
-    "CZK": {"patterns": [r"\bCZK\b", r"KÄ"], "countries": ["Czechia"]},
+    "CZK": {"patterns": [r"\bCZK\b", r"Kč"], "countries": ["Czechia"]},
 }
 
 LANG_TO_COUNTRIES = {
@@ -93,115 +105,153 @@ TLD_COUNTRY_HINTS = {
     "es": "Spain",
 }
 
+# Timezone offset â†’ map to candidate countries (coarse)
+OFFSET_TO_COUNTRIES = {
+    0: ["United Kingdom","Portugal","Ghana","Morocco"],
+    1: ["Poland","Germany","Austria","Czechia","Slovakia","Hungary","Italy","France","Spain","Netherlands","Belgium","Switzerland"],
+    2: ["Romania","Ukraine","Finland","Greece","Turkey"],
+    3: ["Russia"],
+    -5: ["United States"], -6: ["United States"], -7: ["United States"], -8: ["United States"],
+    10: ["Australia"], 11: ["Australia"], -3: ["Argentina"], -4: ["Canada"],
+}
+
 
 def detect_language(text: str) -> Optional[str]:
-    try:
-        return detect(text)
-    except LangDetectException:
-        return None
+    # cache + próg długości + wybrany backend (detection/langid)
+    return langid.detect_language(text)
 
 
 def parse_telegram_export(path: str) -> List[Dict[str, Any]]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    # Desktop export JSON has 'messages' list
-    msgs = data.get("messages", [])
-    records = []
-    for m in msgs:
-        if m.get("type") != "message":
-            continue
-        date = dateparser.parse(m.get("date"))
-        txt = ""
-        if isinstance(m.get("text"), list):
-            # Telegram sometimes gives rich pieces; join text items
-            for part in m.get("text"):
-                if isinstance(part, str):
-                    txt += part
-                elif isinstance(part, dict):
-                    txt += part.get("text", "")
-        else:
-            txt = m.get("text", "") or ""
-        urls = []
-        if isinstance(m.get("text"), list):
-            for part in m.get("text"):
-                if isinstance(part, dict) and part.get("type") == "link":
-                    urls.append(part.get("text"))
-        # Fallback: regex links
-        urls += re.findall(r"https?://[^\s]+", txt)
-        records.append({"date": date, "text": txt, "urls": list(set(urls))})
-    return records
+    # strumieniowy parser (tele/export_reader); lista tylko dla starych wywołań —
+    # duże eksporty: iter_telegram_export / export_state
+    return list(iter_telegram_export(path))
 
 
 def infer_timezone_offset(dates: List[datetime]) -> Optional[int]:
     if not dates:
         return None
-    # Convert to UTC hours
-    hours = [d.astimezone(timezone.utc).hour for d in dates]
-    # For each offset, shift hours and score awake windows
-    best_offset, best_score = None, -1
-    for off in UTC_OFFSETS:
-        score = 0
-        shifted = [((h + off) % 24) for h in hours]
-        counter = Counter(shifted)
-        for (a, b) in AWAKE_WINDOWS:
-            for h in range(a, b + 1):
-                score += counter.get(h % 24, 0)
-        if score > best_score:
-            best_score, best_offset = score, off
-    return best_offset
-
-
-def collect_language_signals(records: List[Dict[str,Any]]) -> Counter:
-    c = Counter()
+    # histogram godzin UTC + splot cykliczny z maską okien czuwania (detection/tzinfer)
+    hist = tzinfer.hour_histogram(dates)
+    return tzinfer.infer_offsets([hist], UTC_OFFSETS, AWAKE_WINDOWS)[0]
+
+
+def infer_timezone_offsets_by_author(records: List[Dict[str,Any]]) -> Dict[Any, Optional[int]]:
+    # wszyscy autorzy jednym wywołaniem: macierz (autorzy x 24) zamiast pętli po użytkownikach
+    groups = defaultdict(list)
     for r in records:
-        txt = (r.get("text") or "").strip()
-        if not txt:
-            continue
-        lang = detect_language(txt)
-        if lang:
-            c[lang] += 1
-    return c
+        if r.get("author") is not None and isinstance(r.get("date"), datetime):
+            groups[r["author"]].append(r["date"])
+    keys, hists = tzinfer.hour_histograms(groups)
+    return dict(zip(keys, tzinfer.infer_offsets(hists, UTC_OFFSETS, AWAKE_WINDOWS)))
+
+
+def collect_language_signals(
+    records: List[Dict[str,Any]],
+    per_author_cap: Optional[int] = 200,
+    workers: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> Counter:
+    # przy wielu autorach najwyżej per_author_cap wiadomości na autora (kanał albo rozmowa
+    # z jednym użytkownikiem to jeden autor — tam limit nie obowiązuje); unikalne treści wsadowo
+    if per_author_cap and len({r.get("author") for r in records if r.get("author") is not None}) > 1:
+        records = langid.sample_per_author(records, per_author_cap)
+    texts = [(r.get("text") or "").strip() for r in records]
+    texts = [t for t in texts if t]
+    return Counter(lang for lang in langid.detect_languages(texts, backend=backend, workers=workers) if lang)
+
+
+# ---- Sygnały kraju: jeden przebieg na wiadomość ----
+
+# wszystkie wzorce walut w jednej alternatywie; nazwana grupa = kod waluty
+CURRENCY_RE = re.compile(
+    "|".join(f"(?P<{code}>{'|'.join(meta['patterns'])})" for code, meta in CURRENCY_SIGNALS.items()),
+    re.IGNORECASE,
+)
+_CURRENCY_ORDER = {code: i for i, code in enumerate(CURRENCY_SIGNALS)}
+
+# ISO 3166 alpha-2 -> nazwa jak w LANG_TO_COUNTRIES / OFFSET_TO_COUNTRIES; inne kody: pycountry albo sam kod
+FLAG_COUNTRY_NAMES = {
+    "PL": "Poland", "DE": "Germany", "AT": "Austria", "CH": "Switzerland", "RU": "Russia", "UA": "Ukraine",
+    "TR": "Turkey", "RO": "Romania", "HU": "Hungary", "CZ": "Czechia", "SK": "Slovakia", "IT": "Italy",
+    "FR": "France", "ES": "Spain", "GB": "United Kingdom", "US": "United States", "NL": "Netherlands",
+    "BE": "Belgium", "PT": "Portugal", "IE": "Ireland", "FI": "Finland", "GR": "Greece", "BY": "Belarus",
+    "KZ": "Kazakhstan", "CA": "Canada", "AU": "Australia", "NZ": "New Zealand", "MX": "Mexico",
+    "AR": "Argentina", "CO": "Colombia", "PE": "Peru", "CL": "Chile", "GH": "Ghana", "MA": "Morocco",
+    "EE": "Estonia", "LV": "Latvia", "LT": "Lithuania", "SI": "Slovenia", "CY": "Cyprus", "LU": "Luxembourg",
+    "MT": "Malta", "BG": "Bulgaria", "RS": "Serbia", "HR": "Croatia", "GE": "Georgia", "AM": "Armenia",
+    "AZ": "Azerbaijan", "IL": "Israel", "AE": "United Arab Emirates", "CN": "China", "IN": "India",
+    "NG": "Nigeria", "VN": "Vietnam", "TH": "Thailand", "PH": "Philippines", "ID": "Indonesia",
+}
+
+@lru_cache(maxsize=512)
+def _flag_country(pair: str) -> Optional[str]:
+    # 🇵🇱 = REGIONAL INDICATOR P + L -> "PL"
+    code = "".join(chr(ord(c) - 0x1F1E6 + ord("A")) for c in pair)
+    name = FLAG_COUNTRY_NAMES.get(code)
+    if name is None and pycountry is not None:
+        hit = pycountry.countries.get(alpha_2=code)
+        name = (getattr(hit, "common_name", None) or getattr(hit, "name", None)) if hit else None
+    return name
+
+
+def _url_host(url: str) -> str:
+    host = url.split("://", 1)[-1]
+    for sep in "/?#":
+        host = host.split(sep, 1)[0]
+    return host.rsplit("@", 1)[-1].split(":", 1)[0].lower()
+
+
+@lru_cache(maxsize=65536)
+def _host_tld_country(host: str) -> Optional[str]:
+    ext = tldextract.extract(host)
+    tld = ext.suffix.split(".")[-1] if ext and ext.suffix else ""
+    return TLD_COUNTRY_HINTS.get(tld)
+
+
+def scan_country_signals(text: str, urls: Iterable[str] = ()) -> Tuple[List[str], List[str], List[str]]:
+    """Sygnały jednej wiadomości: (kraje z walut, kraje z TLD, kraje z flag)."""
+    cur: List[str] = []
+    if text:
+        found = set()
+        pos, search = 0, CURRENCY_RE.search
+        # restart od start+1: wzorzec jednej waluty nie "połyka" trafienia innej
+        while len(found) < len(CURRENCY_SIGNALS):
+            m = search(text, pos)
+            if m is None:
+                break
+            found.add(m.lastgroup)
+            pos = m.start() + 1
+        for code in sorted(found, key=_CURRENCY_ORDER.__getitem__):
+            cur.extend(CURRENCY_SIGNALS[code]["countries"])
+    tlds = [c for c in (_host_tld_country(_url_host(u)) for u in urls if u) if c]
+    flags: List[str] = []
+    if text and not text.isascii():
+        flags = [c for c in map(_flag_country, REGIONAL_FLAG_RE.findall(text)) if c]
+    return cur, tlds, flags
+
+
+def collect_country_signals(records: List[Dict[str,Any]]) -> Tuple[List[str], List[str], List[str]]:
+    """Waluty, TLD i flagi dla wszystkich rekordów w jednym przebiegu."""
+    cur, tlds, flags = [], [], []
+    for r in records:
+        c, t, f = scan_country_signals(r.get("text") or "", r.get("urls", []))
+        cur.extend(c)
+        tlds.extend(t)
+        flags.extend(f)
+    return cur, tlds, flags
 
 
 def collect_currency_signals(records: List[Dict[str,Any]]) -> List[str]:
-    hits = []
-    for r in records:
-        txt = r.get("text") or ""
-        for code, meta in CURRENCY_SIGNALS.items():
-            for patt in meta["patterns"]:
-                if re.search(patt, txt, flags=re.IGNORECASE):
-                    hits.extend(meta["countries"])
-                    break
-    return hits
+    return collect_country_signals([{"text": r.get("text")} for r in records])[0]
 
 
 def collect_tld_signals(records: List[Dict[str,Any]]) -> List[str]:
-    countries = []
-    for r in records:
-        for url in r.get("urls", []):
-            ext = tldextract.extract(url)
-            tld = ext.suffix.split(".")[-1] if ext and ext.suffix else ""
-            if tld in TLD_COUNTRY_HINTS:
-                countries.append(TLD_COUNTRY_HINTS[tld])
-    return countries
+    return collect_country_signals([{"urls": r.get("urls", [])} for r in records])[1]
 
 
 def collect_flag_emojis(records: List[Dict[str,Any]]) -> List[str]:
-    # This detects presence of any country flags and maps to country via unicode regional indicators.
-    # It's a weak heuristic but can help.
-    flags = []
-    for r in records:
-        for m in REGIONAL_FLAG_RE.findall(r.get("text") or ""):
-            flags.append(m)
-    # Map of common flags (extend as needed)
-    MAP = {
-        "ðŸ‡µðŸ‡±": "Poland", "ðŸ‡©ðŸ‡ª": "Germany", "ðŸ‡¦ðŸ‡¹": "Austria", "ðŸ‡¨ðŸ‡­": "Switzerland",
-        "ðŸ‡·ðŸ‡º": "Russia", "ðŸ‡ºðŸ‡¦": "Ukraine", "ðŸ‡¹ðŸ‡·": "Turkey", "ðŸ‡·ðŸ‡´": "Romania",
-        "ðŸ‡­ðŸ‡º": "Hungary", "ðŸ‡¨ðŸ‡¿": "Czechia", "ðŸ‡¸ðŸ‡°": "Slovakia", "ðŸ‡®ðŸ‡¹": "Italy",
-        "ðŸ‡«ðŸ‡·": "France", "ðŸ‡ªðŸ‡¸": "Spain", "ðŸ‡¬ðŸ‡§": "United Kingdom", "ðŸ‡ºðŸ‡¸": "United States",
-    }
-    countries = [MAP[f] for f in flags if f in MAP]
-    return countries
+    # flagi mapowane generycznie z par znaków regional indicator (weak heuristic)
+    return collect_country_signals([{"text": r.get("text")} for r in records])[2]
 
 
 def combine_signals(
@@ -236,15 +286,6 @@ def combine_signals(
         score[c] += 6
         evidence.append({"country": c, "reason": "Country flag emoji", "points": 6})
 
-    # Timezone offset â†’ map to candidate countries (coarse)
-    OFFSET_TO_COUNTRIES = {
-        0: ["United Kingdom","Portugal","Ghana","Morocco"],
-        1: ["Poland","Germany","Austria","Czechia","Slovakia","Hungary","Italy","France","Spain","Netherlands","Belgium","Switzerland"],
-        2: ["Romania","Ukraine","Finland","Greece","Turkey"],
-        3: ["Russia"],
-        -5: ["United States"], -6: ["United States"], -7: ["United States"], -8: ["United States"],
-        10: ["Australia"], 11: ["Australia"], -3: ["Argentina"], -4: ["Canada"],
-    }
     if tz_offset in OFFSET_TO_COUNTRIES:
         for c in OFFSET_TO_COUNTRIES[tz_offset]:
             score[c] += 20
@@ -254,61 +295,375 @@ def combine_signals(
     return ranked, evidence
 
 
+def combine_counts(
+    lang_counts: Counter,
+    tz_offset: Optional[int],
+    currency_counts: Counter,
+    tld_counts: Counter,
+    flag_counts: Counter,
+) -> Tuple[List[Tuple[str,int]], List[Dict[str,Any]]]:
+    # ten sam ranking co combine_signals, ale z liczników kraj -> liczba trafień:
+    # koszt O(krajów) zamiast O(trafień); dowody zagregowane per kraj i sygnał
+    score = Counter()
+    evidence = []
+    for lang, cnt in lang_counts.items():
+        for country in LANG_TO_COUNTRIES.get(lang, []):
+            pts = min(15, 3 * cnt)
+            score[country] += pts
+            evidence.append({"country": country, "reason": f"Language {lang} ({cnt} msgs)", "points": pts})
+    for counts, pts, reason in (
+        (currency_counts, 12, "Currency mention"),
+        (tld_counts, 8, "Country TLD in URLs"),
+        (flag_counts, 6, "Country flag emoji"),
+    ):
+        for c, n in counts.items():
+            score[c] += pts * n
+            evidence.append({"country": c, "reason": f"{reason} (x{n})", "points": pts * n})
+    for c in OFFSET_TO_COUNTRIES.get(tz_offset, []):
+        score[c] += 20
+        evidence.append({"country": c, "reason": f"Active hours fit UTC{tz_offset:+d}", "points": 20})
+    return score.most_common(), evidence
+
+
+def confidence_of(ranked: List[Tuple[str,int]]) -> str:
+    top_score = ranked[0][1] if ranked else 0
+    sum_top3 = sum(s for _, s in ranked[:3])
+    if top_score >= 40 and (top_score >= 0.6 * sum_top3):
+        return "high"
+    if top_score >= 25:
+        return "medium"
+    return "low"
+
+
+def _iso_utc(d: datetime) -> str:
+    return (d.astimezone(timezone.utc) if d.tzinfo else d).isoformat()
+
+
+class CountryInferenceState:
+    """
+    Stan wnioskowania przyrostowego: liczniki sygnałów zamiast listy rekordów.
+    add_records() kosztuje tyle, ile nowych wiadomości; ranking() i confidence
+    liczone są z liczników w O(krajów). Stan serializuje się do tabeli
+    country_state w db.py (JSON), więc pętle typu watchdog płacą tylko za nowe dane.
+    """
+
+    PER_AUTHOR_CAP = 200
+
+    def __init__(self, entity: str):
+        self.entity = entity
+        self.lang_counts = Counter()
+        self.hours = [0] * 24
+        self.currency_counts = Counter()
+        self.tld_counts = Counter()
+        self.flag_counts = Counter()
+        self.author_samples = Counter()   # ile wiadomości autora poszło już do detekcji języka
+        # języki wiadomości ponad limit, póki autor był jedyny — odejmowane, gdy pojawi się drugi
+        # (wtedy limit obowiązuje od początku, jak w collect_language_signals na całej historii)
+        self.over_cap_langs = Counter()
+        self.messages = 0
+        self.last_id = 0
+        self.last_date: Optional[str] = None
+        self.last_date_ids: set = set()   # id wiadomości już policzonych z sekundy last_date
+
+    def new_records(self, records: List[Dict[str,Any]], by_id: bool = True,
+                    since: Optional[str] = None, since_ids: Optional[set] = None) -> List[Dict[str,Any]]:
+        """
+        Rekordy nowsze niż zapamiętane: po id (jeden czat), a bez id lub z by_id=False
+        — po (dacie, id), względem `since`/`since_ids` (granica sprzed strumienia) albo
+        last_date/last_date_ids: z sekundy granicy odpada tylko to, co już policzone.
+        """
+        cutoff, seen = (self.last_date, self.last_date_ids) if since is None else (since, since_ids or set())
+        out = []
+        for r in records:
+            rid, d = r.get("id"), r.get("date")
+            if by_id and isinstance(rid, int) and self.last_id:
+                if rid > self.last_id:
+                    out.append(r)
+                continue
+            if cutoff and isinstance(d, datetime):
+                iso = _iso_utc(d)
+                if iso < cutoff or (iso == cutoff and rid in seen):
+                    continue
+            out.append(r)
+        return out
+
+    def add_records(self, records: List[Dict[str,Any]], by_id: bool = True, since: Optional[str] = None,
+                    since_ids: Optional[set] = None) -> int:
+        records = self.new_records(records, by_id, since, since_ids)
+        if not records:
+            return 0
+        texts, over = [], []
+        for r in records:
+            txt = (r.get("text") or "").strip()
+            a = r.get("author")
+            if not txt:
+                continue
+            if a is not None:
+                a = str(a)
+                n = self.author_samples[a]
+                if n >= self.PER_AUTHOR_CAP:
+                    if len(self.author_samples) > 1:
+                        continue
+                    over.append(len(texts))   # jedyny autor: liczone warunkowo
+                self.author_samples[a] = n + 1
+            texts.append(txt)
+        langs = langid.detect_languages(texts)
+        self.lang_counts.update(lang for lang in langs if lang)
+        self.over_cap_langs.update(langs[i] for i in over if langs[i])
+        self._apply_author_cap()
+        hist = tzinfer.hour_histogram(r["date"] for r in records if isinstance(r.get("date"), datetime))
+        self.hours = [int(a + b) for a, b in zip(self.hours, hist)]
+        cur, tlds, flags = collect_country_signals(records)
+        self.currency_counts.update(cur)
+        self.tld_counts.update(tlds)
+        self.flag_counts.update(flags)
+        self.messages += len(records)
+        ids = [r["id"] for r in records if isinstance(r.get("id"), int)]
+        if ids:
+            self.last_id = max(self.last_id, max(ids))
+        self._advance_date(records)
+        return len(records)
+
+    def _apply_author_cap(self) -> None:
+        if len(self.author_samples) > 1 and self.over_cap_langs:
+            self.lang_counts.subtract(self.over_cap_langs)
+            self.lang_counts = +self.lang_counts
+            self.over_cap_langs.clear()
+
+    def _advance_date(self, records: List[Dict[str,Any]]) -> None:
+        for r in records:
+            if isinstance(r.get("date"), datetime):
+                iso = _iso_utc(r["date"])
+                if iso > (self.last_date or ""):
+                    self.last_date, self.last_date_ids = iso, set()
+                if iso == self.last_date and r.get("id") is not None:
+                    self.last_date_ids.add(r["id"])
+
+    def merge(self, other: "CountryInferenceState") -> "CountryInferenceState":
+        """Dolicza stan innego źródła (np. drugiego pliku eksportu)."""
+        for k in ("lang_counts", "currency_counts", "tld_counts", "flag_counts", "author_samples", "over_cap_langs"):
+            getattr(self, k).update(getattr(other, k))
+        self._apply_author_cap()
+        self.hours = [a + b for a, b in zip(self.hours, other.hours)]
+        self.messages += other.messages
+        self.last_id = max(self.last_id, other.last_id)
+        if (other.last_date or "") > (self.last_date or ""):
+            self.last_date, self.last_date_ids = other.last_date, set(other.last_date_ids)
+        elif other.last_date and other.last_date == self.last_date:
+            self.last_date_ids |= other.last_date_ids
+        return self
+
+    def tz_offset(self) -> Optional[int]:
+        return tzinfer.infer_offsets([self.hours], UTC_OFFSETS, AWAKE_WINDOWS)[0]
+
+    def ranking(self) -> Tuple[List[Tuple[str,int]], List[Dict[str,Any]]]:
+        return combine_counts(self.lang_counts, self.tz_offset(), self.currency_counts, self.tld_counts, self.flag_counts)
+
+    def report(self) -> Dict[str,Any]:
+        ranked, evidence = self.ranking()
+        return {
+            "top_countries": [{"country": c, "score": s} for c, s in ranked[:5]],
+            "confidence": confidence_of(ranked),
+            "tz_offset": self.tz_offset(),
+            "languages": self.lang_counts,
+            "currency_hits": self.currency_counts,
+            "tld_country_hits": self.tld_counts,
+            "flag_country_hits": self.flag_counts,
+            "evidence": evidence[:50],
+            "messages_analyzed": self.messages,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "entity": self.entity, "lang_counts": self.lang_counts, "hours": self.hours,
+            "currency_counts": self.currency_counts, "tld_counts": self.tld_counts,
+            "flag_counts": self.flag_counts, "author_samples": self.author_samples,
+            "over_cap_langs": self.over_cap_langs, "messages": self.messages, "last_id": self.last_id,
+            "last_date": self.last_date, "last_date_ids": sorted(self.last_date_ids, key=str),
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "CountryInferenceState":
+        d = json.loads(raw)
+        st = cls(d["entity"])
+        for k in ("lang_counts", "currency_counts", "tld_counts", "flag_counts", "author_samples", "over_cap_langs"):
+            setattr(st, k, Counter(d.get(k) or {}))
+        st.hours = list(d.get("hours") or [0] * 24)
+        st.messages = d.get("messages", 0)
+        st.last_id = d.get("last_id", 0)
+        st.last_date = d.get("last_date")
+        st.last_date_ids = set(d.get("last_date_ids") or ())
+        return st
+
+    @classmethod
+    def load(cls, session, entity: str) -> "CountryInferenceState":
+        from scamgeo_banking.db import load_country_state
+        row = load_country_state(session, entity)
+        return cls.from_json(row.state_json) if row else cls(entity)
+
+    def save(self, session) -> None:
+        from scamgeo_banking.db import save_country_state
+        save_country_state(session, self.entity, self.to_json(), int(time.time()))
+
+
+EXPORT_BATCH = 5000   # rekordów na jedno add_records przy strumieniowaniu eksportu
+
+
+def add_stream(state: CountryInferenceState, records: Iterable[Dict[str,Any]], batch: int = EXPORT_BATCH) -> int:
+    """
+    add_records partiami — w pamięci najwyżej `batch` rekordów naraz. W eksporcie
+    konta id liczą się od nowa w każdym czacie, więc nowe rekordy wybierane są po
+    dacie względem stanu sprzed strumienia (nie po last_id z poprzedniej partii).
+    """
+    since, since_ids = state.last_date or "", set(state.last_date_ids)
+    added, buf = 0, []
+    for r in records:
+        buf.append(r)
+        if len(buf) >= batch:
+            added += state.add_records(buf, by_id=False, since=since, since_ids=since_ids)
+            buf = []
+    if buf:
+        added += state.add_records(buf, by_id=False, since=since, since_ids=since_ids)
+    return added
+
+
+def _file_state(path: str) -> str:
+    # worker puli procesów: stan jednego pliku jako JSON (mały, niezależny od rozmiaru eksportu)
+    st = CountryInferenceState(os.path.abspath(path))
+    add_stream(st, iter_telegram_export(path))
+    return st.to_json()
+
+
+def export_state(path: str, workers: Optional[int] = None) -> CountryInferenceState:
+    """Stan z pliku result.json albo katalogu eksportów (pliki równolegle, stany scalane)."""
+    files = export_files(path)
+    state = CountryInferenceState(os.path.abspath(path))
+    for _, raw in map_exports(files, _file_state, workers):
+        state.merge(CountryInferenceState.from_json(raw))
+    return state
+
+
 # -------- LIVE MODE (optional) --------
 
-def fetch_messages_live(username: str, limit: int = 300) -> List[Dict[str,Any]]:
-    if not TELETHON_OK:
-        raise RuntimeError("Telethon not installed; install 'telethon' to use live mode.")
+def live_accounts(username: str) -> List[Dict[str,Any]]:
+    """Accounts to try for `username`: TG_API_ID/TG_API_HASH, else config.json accounts starting at the seed's owner."""
     api_id = os.environ.get("TG_API_ID")
     api_hash = os.environ.get("TG_API_HASH")
-    if not api_id or not api_hash:
-        raise RuntimeError("Set TG_API_ID and TG_API_HASH environment variables for live mode.")
-    client = TelegramClient("tg_infer_session", int(api_id), api_hash)
+    if api_id and api_hash:
+        return [{"api_id": int(api_id), "api_hash": api_hash, "session_name": "tg_infer_session"}]
+    accounts = load_accounts(default_session="tg_infer_session")
+    if not accounts:
+        return []
+    i = owner_index(username, len(accounts))
+    return accounts[i:] + accounts[:i]
+
+
+def fetch_messages_live(username: str, limit: int = 300, min_id: int = 0) -> List[Dict[str,Any]]:
+    if not TELETHON_OK:
+        raise RuntimeError("Telethon not installed; install 'telethon' to use live mode.")
+    accounts = live_accounts(username)
+    if not accounts:
+        raise RuntimeError("Set TG_API_ID and TG_API_HASH environment variables (or telegram_accounts in config.json) for live mode.")
+    # FloodWait on one account -> next account from the pool
+    for n, acc in enumerate(accounts, 1):
+        try:
+            return _fetch_live(acc, username, limit, min_id)
+        except FloodWaitError:
+            if n == len(accounts):
+                raise
+
+
+HISTORY_PAGE = 100   # maksimum wiadomości na jedno GetHistoryRequest
+
+
+def _fetch_live(acc: Dict[str,Any], username: str, limit: int, min_id: int) -> List[Dict[str,Any]]:
+    client = new_client(acc["session_name"], acc["api_id"], acc["api_hash"])
     client.start()  # will prompt for phone/login on first run
-    from telethon.tl.functions.messages import GetHistoryRequest
-    from telethon.tl.types import InputPeerUser, InputPeerChannel
-
-    entity = client.get_entity(username)
-    hist = client(GetHistoryRequest(
-        peer=entity,
-        limit=limit,
-        offset_date=None,
-        offset_id=0,
-        max_id=0,
-        min_id=0,
-        add_offset=0,
-        hash=0
-    ))
-    records = []
-    for m in hist.messages:
-        if not getattr(m, 'message', None):
-            continue
-        date = m.date.replace(tzinfo=timezone.utc)
-        txt = m.message or ""
-        urls = re.findall(r"https?://[^\s]+", txt)
-        records.append({"date": date, "text": txt, "urls": list(set(urls))})
-    client.disconnect()
-    return records
+    try:
+        from telethon.tl.functions.messages import GetHistoryRequest
+        from telethon.tl.types import InputPeerUser, InputPeerChannel
+
+        entity = client.get_entity(username)
+        # strony od najnowszej w dół; w trybie przyrostowym aż do min_id (wszystkie nowe,
+        # nie tylko ostatnie `limit` — inaczej high-water mark przeskoczyłby lukę)
+        messages, offset_id = [], 0
+        while True:
+            page = HISTORY_PAGE if min_id else min(HISTORY_PAGE, limit - len(messages))
+            hist = client(GetHistoryRequest(
+                peer=entity,
+                limit=page,
+                offset_date=None,
+                offset_id=offset_id,
+                max_id=0,
+                min_id=min_id,  # tryb przyrostowy: tylko wiadomości nowsze niż zapamiętane
+                add_offset=0,
+                hash=0
+            ))
+            messages.extend(hist.messages)
+            if len(hist.messages) < page or (not min_id and len(messages) >= limit):
+                break
+            offset_id = hist.messages[-1].id
+        records = []
+        for m in messages:
+            if not getattr(m, 'message', None):
+                continue
+            date = m.date.replace(tzinfo=timezone.utc)
+            txt = m.message or ""
+            urls = re.findall(r"https?://[^\s]+", txt)
+            records.append({"id": m.id, "date": date, "text": txt, "urls": list(set(urls)), "author": getattr(m, "sender_id", None)})
+        return records
+    finally:
+        client.disconnect()
 
 
 # -------- CLI --------
 
 def main():
     ap = argparse.ArgumentParser(description="Infer likely country of a Telegram user/conversation")
-    ap.add_argument("--export", help="Path to Telegram Desktop JSON export (result.json)")
+    ap.add_argument("--export", help="Path to Telegram Desktop JSON export (result.json) or a directory of exports")
+    ap.add_argument("--workers", type=int, default=None, help="Processes for a directory of exports (default: CPU count)")
     ap.add_argument("--username", help="@username or t.me/ link (LIVE mode)")
     ap.add_argument("--limit", type=int, default=400, help="Max messages to fetch in LIVE mode")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Keep running state in the SQLite store (DB_PATH) and only process new messages")
     args = ap.parse_args()
 
     records: List[Dict[str,Any]] = []
 
+    if not (args.export or args.username):
+        print("Provide --export or --username")
+        return
+
+    if args.incremental:
+        from sqlmodel import Session
+        from scamgeo_banking.db import init_db
+        entity = args.username or os.path.abspath(args.export)
+        with Session(init_db()) as s:
+            state = CountryInferenceState.load(s, entity)
+            if args.export:
+                if os.path.isdir(args.export):
+                    print("--incremental expects a single result.json, not a directory")
+                    return
+                added = add_stream(state, iter_telegram_export(args.export))
+            else:
+                records = fetch_messages_live(args.username, limit=args.limit, min_id=state.last_id)
+                added = state.add_records(records)
+            state.save(s)
+        out = state.report()
+        out["new_messages"] = added
+        print(json.dumps(out, ensure_ascii=False, indent=2, default=str))
+        return
+
     if args.export:
-        records = parse_telegram_export(args.export)
+        # eksport strumieniowo: liczniki zamiast listy rekordów, katalog — pliki równolegle
+        state = export_state(args.export, workers=args.workers)
+        if not state.messages:
+            print(json.dumps({"error":"no_messages"}, ensure_ascii=False, indent=2))
+            return
+        print(json.dumps(state.report(), ensure_ascii=False, indent=2, default=str))
+        return
     elif args.username:
         records = fetch_messages_live(args.username, limit=args.limit)
-    else:
-        print("Provide --export or --username")
-        return
 
     if not records:
         print(json.dumps({"error":"no_messages"}, ensure_ascii=False, indent=2))
@@ -318,21 +673,12 @@ def main():
     dates = [r["date"] for r in records if isinstance(r.get("date"), datetime)]
     tz_offset = infer_timezone_offset(dates)
     lang_counts = collect_language_signals(records)
-    curr_hits = collect_currency_signals(records)
-    tld_hits = collect_tld_signals(records)
-    flag_hits = collect_flag_emojis(records)
+    curr_hits, tld_hits, flag_hits = collect_country_signals(records)
 
     ranked, evidence = combine_signals(lang_counts, tz_offset, curr_hits, tld_hits, flag_hits)
 
     # Confidence heuristic
-    top_score = ranked[0][1] if ranked else 0
-    sum_top3 = sum(s for _, s in ranked[:3])
-    if top_score >= 40 and (top_score >= 0.6 * sum_top3):
-        confidence = "high"
-    elif top_score >= 25:
-        confidence = "medium"
-    else:
-        confidence = "low"
+    confidence = confidence_of(ranked)
 
     out = {
         "top_countries": [{"country": c, "score": s} for c, s in ranked[:5]],
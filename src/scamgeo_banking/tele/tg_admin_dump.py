@@ -1,5 +1,5 @@
 ﻿# tg_admin_dump.py (v3) â€” zbiera teÅ¼ suspected_admins z BIO, pinned i treÅ›ci
-import asyncio, json, os, re, datetime
+import asyncio, json, os, re, datetime, argparse
 from typing import List, Dict, Any, Tuple
 
 from telethon import TelegramClient, errors
@@ -13,9 +13,17 @@ from telethon.tl.functions.channels import (
 )
 from telethon.tl.functions.messages import GetMessagesRequest
 
+from scamgeo_banking.storage.archive import iso_utc
+from scamgeo_banking.tele.entity_cache import EntityCache
+from scamgeo_banking.tele.session_pool import SessionPool, load_accounts, new_client
+
 CONFIG = "config.json"
 OUTDIR = "scam_hunter_out"
 STAY_JOINED = True   # zostaw doÅ‚Ä…czone kanaÅ‚y â€” czasem po chwili widaÄ‡ wiÄ™cej meta
+CONCURRENCY = int(os.getenv("TG_ADMIN_CONCURRENCY", "6"))  # ile seedów naraz
+MAX_FLOOD_RETRIES = 5
+MAX_FLOOD_WAIT = 900 # s; dłuższy FloodWait na wszystkich kontach -> błąd seeda zamiast czekania
+HISTORY = 60         # ile ostatnich wiadomości skanować pod @wzmianki (None = cała historia)
 
 MENTION_RE = re.compile(r'@([A-Za-z0-9_]{5,})')
 
@@ -25,19 +33,55 @@ def load_config():
         t = cfg["telegram"]
         api_id = t["api_id"]; api_hash = t["api_hash"]; session_name = t.get("session_name","session")
     else:
-        api_id = cfg["api_id"]; api_hash = cfg["api_hash"]; session_name = cfg.get("session_name","session")
+        # brak obu = same "telegram_accounts" (session_pool.load_accounts)
+        api_id = cfg.get("api_id"); api_hash = cfg.get("api_hash"); session_name = cfg.get("session_name","session")
     seeds = cfg.get("seeds", [])
     return api_id, api_hash, session_name, seeds
 
-def add_suspect(bucket: List[Dict[str, Any]], username: str, reason: str, extra: Dict[str, Any] = None):
+class SuspectBucket(list):
+    """
+    Lista podejrzanych (w JSON zwykła lista) z indeksem (username, reason) -> wpis:
+    deduplikacja O(1), licznik wystąpień i first_seen/last_seen. on_new(item)
+    dostaje każdy nowy wpis od razu (zapis przyrostowy).
+    """
+
+    def __init__(self, on_new=None):
+        super().__init__()
+        self._idx: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.on_new = on_new
+
+    def add(self, username: str, reason: str, extra: Dict[str, Any] = None, date=None, count: int = 1):
+        key = (username, reason)
+        item = self._idx.get(key)
+        new = item is None
+        if new:
+            item = {"username": username, "reason": reason}
+            if extra: item.update(extra)
+            item.update(count=0, first_seen=None, last_seen=None)
+            self._idx[key] = item
+            self.append(item)
+        item["count"] += count
+        for d in (date if isinstance(date, tuple) else (date,)):
+            d = iso_utc(d) if d else None
+            if d:
+                if not item["first_seen"] or d < item["first_seen"]: item["first_seen"] = d
+                if not item["last_seen"] or d > item["last_seen"]: item["last_seen"] = d
+        if new and self.on_new: self.on_new(item)
+        return item
+
+    def merge(self, other: "SuspectBucket"):
+        for it in other:
+            extra = {k: v for k, v in it.items() if k not in ("username", "reason", "count", "first_seen", "last_seen")}
+            self.add(it["username"], it["reason"], extra, (it["first_seen"], it["last_seen"]), it["count"])
+
+def add_suspect(bucket: SuspectBucket, username: str, reason: str, extra: Dict[str, Any] = None, date=None):
     if not username: return
-    username = username.lstrip('@')
-    for s in bucket:
-        if s.get("username") == username and s.get("reason") == reason:
-            return
-    item = {"username": username, "reason": reason}
-    if extra: item.update(extra)
-    bucket.append(item)
+    bucket.add(username.lstrip('@'), reason, extra, date)
+
+def _step_flood(dst: Dict[str, Any], where: str, e) -> None:
+    # FloodWait w kroku: wynik częściowy zostaje, a dump_all zgłasza karę konta do puli
+    dst["errors"].append(f"{where}: flood_wait:{e.seconds}s")
+    dst["_flood"] = max(dst.get("_flood", 0), e.seconds)
 
 async def collect_admins(client: TelegramClient, entity, dst_info: Dict[str, Any], where: str):
     admins = []
@@ -54,6 +98,8 @@ async def collect_admins(client: TelegramClient, entity, dst_info: Dict[str, Any
             })
     except errors.ChatAdminRequiredError as e:
         dst_info["errors"].append(f"{where}: no rights to list admins ({e.__class__.__name__})")
+    except errors.FloodWaitError as e:
+        _step_flood(dst_info, f"{where}: iter_participants", e)
     except Exception as e:
         dst_info["errors"].append(f"{where}: iter_participants failed: {e}")
     dst_info["admins"].extend(admins)
@@ -63,6 +109,8 @@ async def get_full_and_maybe_join(client: TelegramClient, entity) -> Tuple[Any,
     try:
         full = await client(GetFullChannelRequest(entity))
         return full, joined_now
+    except errors.FloodWaitError:
+        raise   # przed krokami — dump_all przenosi seed na inne konto
     except Exception:
         pass
     # sprÃ³buj doÅ‚Ä…czyÄ‡ (publiczne)
@@ -71,22 +119,25 @@ async def get_full_and_maybe_join(client: TelegramClient, entity) -> Tuple[Any,
         joined_now = True
         full = await client(GetFullChannelRequest(entity))
         return full, joined_now
+    except errors.FloodWaitError:
+        raise
     except Exception:
         return None, joined_now
 
-async def harvest_mentions_from_text(text: str, bucket: List[Dict[str, Any]], reason: str):
+async def harvest_mentions_from_text(text: str, bucket: SuspectBucket, reason: str, date=None):
     if not text: return
     for m in MENTION_RE.findall(text):
-        add_suspect(bucket, m, reason)
+        add_suspect(bucket, m, reason, date=date)
 
-def harvest_mentions_from_entities(msg, bucket: List[Dict[str, Any]]):
+def harvest_mentions_from_entities(msg, bucket: SuspectBucket):
     if not getattr(msg, "entities", None): return
+    date = getattr(msg, "date", None)
     for ent in msg.entities:
         if isinstance(ent, MessageEntityMention):
             # literal "@user" fragment
             if msg.message:
                 frag = msg.message[ent.offset:ent.offset+ent.length]
-                add_suspect(bucket, frag, "entity_mention")
+                add_suspect(bucket, frag, "entity_mention", date=date)
         elif isinstance(ent, MessageEntityMentionName):
             # â€žwspomnienie po IDâ€ â€” nie ma @, ale mamy user_id
             add_suspect(bucket, None, "entity_mention_name", {"user_id": ent.user_id})
@@ -94,19 +145,87 @@ def harvest_mentions_from_entities(msg, bucket: List[Dict[str, Any]]):
             # URL â€” sprÃ³buj wyÅ‚uskaÄ‡ @ z linku
             if getattr(ent, "url", None):
                 m = MENTION_RE.search(ent.url)
-                if m: add_suspect(bucket, m.group(1), "entity_url")
+                if m: add_suspect(bucket, m.group(1), "entity_url", date=date)
             elif msg.message:
                 frag = msg.message[ent.offset:ent.offset+ent.length]
                 m = MENTION_RE.search(frag)
-                if m: add_suspect(bucket, m.group(1), "entity_url")
+                if m: add_suspect(bucket, m.group(1), "entity_url", date=date)
+
+def _part(on_new=None) -> Dict[str, Any]:
+    # wynik jednego kroku; kroki idą równolegle, scalane w stałej kolejności
+    return {"admins": [], "suspected_admins": SuspectBucket(on_new), "errors": []}
 
-async def fetch_for_handle(client: TelegramClient, handle: str) -> Dict[str, Any]:
-    info: Dict[str, Any] = {
+async def scan_pinned(client: TelegramClient, full, dst: Dict[str, Any]):
+    try:
+        if full and getattr(full.full_chat, "pinned_msg_id", None):
+            mid = full.full_chat.pinned_msg_id
+            msgs = await client(GetMessagesRequest(id=[mid]))
+            if msgs and getattr(msgs, "messages", None):
+                msg = msgs.messages[0]
+                await harvest_mentions_from_text(getattr(msg, "message", None), dst["suspected_admins"], "pinned_mention", getattr(msg, "date", None))
+                harvest_mentions_from_entities(msg, dst["suspected_admins"])
+    except errors.FloodWaitError as e:
+        _step_flood(dst, "pinned", e)
+    except Exception as e:
+        dst["errors"].append(f"pinned parse failed: {e}")
+
+async def scan_last_messages(client: TelegramClient, entity, dst: Dict[str, Any], limit=HISTORY):
+    """limit=None: cała historia, strumieniowo (w pamięci tylko podejrzani, nie wiadomości)."""
+    n = 0
+    try:
+        async for msg in client.iter_messages(entity, limit=limit):
+            if not msg: break
+            n += 1
+            await harvest_mentions_from_text(getattr(msg, "message", None), dst["suspected_admins"], "text_mention", getattr(msg, "date", None))
+            harvest_mentions_from_entities(msg, dst["suspected_admins"])
+            if n % 10000 == 0:
+                print(f"[HISTORY] {getattr(entity, 'username', None) or entity.id}: {n} wiad., podejrzanych {len(dst['suspected_admins'])}")
+    except errors.FloodWaitError as e:
+        _step_flood(dst, f"scan_last_msgs after {n} msgs", e)
+    except Exception as e:
+        dst["errors"].append(f"scan_last_msgs failed after {n} msgs: {e}")
+
+async def scan_linked(client: TelegramClient, full, dst: Dict[str, Any]):
+    if not (full and getattr(full.full_chat, "linked_chat_id", None)):
+        return
+    try:
+        linked_id = full.full_chat.linked_chat_id
+        # GetFullChannel zwraca podpiętą grupę w .chats (z access_hash) — bez dodatkowego rozwiązywania
+        linked = next((c for c in getattr(full, "chats", None) or () if c.id == linked_id), None)
+        if linked is None:
+            linked = await client.get_entity(linked_id)
+        await collect_admins(client, linked, dst, "linked_discussion")
+    except errors.FloodWaitError as e:
+        _step_flood(dst, "linked discussion", e)
+    except Exception as e:
+        dst["errors"].append(f"linked discussion failed: {e}")
+
+def _new_info(handle: str) -> Dict[str, Any]:
+    return {
         "handle": handle, "title": None, "type": None,
-        "admins": [], "suspected_admins": [], "errors": [], "meta": {}
+        "admins": [], "suspected_admins": SuspectBucket(), "errors": [], "meta": {}
     }
+
+async def fetch_for_handle(client: TelegramClient, handle: str, cache: EntityCache = None,
+                           history=HISTORY, sink=None) -> Dict[str, Any]:
+    """
+    history: ile ostatnich wiadomości (None = wszystkie); sink(handle, item) dostaje nowych podejrzanych od razu.
+    FloodWait przy rozwiązywaniu nazwy idzie wyżej — dump_all przenosi seed na inne konto.
+    """
+    info = _new_info(handle)
+    streamed = set()
+
+    def on_new(item):
+        # kroki mają osobne kubełki — do sinka każda para (username, reason) trafia raz
+        key = (item["username"], item["reason"])
+        if sink and key not in streamed:
+            streamed.add(key)
+            sink(handle, item)
+
     try:
-        entity = await client.get_entity(handle)
+        entity = await (cache.resolve(client, handle) if cache is not None else client.get_entity(handle))
+    except errors.FloodWaitError:
+        raise
     except Exception as e:
         info["errors"].append(f"get_entity failed: {e}")
         return info
@@ -131,48 +250,31 @@ async def fetch_for_handle(client: TelegramClient, handle: str) -> Dict[str, Any
     info["meta"]["fake"] = bool(getattr(entity, "fake", False))
     info["meta"]["verified"] = bool(getattr(entity, "verified", False))
 
-    # 1) Prawdziwi admini â€” jeÅ›li mamy uprawnienia
-    await collect_admins(client, entity, info, "channel")
-
     # 2) BIO/About â€” czÄ™sto majÄ… â€žKontakt admin: @Xâ€
-    about_text = None
+    about_part = _part(on_new)
     try:
         if full and getattr(full, "full_chat", None):
             about_text = getattr(full.full_chat, "about", None)
             if about_text:
-                await harvest_mentions_from_text(about_text, info["suspected_admins"], "about_mention")
+                await harvest_mentions_from_text(about_text, about_part["suspected_admins"], "about_mention")
     except Exception as e:
-        info["errors"].append(f"about parse failed: {e}")
+        about_part["errors"].append(f"about parse failed: {e}")
 
-    # 3) pinned message
-    try:
-        if full and getattr(full.full_chat, "pinned_msg_id", None):
-            mid = full.full_chat.pinned_msg_id
-            msgs = await client(GetMessagesRequest(id=[mid]))
-            if msgs and getattr(msgs, "messages", None):
-                msg = msgs.messages[0]
-                await harvest_mentions_from_text(getattr(msg, "message", None), info["suspected_admins"], "pinned_mention")
-                harvest_mentions_from_entities(msg, info["suspected_admins"])
-    except Exception as e:
-        info["errors"].append(f"pinned parse failed: {e}")
-
-    # 4) kilka ostatnich wiadomoÅ›ci â€” szukaj @wzmianki
-    try:
-        async for msg in client.iter_messages(entity, limit=60):
-            if not msg: break
-            await harvest_mentions_from_text(getattr(msg, "message", None), info["suspected_admins"], "text_mention")
-            harvest_mentions_from_entities(msg, info["suspected_admins"])
-    except Exception as e:
-        info["errors"].append(f"scan_last_msgs failed: {e}")
-
-    # 5) podpiÄ™ta grupa dyskusyjna â€” tam czÄ™sto admini sÄ… jawni
-    if full and getattr(full.full_chat, "linked_chat_id", None):
-        try:
-            linked_id = full.full_chat.linked_chat_id
-            linked = await client.get_entity(linked_id)
-            await collect_admins(client, linked, info, "linked_discussion")
-        except Exception as e:
-            info["errors"].append(f"linked discussion failed: {e}")
+    # 1) Prawdziwi admini, 3) pinned, 4) ostatnie wiadomoÅ›ci, 5) grupa dyskusyjna — równolegle
+    parts = [_part(on_new) for _ in range(4)]
+    await asyncio.gather(
+        collect_admins(client, entity, parts[0], "channel"),
+        scan_pinned(client, full, parts[1]),
+        scan_last_messages(client, entity, parts[2], history),
+        scan_linked(client, full, parts[3]),
+    )
+    # scalanie w kolejności jak przy wykonaniu sekwencyjnym: admini kanału, about, pinned, treści, dyskusja
+    for part in (parts[0], about_part, parts[1], parts[2], parts[3]):
+        info["admins"].extend(part["admins"])
+        info["errors"].extend(part["errors"])
+        info["suspected_admins"].merge(part["suspected_admins"])
+        if "_flood" in part:
+            info["_flood"] = max(info.get("_flood", 0), part["_flood"])
 
     # sprzÄ…tanie: opcjonalne wyjÅ›cie
     if joined_now and not STAY_JOINED:
@@ -181,24 +283,92 @@ async def fetch_for_handle(client: TelegramClient, handle: str) -> Dict[str, Any
 
     return info
 
-async def main():
+async def dump_all(client, seeds: List[str], concurrency: int = None, cache=None,
+                   history=HISTORY, sink=None) -> List[Dict[str, Any]]:
+    """
+    fetch_for_handle dla wszystkich seedów, najwyżej `concurrency` naraz; wynik w kolejności seedów.
+    client: TelegramClient albo SessionPool (seedy dzielone między konta, FloodWait -> inne konto);
+    cache: EntityCache albo {nazwa konta: EntityCache} — access_hash jest per konto.
+    """
+    pool = client if isinstance(client, SessionPool) else SessionPool.of(client)
+    sem = asyncio.Semaphore(concurrency or CONCURRENCY)
+    done = [0]
+
+    async def one(h):
+        info, flood = None, None
+        for _ in range(MAX_FLOOD_RETRIES + 1):
+            async with sem:
+                async with pool.lease(h) as pc:
+                    c = cache.get(pc.name) if isinstance(cache, dict) else cache
+                    try:
+                        info = await fetch_for_handle(pc.client, h, c, history, sink)
+                        if "_flood" in info:   # FloodWait w kroku: seed z wynikiem częściowym, konto ukarane
+                            pool.flood(pc, info.pop("_flood"))
+                        break
+                    except errors.FloodWaitError as e:
+                        pool.flood(pc, e.seconds)
+                        flood = e.seconds
+            wait = pool.wait_time()
+            if wait > MAX_FLOOD_WAIT:
+                break
+            print(f"[FLOOD] {h}: {pc.name} {flood}s, ponowienie za {wait:.0f}s")
+            await asyncio.sleep(wait)
+        if info is None:
+            info = _new_info(h)
+            info["errors"].append(f"flood_wait:{flood}s")
+        done[0] += 1
+        print(f"[ADMIN DUMP {done[0]}/{len(seeds)}] {h}: admins={len(info['admins'])} suspected={len(info['suspected_admins'])}")
+        return info
+
+    return list(await asyncio.gather(*(one(h) for h in seeds)))
+
+def parse_history(v: str):
+    return None if v.lower() == "all" else int(v)
+
+async def main(history=HISTORY, concurrency=None):
     api_id, api_hash, session_name, seeds = load_config()
     os.makedirs(OUTDIR, exist_ok=True)
-    async with TelegramClient(session_name, api_id, api_hash) as client:
-        me = await client.get_me()
-        print(f"Signed in as: {me!r}")
-        out: List[Dict[str, Any]] = []
-        for h in seeds:
-            print(f"[ADMIN DUMP] {h}")
-            out.append(await fetch_for_handle(client, h))
-        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+    # kilka kont w config.json ("telegram_accounts"): pula sesji i osobny cache encji na konto
+    accounts = load_accounts(CONFIG, default_session="session")
+    pool = SessionPool.from_accounts(accounts) if accounts else SessionPool.of(new_client(session_name, api_id, api_hash))
+    if len(accounts) > 1:
+        cache = {a["session_name"]: EntityCache(os.path.join(OUTDIR, f"entity_cache_{a['session_name']}.json")) for a in accounts}
+    else:
+        cache = EntityCache(os.path.join(OUTDIR, "entity_cache.json"))
+    caches = list(cache.values()) if isinstance(cache, dict) else [cache]
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+    # nowi podejrzani lecą do JSONL od razu — przy długich historiach wynik jest widoczny w trakcie
+    stream_path = os.path.join(OUTDIR, f"suspects_{ts}.jsonl")
+    stream = open(stream_path, "a", encoding="utf-8")
+
+    def sink(handle, item):
+        stream.write(json.dumps({"handle": handle, "username": item["username"], "reason": item["reason"],
+                                 "first_seen": item["first_seen"]}, ensure_ascii=False) + "\n")
+        stream.flush()
+
+    async with pool:
+        try:
+            out = await dump_all(pool, seeds, concurrency=concurrency, cache=cache, history=history, sink=sink)
+        finally:
+            for c in caches:
+                c.save()   # rozwiązane nazwy zostają także po przerwaniu
+            stream.close()
+        for c in caches:
+            print(f"[CACHE] {c.summary()}")
+        print(f"[POOL] {json.dumps(pool.summary())}")
+        print(f"[OK] Suspects stream -> {stream_path}")
         path = os.path.join(OUTDIR, f"admin_dump_{ts}.json")
         with open(path, "w", encoding="utf-8") as f:
             json.dump(out, f, ensure_ascii=False, indent=2)
         print(f"[OK] Saved -> {path}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    ap = argparse.ArgumentParser(description="Zrzut adminów i podejrzanych kontaktów (@wzmianki) z kanałów seedów")
+    ap.add_argument("--history", type=parse_history, default=HISTORY, metavar="N|all",
+                    help="ile ostatnich wiadomości skanować pod @wzmianki (all = cała historia)")
+    ap.add_argument("--concurrency", type=int, default=None)
+    args = ap.parse_args()
+    asyncio.run(main(history=args.history, concurrency=args.concurrency))
 
 
 
@@ -0,0 +1,273 @@
+# tg_crawl.py — crawler sieci kanałów TG od seedów (frontier wg ryzyka i głębokości)
+#
+# Węzły i krawędzie są w bazie (CrawlNode / CrawlEdge w db.py): węzły "queued" to
+# frontier, pozostałe to zbiór odwiedzonych — przerwany crawl rusza od miejsca
+# przerwania. Kolejność: priorytet malejąco (ryzyko rodzica × waga krawędzi),
+# potem głębokość rosnąco. Limity z configs/scanner.yaml (sekcja telegram_crawl):
+# max_depth, współbieżność łączna i na poziom (hop), budżet wywołań API na przebieg.
+#
+# Krawędzie: podpięta grupa dyskusyjna (linked_chat_id), @wzmianki w opisie,
+# linki t.me i @wzmianki w ostatnich wiadomościach.
+import asyncio, heapq, itertools, json, math, time, argparse
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import yaml
+from sqlmodel import Session, select
+from telethon import errors
+from telethon.tl.types import User, InputPeerChannel, MessageEntityTextUrl
+from telethon.tl.functions.channels import GetFullChannelRequest
+
+from scamgeo_banking.db import init_db, get_crawl_node, crawl_nodes, add_crawl_edge, CrawlNode, CrawlEdge
+from scamgeo_banking.detection.iocs import scan_iocs
+from scamgeo_banking.scoring.rules import RuleEngine, default_rules
+from scamgeo_banking.tele.entity_cache import EntityCache
+from scamgeo_banking.tele.session_pool import new_client
+from scamgeo_banking.tele.tg_admin_dump import load_config
+
+OUTDIR = Path("scam_hunter_out")
+SCANNER_YAML = "configs/scanner.yaml"
+DEFAULTS = {"max_depth": 2, "concurrency_total": 6, "concurrency_per_hop": 3, "api_budget": 2000, "messages_per_node": 100}
+EDGE_WEIGHT = {"linked_chat": 1.0, "about_mention": 0.9, "tg_link": 0.8, "text_mention": 0.6}
+SEED_PRIORITY = 100.0
+_RULES = RuleEngine(default_rules())
+
+
+def load_settings(path=SCANNER_YAML):
+    cfg = dict(DEFAULTS)
+    p = Path(path)
+    if p.exists():
+        y = yaml.safe_load(p.read_text(encoding="utf-8-sig")) or {}
+        cfg.update({k: v for k, v in (y.get("telegram_crawl") or {}).items() if k in DEFAULTS})
+    return cfg
+
+
+def channel_risk(about, texts):
+    """0..100: IOC płatnicze (IBAN, portfele, WhatsApp) + frazy ryzyka z scoring/rules."""
+    kinds = Counter()
+    kw = 0
+    for t in [about or ""] + list(texts):
+        for sp in scan_iocs(t):
+            kinds[sp.kind] += 1
+        kw = max(kw, _RULES.score(t)["score"])
+    wallets = kinds["btc"] + kinds["eth"] + kinds["trc20"]
+    return min(100, 20 * min(kinds["iban"], 2) + 15 * min(wallets, 2) + 10 * min(kinds["whatsapp"], 2) + kw // 2)
+
+
+def discover(about, messages):
+    """[(key, via)] z opisu i wiadomości (bez linkowanej grupy — ta przychodzi z GetFullChannel)."""
+    out = []
+
+    def from_text(text, mention_via):
+        for sp in scan_iocs(text):
+            if sp.kind == "tg_handle":
+                via = mention_via if sp.start and text[sp.start - 1] == "@" else "tg_link"
+                out.append((EntityCache.key(sp.value), via))
+
+    from_text(about or "", "about_mention")
+    for m in messages:
+        from_text(getattr(m, "message", None) or "", "text_mention")
+        for ent in getattr(m, "entities", None) or ():
+            if isinstance(ent, MessageEntityTextUrl) and ent.url:
+                from_text(ent.url, "tg_link")
+    return [(k, v) for k, v in dict.fromkeys(out) if k]
+
+
+class Budget:
+    """Budżet wywołań API na przebieg; koszt węzła rezerwowany z góry."""
+
+    def __init__(self, total):
+        self.total = total
+        self.used = 0
+
+    def take(self, n):
+        if self.used + n > self.total:
+            return False
+        self.used += n
+        return True
+
+
+class Crawler:
+    def __init__(self, client, engine, settings=None, cache=None):
+        self.client = client
+        self.engine = engine
+        self.cfg = {**DEFAULTS, **(settings or {})}
+        self.cache = cache if cache is not None else EntityCache(None)
+        self.budget = Budget(self.cfg["api_budget"])
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = asyncio.Condition()
+        self._in_flight = 0
+        self._stop = None          # powód zatrzymania (budżet / FloodWait)
+        self._hop = defaultdict(lambda: asyncio.Semaphore(self.cfg["concurrency_per_hop"]))
+        self.stats = Counter()
+
+    # ─── frontier ──────────────────────────────────────────────────────────────
+
+    def add_seeds(self, handles):
+        with Session(self.engine) as s:
+            for h in handles:
+                key = EntityCache.key(h)
+                if key and not get_crawl_node(s, key):
+                    s.add(CrawlNode(key=key, depth=0, priority=SEED_PRIORITY, ts_utc=int(time.time())))
+            s.commit()
+
+    def _push(self, node):
+        heapq.heappush(self._heap, (-node.priority, node.depth, next(self._seq), node.key))
+
+    def _load(self):
+        with Session(self.engine) as s:
+            for n in crawl_nodes(s, "queued"):
+                self._push(n)
+
+    async def _next(self):
+        async with self._cond:
+            while True:
+                if self._stop:
+                    return None
+                if self._heap:
+                    self._in_flight += 1
+                    return heapq.heappop(self._heap)
+                if not self._in_flight:
+                    return None
+                await self._cond.wait()
+
+    async def _done(self):
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    # ─── odwiedziny ────────────────────────────────────────────────────────────
+
+    async def _resolve(self, node):
+        if node.access_hash is not None:
+            return await self.client.get_entity(InputPeerChannel(node.peer_id, node.access_hash))
+        return await self.cache.resolve(self.client, node.key)
+
+    async def _visit(self, item):
+        _, depth, _, key = item
+        with Session(self.engine) as s:
+            node = get_crawl_node(s, key)
+        if node is None or node.status != "queued":
+            return
+        limit = self.cfg["messages_per_node"]
+        if not self.budget.take(2 + math.ceil(limit / 100)):   # resolve + GetFullChannel + strony historii
+            self._stop = "api_budget"
+            return
+        async with self._hop[depth]:
+            try:
+                entity = await self._resolve(node)
+                if isinstance(entity, User):
+                    # kontakt operatora: zapisany w grafie, ale nie rozwijany
+                    self._finish(key, "user", None, entity, [], [])
+                    return
+                full = await self.client(GetFullChannelRequest(entity))
+                msgs = [m async for m in self.client.iter_messages(entity, limit=limit)]
+            except errors.FloodWaitError as e:
+                self._stop = f"flood_wait:{e.seconds}s"   # węzeł zostaje w kolejce
+                return
+            except Exception as e:
+                self._finish(key, "failed", None, None, [], [], error=repr(e)[:300])
+                return
+        about = getattr(full.full_chat, "about", None)
+        children = discover(about, msgs)
+        linked = []
+        linked_id = getattr(full.full_chat, "linked_chat_id", None)
+        if linked_id:
+            ch = next((c for c in getattr(full, "chats", None) or () if c.id == linked_id), None)
+            uname = EntityCache.key(getattr(ch, "username", None) or "") if ch else None
+            linked.append((uname or f"id:{linked_id}", "linked_chat", ch))
+        risk = channel_risk(about, [getattr(m, "message", None) or "" for m in msgs])
+        self._finish(key, "done", risk, entity, children, linked)
+
+    def _finish(self, key, status, risk, entity, children, linked, error=None):
+        self.stats[status] += 1
+        with Session(self.engine) as s:
+            node = get_crawl_node(s, key)
+            node.status, node.risk, node.error, node.ts_utc = status, risk, error, int(time.time())
+            if entity is not None:
+                node.title = getattr(entity, "title", None) or getattr(entity, "first_name", None)
+                if node.peer_id is None:
+                    node.peer_id = entity.id
+            s.add(node)
+            base = max(risk or 0, 1)
+            new = []
+            for dst, via, *peer in children + linked:
+                if dst == key or not add_crawl_edge(s, key, dst, via):
+                    continue
+                self.stats["edges"] += 1
+                prio = base * EDGE_WEIGHT[via]
+                child = get_crawl_node(s, dst)
+                if child is None:
+                    if node.depth + 1 > self.cfg["max_depth"]:
+                        continue
+                    ch = peer[0] if peer else None
+                    child = CrawlNode(key=dst, depth=node.depth + 1, priority=prio, ts_utc=int(time.time()),
+                                      peer_id=getattr(ch, "id", None), access_hash=getattr(ch, "access_hash", None))
+                    new.append(child)
+                elif child.status == "queued" and prio > child.priority:
+                    child.priority = prio
+                    new.append(child)
+                else:
+                    continue
+                s.add(child)
+            s.commit()
+            for c in new:
+                s.refresh(c)
+                self._push(c)   # podniesiony priorytet = duplikat w kopcu; _visit pomija nie-queued
+            self.stats["discovered"] += len(new)
+
+    async def _worker(self):
+        while True:
+            item = await self._next()
+            if item is None:
+                return
+            try:
+                await self._visit(item)
+            finally:
+                await self._done()
+
+    async def run(self):
+        """Crawl do wyczerpania frontieru, budżetu albo FloodWait; zwraca statystyki przebiegu."""
+        self._load()
+        await asyncio.gather(*(self._worker() for _ in range(self.cfg["concurrency_total"])))
+        with Session(self.engine) as s:
+            queued = len(crawl_nodes(s, "queued"))
+        return {**self.stats, "api_used": self.budget.used, "queued": queued, "stopped": self._stop}
+
+
+def export_graph(engine, path):
+    with Session(engine) as s:
+        nodes = [n.model_dump(exclude={"id", "access_hash"}) for n in crawl_nodes(s)]
+        edges = [{"src": e.src, "dst": e.dst, "via": e.via} for e in s.exec(select(CrawlEdge))]
+    nodes.sort(key=lambda n: (-(n["risk"] or 0), n["depth"], n["key"]))
+    Path(path).write_text(json.dumps({"nodes": nodes, "edges": edges}, ensure_ascii=False, indent=2), encoding="utf-8")
+    return len(nodes), len(edges)
+
+
+async def main(budget=None, max_depth=None):
+    api_id, api_hash, session_name, seeds = load_config()
+    cfg = load_settings()
+    if budget: cfg["api_budget"] = budget
+    if max_depth is not None: cfg["max_depth"] = max_depth
+    OUTDIR.mkdir(exist_ok=True)
+    engine = init_db()
+    cache = EntityCache(OUTDIR / "entity_cache.json")
+    async with new_client(session_name, api_id, api_hash) as client:
+        crawler = Crawler(client, engine, cfg, cache)
+        crawler.add_seeds(seeds)
+        try:
+            stats = await crawler.run()
+        finally:
+            cache.save()
+    print(f"[CRAWL] {json.dumps(stats)}")
+    n, e = export_graph(engine, OUTDIR / "crawl_graph.json")
+    print(f"[OK] Graf: {n} węzłów, {e} krawędzi -> {OUTDIR / 'crawl_graph.json'}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Crawler sieci kanałów TG od seedów z config.json (wznawialny)")
+    ap.add_argument("--budget", type=int, default=None, help="limit wywołań API na ten przebieg (domyślnie z scanner.yaml)")
+    ap.add_argument("--max-depth", type=int, default=None)
+    args = ap.parse_args()
+    asyncio.run(main(args.budget, args.max_depth))
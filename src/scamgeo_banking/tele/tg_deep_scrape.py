@@ -1,15 +1,38 @@
 ﻿#!/usr/bin/env python3
 # tg_deep_scrape.py â€” gÅ‚Ä™boki scraping wiadomoÅ›ci z kanaÅ‚Ã³w TG + ekstrakcja URL/IBAN/krypto
-import os, re, json, asyncio
+import os, re, json, asyncio, time, argparse
 from pathlib import Path
 from datetime import datetime
 from telethon import TelegramClient
 from telethon.errors import ChannelPrivateError, FloodWaitError, UsernameInvalidError, UsernameNotOccupiedError
 from telethon.tl.functions.channels import JoinChannelRequest
+from sqlmodel import Session
+
+from scamgeo_banking.detection.iban import validate_ibans
+from scamgeo_banking.detection.iocs import PATTERNS_TAG, scan_iocs, group_iocs
+from scamgeo_banking.detection.textcache import TextCache, content_key
+from scamgeo_banking.db import init_db, load_channel_state, save_channel_state
+from scamgeo_banking.storage.archive import MessageArchive
+from scamgeo_banking.tele.media import MediaStore
+from scamgeo_banking.tele.session_pool import SessionPool, load_accounts, new_client
+from scamgeo_banking.detection.wallets import is_valid_wallet
 
 OUTDIR = Path("scam_hunter_out")
 OUTDIR.mkdir(exist_ok=True)
 
+# powtórki tej samej wiadomości (inne emoji/białe znaki) ekstrahowane raz; cache między uruchomieniami,
+# tag z odcisku wzorców skanera — po zmianie reguł stary plik jest pomijany
+TEXT_CACHE = TextCache(path=OUTDIR / "text_cache.json", tag=f"extract-{PATTERNS_TAG}")
+# pełne treści + encje wiadomości (raport trzyma tylko 280-znakowe próbki)
+ARCHIVE = MessageArchive(OUTDIR / "archive")
+
+# Harmonogram: ile kanałów naraz, ile razy i jak długo kanał może czekać na FloodWait
+CONCURRENCY = int(os.getenv("TG_SCRAPE_CONCURRENCY", "8"))
+MAX_FLOOD_PARKS = 5
+MAX_FLOOD_WAIT = 900  # s; dłuższy FloodWait -> błąd kanału zamiast czekania
+STATE_SAMPLES = 100   # ile ostatnich próbek trzymać w stanie kanału (snapshot w db.py)
+IOC_KEYS = ("urls", "ibans", "btc", "eth", "trc20")
+
 # ReguÅ‚y ekstrakcji
 URL_RE   = re.compile(r'https?://[^\s<>"\)\]]+')
 IBAN_RE  = re.compile(r'\b[A-Z]{2}\d{2}[A-Z0-9]{11,30}\b')
@@ -20,9 +43,9 @@ TRC20_RE = re.compile(r'\bT[1-9A-HJ-NP-Za-km-z]{33}\b')  # USDT (TRON)
 def load_config():
     with open("config.json","r",encoding="utf-8") as f:
         cfg = json.load(f)
-    tg = cfg["telegram"]
+    tg = cfg.get("telegram") or {}   # przy "telegram_accounts" konta bierze session_pool
     seeds = cfg.get("seeds", [])
-    return tg["api_id"], tg["api_hash"], tg.get("session_name","scamhunter.session"), seeds
+    return tg.get("api_id"), tg.get("api_hash"), tg.get("session_name","scamhunter.session"), seeds
 
 async def get_or_join(client, handle):
     """
@@ -33,6 +56,9 @@ async def get_or_join(client, handle):
     try:
         entity = await client.get_entity(handle)
         return entity, False
+    except FloodWaitError:
+        # limit API to nie brak kanału — decyzję podejmuje wywołujący
+        raise
     except (UsernameInvalidError, UsernameNotOccupiedError):
         return None, False
     except ChannelPrivateError:
@@ -43,23 +69,71 @@ async def get_or_join(client, handle):
         try:
             entity = await client(JoinChannelRequest(handle))
             return entity, True
+        except FloodWaitError:
+            raise
         except Exception:
             return None, False
 
 def extract_from_text(text):
-    urls   = URL_RE.findall(text) if text else []
-    ibans  = IBAN_RE.findall(text) if text else []
-    btc    = BTC_RE.findall(text) if text else []
-    eth    = ETH_RE.findall(text) if text else []
-    trc20  = TRC20_RE.findall(text) if text else []
-    return urls, ibans, btc, eth, trc20
-
-async def scrape_channel(client, handle, limit=500):
+    # jeden przebieg skanera zamiast pięciu findall (URL_RE..TRC20_RE zostają dla zgodności)
+    g = group_iocs(scan_iocs(text))
+    return g["url"], g["iban"], g["btc"], g["eth"], g["trc20"]
+
+def extract_cached(text):
     """
-    Pobiera ostatnie 'limit' wiadomoÅ›ci, wyciÄ…ga wzorce,
-    zwraca strukturÄ™ z wynikami.
+    extract_from_text z cache po znormalizowanej treści (z wielkością liter —
+    portfele i IBAN-y są na nią wrażliwe). URL-e zawsze z bieżącej kopii.
     """
-    result = {
+    key, urls = content_key(text, fold=False)
+    cached = TEXT_CACHE.get(key)
+    if cached is None:
+        urls, ibans, btc, eth, trc20 = extract_from_text(text)
+        TEXT_CACHE.put(key, [ibans, btc, eth, trc20])
+        return urls, ibans, btc, eth, trc20
+    return (list(dict.fromkeys(urls)), *cached)
+
+def message_record(msg, text, urls, ibans, btc, eth, trc20):
+    """Rekord archiwum: pełny tekst, encje (linki ukryte w tekście!) i wyciągnięte IOC."""
+    ents = []
+    for e in getattr(msg, "entities", None) or ():
+        ent = {"type": type(e).__name__, "offset": e.offset, "length": e.length}
+        if getattr(e, "url", None):
+            ent["url"] = e.url
+        ents.append(ent)
+    iocs = {k: v for k, v in (("url", urls), ("iban", ibans), ("btc", btc), ("eth", eth), ("trc20", trc20)) if v}
+    return {
+        "id": msg.id,
+        "date": msg.date,
+        "text": text,
+        "entities": ents,
+        "sender_id": getattr(msg, "sender_id", None),
+        "reply_to": getattr(msg, "reply_to_msg_id", None),
+        "views": getattr(msg, "views", None),
+        "iocs": iocs,
+    }
+
+class FloodParked(Exception):
+    """FloodWait w trakcie kanału: `resume` pozwala dokończyć go po `seconds` od miejsca przerwania."""
+
+    def __init__(self, seconds, resume):
+        super().__init__(f"flood_wait:{seconds}s")
+        self.seconds = seconds
+        self.resume = resume
+
+def finalize_result(result):
+    # deduplikacja
+    result["urls"]  = sorted(set(result["urls"]))
+    # kandydaci z IBAN_RE bywają fałszywi — zostają tylko poprawne (długość/BBAN/mod-97)
+    ibans = sorted(set(result["ibans"]))
+    result["ibans"] = [i for i, ok in zip(ibans, validate_ibans(ibans)) if ok]
+    # portfele: tylko adresy z poprawną sumą kontrolną (Base58Check / bech32 / EIP-55)
+    result["btc"]   = [a for a in sorted(set(result["btc"])) if is_valid_wallet("btc", a)]
+    result["eth"]   = [a for a in sorted(set(result["eth"])) if is_valid_wallet("eth", a)]
+    result["trc20"] = [a for a in sorted(set(result["trc20"])) if is_valid_wallet("trc20", a)]
+    return result
+
+def _new_result(handle):
+    return {
         "handle": handle,
         "joined": False,
         "ok": False,
@@ -73,19 +147,43 @@ async def scrape_channel(client, handle, limit=500):
         "trc20": [],
         "samples": []  # krÃ³tkie prÃ³bki wiadomoÅ›ci z linkami
     }
-    entity, joined = await get_or_join(client, handle)
-    if not entity:
-        result["errors"].append("entity_not_accessible")
-        return result
-    result["joined"] = joined
+
+async def scrape_channel(client, handle, limit=500, resume=None, park_on_flood=False, min_id=0, media=None):
+    """
+    Pobiera ostatnie 'limit' wiadomoÅ›ci, wyciÄ…ga wzorce,
+    zwraca strukturÄ™ z wynikami.
+    min_id > 0: tylko wiadomości nowsze niż zapamiętany high-water mark kanału, od najstarszej
+    (reverse=True) — przy więcej niż `limit` nowych reszta czeka na następny przebieg, a _max_id
+    to najwyższe id, do którego nie ma luki.
+    park_on_flood=True: FloodWait rzuca FloodParked ze stanem (resume) zamiast
+    kończyć kanał błędem; ponowne wywołanie z resume kontynuuje od ostatniej wiadomości.
+    media (MediaStore): wiadomości z obrazem w limicie rozmiaru trafiają do result["_media"]
+    (także bez tekstu) — pobiera je _channel_task po zwolnieniu slotu kanału.
+    """
+    st = resume or {"result": _new_result(handle), "entity": None, "offset_id": 0, "seen": 0, "max_id": 0, "records": []}
+    result = st["result"]
     try:
-        # title/about gdy dostÄ™pne
-        if hasattr(entity, 'title'):
-            result["title"] = entity.title
-        if hasattr(entity, 'about'):
-            result["about"] = entity.about
+        if st["entity"] is None:
+            entity, joined = await get_or_join(client, handle)
+            if not entity:
+                result["errors"].append("entity_not_accessible")
+                return result
+            result["joined"] = joined
+            st["entity"] = entity
+            # title/about gdy dostÄ™pne
+            if hasattr(entity, 'title'):
+                result["title"] = entity.title
+            if hasattr(entity, 'about'):
+                result["about"] = entity.about
 
-        async for msg in client.iter_messages(entity, limit=limit):
+        # przyrostowo w przód: offset_id jest wtedy dolną granicą (wznowienie po FloodWait)
+        order = {"reverse": True} if min_id else {}
+        async for msg in client.iter_messages(st["entity"], limit=limit - st["seen"], offset_id=st["offset_id"], min_id=min_id, **order):
+            st["offset_id"] = msg.id
+            st["max_id"] = max(st["max_id"], msg.id)
+            st["seen"] += 1
+            if media is not None and media.wants(msg):
+                result.setdefault("_media", []).append(msg)
             text = None
             if msg.raw_text:
                 text = msg.raw_text
@@ -94,7 +192,8 @@ async def scrape_channel(client, handle, limit=500):
             if not text:
                 continue
 
-            urls, ibans, btc, eth, trc20 = extract_from_text(text)
+            urls, ibans, btc, eth, trc20 = extract_cached(text)
+            st["records"].append(message_record(msg, text, urls, ibans, btc, eth, trc20))
             if urls or ibans or btc or eth or trc20:
                 result["urls"].extend(urls)
                 result["ibans"].extend(ibans)
@@ -105,15 +204,17 @@ async def scrape_channel(client, handle, limit=500):
                 snippet = text.replace("\n"," ")[:280]
                 result["samples"].append({"id": msg.id, "date": str(msg.date), "text": snippet})
 
-        # deduplikacja
-        result["urls"]  = sorted(set(result["urls"]))
-        result["ibans"] = sorted(set(result["ibans"]))
-        result["btc"]   = sorted(set(result["btc"]))
-        result["eth"]   = sorted(set(result["eth"]))
-        result["trc20"] = sorted(set(result["trc20"]))
+        if min_id:
+            result["samples"].reverse()   # próbki od najnowszej, jak przy pełnym przebiegu
+        finalize_result(result)
         result["ok"] = True
+        result["_max_id"] = st["max_id"]   # nie trafia do raportu — zob. merge_channel_state
+        result["_new"] = st["seen"]
+        result["_records"] = st["records"]  # do ARCHIVE w main_async
         return result
     except FloodWaitError as e:
+        if park_on_flood:
+            raise FloodParked(e.seconds, st)
         result["errors"].append(f"flood_wait:{e.seconds}s")
         return result
     except ChannelPrivateError:
@@ -123,18 +224,117 @@ async def scrape_channel(client, handle, limit=500):
         result["errors"].append(repr(e))
         return result
 
-async def main_async():
+def _take_media(fetched, pc, data):
+    # _media rośnie przez wznowienia — nowe wpisy od ostatniego podejścia należą do konta pc
+    msgs = data.get("_media") or []
+    done = sum(len(m) for _, m in fetched)
+    if len(msgs) > done:
+        fetched.append((pc, msgs[done:]))
+
+async def _channel_task(client, handle, sem, limit, progress, min_id=0, media=None):
+    """
+    Jeden kanał = jedno zadanie. FloodWait odkłada tylko ten kanał: slot semafora
+    jest zwalniany na czas czekania, a potem scraping wraca od miejsca przerwania.
+    client może być SessionPool: konto z FloodWait jest omijane, a kanał wraca od
+    razu na innym wolnym koncie.
+    """
+    pool = client if isinstance(client, SessionPool) else SessionPool.of(client)
+    resume, parks = None, 0
+    fetched = []   # [(konto, wiadomości z obrazem)] — plik pobiera konto, które widziało wiadomość
+    while True:
+        try:
+            async with sem:
+                async with pool.lease(handle) as pc:
+                    data = await scrape_channel(pc.client, handle, limit=limit, resume=resume, park_on_flood=True, min_id=min_id, media=media)
+            _take_media(fetched, pc, data)
+            break
+        except FloodParked as fp:
+            parks += 1
+            pool.flood(pc, fp.seconds)
+            data = fp.resume["result"]
+            _take_media(fetched, pc, data)
+            data["errors"].append(f"flood_wait:{fp.seconds}s")
+            wait = pool.wait_time()
+            if parks > MAX_FLOOD_PARKS or wait > MAX_FLOOD_WAIT:
+                finalize_result(data)  # częściowy wynik — to, co zebrano przed limitem
+                break
+            print(f"[FLOOD] {handle}: {pc.name} {fp.seconds}s, wznowienie za {wait:.0f}s (po {fp.resume['seen']} wiad.)")
+            resume = fp.resume
+            if len(pool) > 1:
+                resume["entity"] = None   # access_hash encji jest per konto — rozwiąż na nowym
+            await asyncio.sleep(wait)
+    # obrazy pobierane poza semaforem kanałów (MediaStore ma własny limit), tym samym
+    # kontem co wiadomości — file_reference/access_hash zdjęcia są per konto
+    data.pop("_media", None)
+    images = [m for _, msgs in fetched for m in msgs]
+    if media is not None:
+        for pc, msgs in fetched:
+            async with pool.lease(handle, member=pc):
+                await media.fetch_all(pc.client, handle, msgs)
+    progress["done"] += 1
+    status = "ok" if data["ok"] else ",".join(data["errors"][-1:]) or "fail"
+    print(f"[SCRAPE {progress['done']}/{progress['total']}] {handle}: {status} "
+          f"urls={len(data['urls'])} ibans={len(data['ibans'])} images={len(images)} ({time.monotonic() - progress['t0']:.0f}s)")
+    return data
+
+def merge_channel_state(prev, data):
+    """
+    Scala wynik przebiegu przyrostowego ze stanem kanału z bazy.
+    Zwraca (wpis raportu w dotychczasowym kształcie, nowy stan albo None gdy nie zapisywać).
+    High-water mark przesuwa się tylko po pełnym, udanym przebiegu.
+    """
+    max_id, new = data.pop("_max_id", 0), data.pop("_new", 0)
+    if not prev:
+        prev = {"last_msg_id": 0, "samples": [], **{k: [] for k in IOC_KEYS}}
+    entry = dict(data)
+    for k in IOC_KEYS:
+        entry[k] = sorted(set(prev.get(k) or []) | set(data[k]))
+    # --full czyta wiadomości już widziane — próbka raz na id
+    samples = {x["id"]: x for x in reversed(data["samples"] + (prev.get("samples") or []))}
+    entry["samples"] = sorted(samples.values(), key=lambda x: -x["id"])[:STATE_SAMPLES]
+    if entry["title"] is None:
+        entry["title"], entry["about"] = prev.get("title"), prev.get("about")
+    if not data["ok"] or (new == 0 and prev.get("last_msg_id")):
+        return entry, None
+    state = {k: entry[k] for k in IOC_KEYS + ("title", "about", "samples")}
+    state["last_msg_id"] = max(prev.get("last_msg_id") or 0, max_id)
+    return entry, state
+
+async def main_async(concurrency=None, incremental=True, media=False):
     api_id, api_hash, session_name, seeds = load_config()
-    client = TelegramClient(session_name, api_id, api_hash)
-    await client.start()
-    print(f"Signed in as: {await client.get_me()}")
+    # kilka kont w config.json ("telegram_accounts") = seedy dzielone między sesje
+    accounts = load_accounts(default_session="scamhunter.session")
+    pool = SessionPool.from_accounts(accounts) if accounts else \
+        SessionPool.of(new_client(session_name, api_id, api_hash))
+    await pool.start()
 
     handles = [s.lstrip("@") for s in seeds if isinstance(s, str) and len(s) >= 5]
-    full = []
-    for h in handles:
-        print(f"[SCRAPE] {h}")
-        data = await scrape_channel(client, h, limit=700)
-        full.append(data)
+    # high-water marks: ostatnio widziane id wiadomości per kanał (Channel/Snapshot w db.py)
+    engine = init_db()
+    # stan wczytywany zawsze (scalanie IOC); --full pomija tylko high-water mark
+    with Session(engine) as s:
+        prev = {h: load_channel_state(s, h) for h in handles}
+    min_ids = {h: (prev.get(h) or {}).get("last_msg_id", 0) for h in handles} if incremental else {}
+    sem = asyncio.Semaphore(concurrency or CONCURRENCY)
+    store = MediaStore() if media else None
+    progress = {"done": 0, "total": len(handles), "t0": time.monotonic()}
+    # gather zachowuje kolejność seedów w raporcie
+    full = await asyncio.gather(*(
+        _channel_task(pool, h, sem, 700, progress, min_id=min_ids.get(h, 0), media=store)
+        for h in handles
+    ))
+    full = list(full)
+    archived = 0
+    with Session(engine) as s:
+        for i, h in enumerate(handles):
+            # do archiwum tylko pełne przebiegi (tylko w przód: przy --full już zarchiwizowane id są pomijane,
+            # starsza historia niż początek archiwum kanału — z ostrzeżeniem)
+            recs = full[i].pop("_records", [])
+            if full[i]["ok"]:
+                archived += ARCHIVE.append(h, recs)
+            full[i], state = merge_channel_state(prev.get(h), full[i])
+            if state is not None:
+                save_channel_state(s, h, state)
 
     # zapis raportu
     ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
@@ -142,6 +342,13 @@ async def main_async():
     with open(out_json, "w", encoding="utf-8") as f:
         json.dump({"channels": full}, f, indent=2, ensure_ascii=False)
     print(f"[OK] Saved: {out_json}")
+    TEXT_CACHE.save()
+    print(f"[CACHE] {TEXT_CACHE.summary()}")
+    print(f"[ARCHIVE] +{archived} wiadomości -> {ARCHIVE.root}")
+    if store is not None:
+        print(f"[MEDIA] {store.summary()} -> {store.manifest}")
+    print(f"[POOL] {json.dumps(pool.summary())}")
+    await pool.stop()
 
     # przygotuj domeny do whois
     domains = set()
@@ -163,7 +370,13 @@ async def main_async():
         print(f"[OK] Appended {len(domains)} domains -> {dom_txt}")
 
 if __name__ == "__main__":
-    asyncio.run(main_async())
+    ap = argparse.ArgumentParser(description="Deep scrape kanałów TG + ekstrakcja URL/IBAN/krypto")
+    ap.add_argument("--full", action="store_true", help="ignoruj high-water marks i pobierz ostatnie 700 wiadomości "
+                                                         "(stan kanału jest scalany; archiwum przyjmuje tylko id nowsze niż zapisane)")
+    ap.add_argument("--concurrency", type=int, default=None)
+    ap.add_argument("--media", action="store_true", help="pobieraj zdjęcia/obrazy do OCR (scam_hunter_out/media, dedupe id + sha256)")
+    args = ap.parse_args()
+    asyncio.run(main_async(concurrency=args.concurrency, incremental=not args.full, media=args.media))
 
 
 
@@ -1,7 +1,8 @@
 ﻿#!/usr/bin/env python3
 # extract_seeds_from_html.py
 import re, os, json, sys
-from bs4 import BeautifulSoup
+
+from scamgeo_banking.tele.html_reader import iter_html_messages
 
 HTML_FN = sys.argv[1] if len(sys.argv) > 1 else "messages.html"
 OUTDIR = "scam_hunter_out"
@@ -10,17 +11,23 @@ os.makedirs(OUTDIR, exist_ok=True)
 TG_LINK_RE = re.compile(r'(?:t\.me|telegram\.me)/([A-Za-z0-9_]+)/?')
 URL_RE = re.compile(r'https?://[^\s"<>]+')
 
-def load_html(path):
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        return f.read()
-
-def extract(text):
-    tg_handles = set()
+def extract(text, tg_handles=None, urls=None):
+    tg_handles = set() if tg_handles is None else tg_handles
+    urls = set() if urls is None else urls
     for m in TG_LINK_RE.finditer(text):
         handle = m.group(1)
         if handle:
             tg_handles.add(handle)
-    urls = set(URL_RE.findall(text))
+    urls.update(URL_RE.findall(text))
+    return tg_handles, urls
+
+def extract_export(path):
+    """Strumieniowo po wszystkich messages*.html: tekst i linki wiadomości."""
+    tg_handles, urls = set(), set()
+    for m in iter_html_messages(path):
+        extract(m.text, tg_handles, urls)
+        for link in m.links:
+            extract(link, tg_handles, urls)
     return sorted(tg_handles), sorted(urls)
 
 def append_seeds_to_config(handles):
@@ -37,14 +44,7 @@ def append_seeds_to_config(handles):
     print(f"Config seeds updated: {before} -> {len(seeds)}")
 
 def main():
-    text = load_html(HTML_FN)
-    try:
-        soup = BeautifulSoup(text, "lxml")
-        text = soup.get_text(" ")
-    except Exception:
-        pass
-
-    tg_handles, urls = extract(text)
+    tg_handles, urls = extract_export(HTML_FN)
 
     with open(os.path.join(OUTDIR, "html_seeds.json"), "w", encoding="utf-8") as f:
         json.dump({"tg_handles": tg_handles}, f, indent=2, ensure_ascii=False)
@@ -2,7 +2,9 @@
 # extract_seeds_v2.py
 # Z: messages.html + channels.csv + @wzmianki + t.me/(handle|joinchat|+code) + manual_seeds.txt
 import re, os, sys, json, csv
-from bs4 import BeautifulSoup
+
+from scamgeo_banking.detection.iocs import scan_iocs
+from scamgeo_banking.tele.html_reader import iter_html_messages
 
 HTML = "messages.html"
 CHANNELS_CSV = "channels.csv"                 # jeÅ›li jest
@@ -16,36 +18,22 @@ TG_URL_HANDLE = re.compile(r'(?:https?://)?(?:t\.me|telegram\.me)/([A-Za-z0-9_]{
 TG_URL_JOIN = re.compile(r'(?:https?://)?(?:t\.me|telegram\.me)/(?:joinchat/\w+|\+[A-Za-z0-9_-]{10,})')
 URL_RE = re.compile(r'https?://[^\s"<>]+')
 
-def read_text(path):
-    try:
-        return open(path, "r", encoding="utf-8", errors="ignore").read()
-    except:
-        return ""
-
-def extract_from_html(html_text):
+def extract_from_html(path):
+    """Strumieniowo po messages*.html (czytnik eksportu): tekst i linki każdej wiadomości."""
     handles, joinlinks, urls = set(), set(), set()
-    try:
-        soup = BeautifulSoup(html_text, "lxml")
-        text = soup.get_text(" ")
-        html_text = text if text else html_text
-    except Exception:
-        pass
-
-    # @wzmianki
-    for m in TG_HANDLE.finditer(html_text):
-        handles.add(m.group(1))
-
-    # t.me/handle[/post]
-    for m in TG_URL_HANDLE.finditer(html_text):
-        handles.add(m.group(1))
-
-    # zaproszenia joinchat / +kod
-    for m in TG_URL_JOIN.finditer(html_text):
-        joinlinks.add(m.group(0))
-
-    # zwykÅ‚e URL-e (do WHOIS)
-    for u in URL_RE.findall(html_text):
-        urls.add(u)
+    if not os.path.exists(path):
+        return handles, joinlinks, urls
+
+    # jeden przebieg: @wzmianki, t.me/handle[/post], joinchat/+kod i zwykłe URL-e (do WHOIS)
+    for m in iter_html_messages(path):
+        for text in [m.text, *m.links]:
+            for span in scan_iocs(text):
+                if span.kind == "tg_handle":
+                    handles.add(span.value)
+                elif span.kind == "tg_join":
+                    joinlinks.add(span.value)
+                elif span.kind == "url":
+                    urls.add(span.value)
 
     return handles, joinlinks, urls
 
@@ -92,8 +80,7 @@ def update_config(handles):
     return before, len(seeds)
 
 def main():
-    html_text = read_text(HTML)
-    h1, joinlinks, urls = extract_from_html(html_text)
+    h1, joinlinks, urls = extract_from_html(HTML)
     h2 = extract_from_channels_csv()
     h3 = read_manual()
     all_handles = h1 | h2 | h3
@@ -1,65 +1,56 @@
-﻿# zapisz ten plik i uruchom: python -m pip install beautifulsoup4 langdetect
-# potem: python geo_linguistic_probe.py messages.html
-import sys, re, json
-from bs4 import BeautifulSoup
-from langdetect import detect, DetectorFactory
-from datetime import datetime
+﻿# zapisz ten plik i uruchom: python -m pip install langdetect  (opcjonalnie lxml)
+# potem: python geo_linguistic_probe.py messages.html   (messages2.html, ... są czytane automatycznie)
+# Wynik: rozkład języków per autor + czasy odpowiedzi każdej pary autorów
+# (detection/reply_latency) -> scam_hunter_out/reply_latency.json
+import json, argparse, os
+from collections import Counter, defaultdict
+from langdetect import DetectorFactory
+from scamgeo_banking.detection.langid import detect_languages
+from scamgeo_banking.detection.reply_latency import MAX_GAP, reply_report
+from scamgeo_banking.tele.html_reader import iter_html_messages
 DetectorFactory.seed = 0
 
-fn = sys.argv[1]
-with open(fn,"r",encoding="utf-8",errors="ignore") as f:
-    s = BeautifulSoup(f,"lxml")
-
-msgs=[]
-for el in s.find_all(class_=re.compile(r"(message|msg|bubble|row)")):
-    # author
-    a=el.find(class_=re.compile(r"(from_name|name|from)"))
-    author=a.get_text(strip=True) if a else ""
-    # time
-    d=el.find(class_=re.compile(r"(date|time|details)"))
-    dt = d['title'] if d and d.has_attr('title') else (d.get_text(strip=True) if d else "")
-    # text
-    t=el.find(class_=re.compile(r"(text|body|bubble)"))
-    txt = t.get_text(" ",strip=True) if t else el.get_text(" ",strip=True)
-    msgs.append({"author":author,"dt":dt,"text":txt})
-
-# normalize, detect messages for Laura and K N, compute reply delays and language distribution
-laura=[m for m in msgs if "laura" in m['author'].lower() or "polat" in m['author'].lower()]
-kn=[m for m in msgs if m['author'].strip().upper().startswith("K N") or m['author'].strip()=="K N"]
-for m in laura+kn:
-    try:
-        m['lang']=detect(m['text'])
-    except:
-        m['lang']="unk"
-print("Laura msgs:",len(laura),"K N msgs:",len(kn))
-lc={}
-for m in laura:
-    lc[m['lang']]=lc.get(m['lang'],0)+1
-print("Laura lang dist:",lc)
-
-# simple reaction time
-from datetime import datetime
-def parse_dt(s):
-    for fmt in ("%d.%m.%Y %H:%M","%H:%M","%d.%m.%Y %H:%M:%S"):
-        try:
-            return datetime.strptime(s,fmt)
-        except:
-            continue
-    return None
-
-deltas=[]
-for k in kn:
-    pk=parse_dt(k['dt'])
-    if not pk: continue
-    later=[l for l in laura if parse_dt(l['dt']) and parse_dt(l['dt'])>=pk]
-    if later:
-        deltas.append((parse_dt(later[0]['dt'])-pk).total_seconds())
-if deltas:
-    import statistics
-    print("Median reply (s):",statistics.median(deltas),"Mean(s):",statistics.mean(deltas))
-else:
+OUTDIR = "scam_hunter_out"
+LANG_SAMPLE = 500   # tekstów na autora do wykrywania języka
+
+ap = argparse.ArgumentParser(description="Języki i czasy odpowiedzi autorów z eksportu HTML Telegrama")
+ap.add_argument("fn", help="messages.html albo katalog eksportu")
+ap.add_argument("--max-gap", type=float, default=MAX_GAP / 3600, help="maks. przerwa liczona jako odpowiedź (godziny, 0 = bez limitu)")
+ap.add_argument("--min-replies", type=int, default=3)
+args = ap.parse_args()
+
+# jeden strumieniowy przebieg po eksporcie; w pamięci tylko (autor, czas) + próbka tekstów
+times = []
+texts = defaultdict(list)
+for m in iter_html_messages(args.fn):
+    author = m.author.strip()
+    times.append((author, m.timestamp))
+    if len(texts[author]) < LANG_SAMPLE:
+        texts[author].append(m.text)
+
+msg_count = Counter(a for a, _ in times)
+print("Msgs per author:", dict(msg_count.most_common()))
+
+# jedno wsadowe wywołanie: powtórki z cache, krótkie wiadomości -> "unk"
+authors = list(texts)
+flat = [t for a in authors for t in texts[a]]
+langs = iter(detect_languages(flat))
+lang_dist = {a: dict(Counter(next(langs) or "unk" for _ in texts[a]).most_common()) for a in authors}
+for a in authors:
+    print(f"{a} lang dist:", lang_dist[a])
+
+# czasy odpowiedzi: każda para (autor -> odpowiadający), daty sparsowane raz przez czytnik
+report = reply_report(times, max_gap=args.max_gap * 3600 or None, min_replies=args.min_replies)
+for r in report:
+    off = "?" if r["utc_offset"] is None else f"{r['utc_offset']:+d}"
+    print(f"{r['responder']} -> {r['author']}: n={r['n']} median={r['median']:.0f}s "
+          f"p90={r['percentiles']['p90']:.0f}s mean={r['mean']:.0f}s UTC{off}")
+if not report:
     print("No reply deltas computed")
 
-
-
-
+os.makedirs(OUTDIR, exist_ok=True)
+out = os.path.join(OUTDIR, "reply_latency.json")
+with open(out, "w", encoding="utf-8") as f:
+    json.dump({"source": args.fn, "messages": dict(msg_count), "languages": lang_dist, "pairs": report},
+              f, ensure_ascii=False, indent=2)
+print("Saved:", out)
@@ -1,35 +1,62 @@
 ﻿"""
 ocr_pipeline.py
 - run OCR on all images in a folder, extract text, save CSV with filename and extracted text
+- folder z manifest.jsonl (tg_deep_scrape --media): każdy sha256 OCR-owany raz, wyniki
+  w <folder>/ocr.jsonl (kolejne uruchomienia obrabiają tylko nowe obrazy), a CSV
+  dostaje listę wiadomości (kanał/msg_id) z danym obrazem
 """
-import os, sys, csv
+import os, sys, csv, json
+from collections import defaultdict
 from PIL import Image
 import pytesseract
 
+from scamgeo_banking.tele.media import iter_manifest
+
 if len(sys.argv)<2:
     print("Usage: python ocr_pipeline.py images_folder")
     sys.exit(1)
 
 img_dir = sys.argv[1]
 out_csv = "ocr_results.csv"
-rows=[]
-for fname in os.listdir(img_dir):
-    if not fname.lower().endswith((".png",".jpg",".jpeg",".webp")):
-        continue
-    path = os.path.join(img_dir,fname)
+
+def ocr(path):
     try:
         txt = pytesseract.image_to_string(Image.open(path), lang='eng+fra+deu+pol')
     except Exception as e:
         txt = ""
-    rows.append((fname, txt.strip()[:5000]))
+    return txt.strip()[:5000]
+
+rows=[]
+if os.path.exists(os.path.join(img_dir, "manifest.jsonl")):
+    files, refs = {}, defaultdict(list)
+    for r in iter_manifest(img_dir):
+        files[r["sha256"]] = r["path"]
+        refs[r["sha256"]].append(f"{r['channel']}/{r['msg_id']}")
+    cache_fn = os.path.join(img_dir, "ocr.jsonl")
+    done = {}
+    if os.path.exists(cache_fn):
+        with open(cache_fn, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    r = json.loads(line)
+                    done[r["sha256"]] = r["text"]
+                except ValueError:
+                    break
+    with open(cache_fn, "a", encoding="utf-8") as cache:
+        for sha, rel in files.items():
+            if sha not in done:
+                done[sha] = ocr(os.path.join(img_dir, rel))
+                cache.write(json.dumps({"sha256": sha, "text": done[sha]}, ensure_ascii=False) + "\n")
+            rows.append((rel, done[sha], ";".join(dict.fromkeys(refs[sha]))))
+else:
+    for fname in os.listdir(img_dir):
+        if not fname.lower().endswith((".png",".jpg",".jpeg",".webp")):
+            continue
+        rows.append((fname, ocr(os.path.join(img_dir,fname)), ""))
 # write CSV
 with open(out_csv,"w",newline='',encoding="utf-8") as cf:
     writer = csv.writer(cf)
-    writer.writerow(["filename","text_snippet"])
+    writer.writerow(["filename","text_snippet","messages"])
     for r in rows:
         writer.writerow(r)
 print("OCR done ->", out_csv)
-
-
-
-
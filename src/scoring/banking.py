@@ -1,4 +1,9 @@
 from __future__ import annotations
+import hashlib
+import re
+from typing import Dict, List, Optional, Sequence
+
+from scamgeo_banking.scoring.rules import Rule, RuleEngine, rules_from_patterns
 
 
 BANK_KEYWORDS = [
@@ -6,8 +11,8 @@ BANK_KEYWORDS = [
 r"(podwoj.*(pieniadz|kase|profit|inwestycje))",
 r"(gwarantowan[ey] zwrot|garantierte[rs]? gewinn|guaranteed return)",
 r"(zadani(a|e) za lajki|like tasks|video tasks|pay per like)",
-r"(USDT|TRC20|ERC20|recharge|top[- ]?up|binance agent)",
-r"(skontaktuj .*WhatsApp|kontakt .*WhatsApp|WhatsApp:\s*\+?\d+)",
+r"(recharge|top[- ]?up|binance agent)",   # USDT/TRC20/ERC20: reguła "usdt"
+r"(skontaktuj .*WhatsApp|kontakt .*WhatsApp)",   # "WhatsApp: +48...": reguła "whatsapp"
 r"(krypto (mentor|doradca)|crypto mentor|VIP signals)",
 r"(Revolut|Wise|gift card|voucher payment)",
 ]
@@ -25,40 +30,26 @@ TG_RE = re.compile(r"t\.me/[A-Za-z0-9_]{3,}" , re.I)
 USDT_RE = re.compile(r"USDT|TRC20|ERC20", re.I)
 
 
+# fragmenty hosta to podciągi; "[...]" oznacza klasę znaków
+_FRAGMENT_PATTERNS = [f if "[" in f else re.escape(f) for f in BANK_DOMAINS_BAD_FRAGMENTS]
 
+# paczki bankowe w jednym matcherze; każdy termin w jednej regule, wagi jak w dawnym score_text
+# (RISK_KEYWORDS/AD_MARKERS dublują usdt/whatsapp/telegram — zostają w default_rules() dla Telegrama)
+ENGINE = RuleEngine(
+    rules_from_patterns("kw", BANK_KEYWORDS, 20)
+    + [Rule("whatsapp", WHATSAPP_RE.pattern, 20), Rule("telegram", TG_RE.pattern, 10), Rule("usdt", USDT_RE.pattern, 25)],
+    url_rules=rules_from_patterns("dodgy_tld", _FRAGMENT_PATTERNS, 15),
+)
 
-def score_text(text: str, url: str | None = None) -> Dict:
-text_l = text.lower()
-hits: List[ScoreHit] = []
-
-
-for pat in BANK_KEYWORDS:
-m = re.search(pat, text_l)
-if m:
-hits.append(ScoreHit(f"kw:{pat}", 20, m.group(0)[:120]))
+# odcisk zestawu reguł — unieważnia zapisane na dysku cache wyników po zmianie reguł/wag
+RULES_TAG = hashlib.sha256(
+    repr([(r.name, r.pattern, r.weight) for r in ENGINE.rules + ENGINE.url_rules] + sorted(ENGINE.weights.items())).encode()
+).hexdigest()[:16]
 
 
-if WHATSAPP_RE.search(text):
-hits.append(ScoreHit("whatsapp", 20, "whatsapp contact"))
-if TG_RE.search(text):
-hits.append(ScoreHit("telegram", 10, "telegram handle"))
-if USDT_RE.search(text):
-hits.append(ScoreHit("usdt", 25, "USDT mention"))
-
-
-if url:
-ext = tldx(url)
-domain = f"{ext.domain}.{ext.suffix}" if ext.suffix else ext.domain
-host = ".".join(part for part in [ext.subdomain, ext.domain, ext.suffix] if part)
-for frag in BANK_DOMAINS_BAD_FRAGMENTS:
-if frag in host.lower():
-hits.append(ScoreHit("dodgy_tld", 15, host))
+def score_text(text: str, url: str | None = None) -> Dict:
+    return ENGINE.score(text, url)
 
 
-score = sum(h.weight for h in hits)
-label = "banking_scam" if score >= 40 else ("suspicious" if score >= 25 else "unknown")
-return {
-"score": min(score, 100),
-"label": label,
-"hits": [h.__dict__ for h in hits],
-}
\ No newline at end of file
+def score_batch(texts: Sequence[str], urls: Optional[Sequence[Optional[str]]] = None) -> List[Dict]:
+    return ENGINE.score_batch(texts, urls)
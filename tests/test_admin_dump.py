@@ -0,0 +1,117 @@
+import asyncio
+import importlib
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from telethon.tl.types import Channel, ChatPhotoEmpty, InputPeerChannel
+
+
+def _channel(cid, username):
+    return Channel(id=cid, title=username.upper(), photo=ChatPhotoEmpty(), date=None, access_hash=cid * 7, username=username)
+
+
+class FakeClient:
+    """get_entity(str) = ResolveUsername (liczone); get_entity(InputPeerChannel) = GetChannels."""
+
+    def __init__(self, names):
+        self.by_name = {n: _channel(i + 100, n) for i, n in enumerate(names)}
+        self.resolves = 0
+        self.active = self.peak = 0
+
+    async def get_entity(self, peer):
+        if isinstance(peer, InputPeerChannel):
+            return next(c for c in self.by_name.values() if c.id == peer.channel_id)
+        self.resolves += 1
+        return self.by_name[peer.lstrip("@")]
+
+    async def __call__(self, request):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.005)
+            full_chat = SimpleNamespace(about="kontakt: @boss_admin", pinned_msg_id=None, linked_chat_id=None)
+            return SimpleNamespace(full_chat=full_chat, chats=[])
+        finally:
+            self.active -= 1
+
+    async def iter_participants(self, entity, **kw):
+        yield SimpleNamespace(id=1, username="real_admin", first_name=None, last_name=None, participant=None)
+
+    async def iter_messages(self, entity, limit=None):
+        yield SimpleNamespace(message=f"pisz do @{entity.username}_support", entities=None)
+
+
+def test_dump_all_bounded_and_entity_cache_skips_resolve(tmp_path):
+    ad = importlib.import_module("scamgeo_banking.tele.tg_admin_dump")
+    from scamgeo_banking.tele.entity_cache import EntityCache
+
+    seeds = ["@alpha_chan", "bravo_chan", "https://t.me/charlie_chan", "delta_chan", "echo_chan"]
+    client = FakeClient(["alpha_chan", "bravo_chan", "charlie_chan", "delta_chan", "echo_chan"])
+    client.by_name["https://t.me/charlie_chan"] = client.by_name["charlie_chan"]
+
+    cache = EntityCache(tmp_path / "entity_cache.json")
+    out = asyncio.run(ad.dump_all(client, seeds, concurrency=2, cache=cache))
+    assert [o["handle"] for o in out] == seeds
+    assert client.peak <= 2 and client.resolves == 5
+    first = out[0]
+    assert first["admins"][0]["username"] == "real_admin"
+    assert [(s["username"], s["reason"]) for s in first["suspected_admins"]] == [
+        ("boss_admin", "about_mention"), ("alpha_chan_support", "text_mention")]
+    cache.save()
+
+    # kolejny przebieg: nazwy z trwałego cache, zero ResolveUsername
+    cache2 = EntityCache(tmp_path / "entity_cache.json")
+    assert cache2.get("@ALPHA_chan")["access_hash"] == 700
+    out2 = asyncio.run(ad.dump_all(client, seeds, concurrency=3, cache=cache2))
+    assert client.resolves == 5 and cache2.hits == 5
+    assert out2 == out
+
+
+class HistoryClient(FakeClient):
+    """Kanał z długą historią: co 1000. wiadomość to kontakt @handler_N, reszta to szum."""
+
+    def __init__(self, n):
+        super().__init__(["big_chan"])
+        self.n = n
+        self.limits = []
+
+    async def iter_messages(self, entity, limit=None):
+        self.limits.append(limit)
+        t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for i in range(min(limit or self.n, self.n)):
+            text = f"napisz do @handler_{i % 3000 // 1000} po bonus" if i % 1000 == 0 else "spam spam @ x"
+            yield SimpleNamespace(message=text, entities=None, date=t0 + timedelta(minutes=i))
+
+
+def test_full_history_counts_first_last_seen_and_streams_new_suspects():
+    ad = importlib.import_module("scamgeo_banking.tele.tg_admin_dump")
+
+    client = HistoryClient(100_000)
+    streamed = []
+    out = asyncio.run(ad.dump_all(client, ["big_chan"], history=None, sink=lambda h, it: streamed.append((h, it["username"]))))
+    assert client.limits == [None]
+    sus = {s["username"]: s for s in out[0]["suspected_admins"] if s["reason"] == "text_mention"}
+    assert sorted(sus) == ["handler_0", "handler_1", "handler_2"]
+    assert sus["handler_0"]["count"] == 34 and sus["handler_1"]["count"] == 33
+    assert sus["handler_0"]["first_seen"] == "2024-01-01T00:00:00+00:00"
+    assert sus["handler_2"]["last_seen"] == (datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=98_000)).isoformat()
+    # każdy podejrzany wysłany do strumienia dokładnie raz
+    assert sorted(streamed) == sorted({("big_chan", s["username"]) for s in out[0]["suspected_admins"]})
+
+
+class FloodingHistoryClient(FakeClient):
+    async def iter_messages(self, entity, limit=None):
+        from telethon.errors import FloodWaitError
+        raise FloodWaitError(request=None, capture=7)
+        yield
+
+
+def test_step_flood_is_reported_to_the_pool():
+    ad = importlib.import_module("scamgeo_banking.tele.tg_admin_dump")
+    from scamgeo_banking.tele.session_pool import SessionPool
+
+    pool = SessionPool([("acc", FloodingHistoryClient(["alpha_chan"]))], min_interval=0.0)
+    out = asyncio.run(ad.dump_all(pool, ["alpha_chan"]))
+    assert out[0]["errors"] == ["scan_last_msgs after 0 msgs: flood_wait:7s"] and "_flood" not in out[0]
+    assert out[0]["admins"]   # wynik częściowy z pozostałych kroków
+    assert pool.summary()["acc"]["floods"] == 1 and pool.summary()["acc"]["flood_s"] == 7
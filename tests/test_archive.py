@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+
+from scamgeo_banking.storage import archive as arc
+from scamgeo_banking.storage.archive import MessageArchive
+
+
+def _recs(ids):
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [{"id": i, "date": t0 + timedelta(days=i), "text": f"wiadomość {i} " + "x" * 50,
+             "entities": [{"type": "MessageEntityTextUrl", "offset": 0, "length": 3, "url": f"https://h{i}.example"}]}
+            for i in ids]
+
+
+def test_archive_append_is_monotonic_and_reader_streams_by_range(tmp_path, monkeypatch):
+    monkeypatch.setattr(arc, "FRAME_RECORDS", 10)
+    a = MessageArchive(tmp_path / "archive")
+    assert a.append("@chan_one", _recs(range(30, 0, -1))) == 30   # Telethon: od najnowszych
+    assert a.append("@chan_one", _recs(range(25, 36))) == 5        # tylko id > 30
+    assert a.append("other", _recs([1, 2])) == 2
+    assert a.last_id("@chan_one") == 35 and len(a.index("@chan_one")) == 4
+
+    # nowa instancja czyta wszystko z plików (indeks + segmenty)
+    b = MessageArchive(tmp_path / "archive")
+    assert sorted(b.channels()) == ["@chan_one", "other"]
+    all_ids = [r["id"] for r in b.iter_messages("@chan_one")]
+    assert all_ids == list(range(1, 36))
+    r = next(b.iter_messages("@chan_one", min_id=7, max_id=7))
+    assert r["text"].startswith("wiadomość 7") and r["entities"][0]["url"] == "https://h7.example"
+    assert r["date"] == "2024-01-08T00:00:00+00:00" and r["channel"] == "@chan_one"
+    win = [r["id"] for r in b.iter_messages("@chan_one", since="2024-01-12T00:00:00Z", until=datetime(2024, 1, 14, tzinfo=timezone.utc))]
+    assert win == [11, 12, 13]
+    assert b.stats()["messages"] == 37
+
+
+def test_archive_ignores_unindexed_tail_after_interrupted_write(tmp_path):
+    a = MessageArchive(tmp_path)
+    a.append("c", _recs([1, 2, 3]))
+    seg = tmp_path / "c" / a.index("c")[0]["file"]
+    with open(seg, "ab") as f:
+        f.write(b"\x00garbage")   # ramka bez linii w indeksie
+    a.append("c", _recs([4]))
+    assert [r["id"] for r in MessageArchive(tmp_path).iter_messages("c")] == [1, 2, 3, 4]
+
+
+def _append_worker(root, start):
+    MessageArchive(root).append("c", _recs(range(start, start + 50)))
+
+
+def test_archive_append_is_safe_across_processes(tmp_path):
+    import multiprocessing
+
+    stale = MessageArchive(tmp_path)
+    assert stale.last_id("c") == 0   # indeks wczytany, zanim inne procesy dopisały
+    procs = [multiprocessing.Process(target=_append_worker, args=(str(tmp_path), 1 + 50 * i)) for i in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert stale.append("c", _recs(range(1, 211))) == 10   # indeks czytany od nowa pod blokadą
+    ids = [r["id"] for r in MessageArchive(tmp_path).iter_messages("c")]
+    assert ids == sorted(set(ids)) and ids[-10:] == list(range(201, 211))
+    assert all(p.exitcode == 0 for p in procs)
+
+
+def test_archive_is_forward_only_and_warns_about_backfill(tmp_path, caplog):
+    a = MessageArchive(tmp_path)
+    a.append("c", _recs(range(50, 61)))
+    with caplog.at_level("WARNING", logger="scamgeo_banking.storage.archive"):
+        assert a.append("c", _recs(range(55, 61))) == 0   # już w archiwum — bez ostrzeżenia
+        assert not caplog.records
+        assert a.append("c", _recs(range(40, 63))) == 2   # --full: 40..49 starsze niż początek archiwum
+    assert "10" in caplog.text and [r["id"] for r in a.iter_messages("c")] == list(range(50, 63))
@@ -0,0 +1,77 @@
+import random
+
+from scamgeo_banking.detection.brand import BrandMatcher, load_matcher, match_brands
+
+
+def test_matcher_equals_naive_substring_scan():
+    rnd = random.Random(7)
+    brands = [
+        {"name": f"b{i}", "patterns": ["".join(rnd.choice("abcd") for _ in range(rnd.randint(1, 5))) for _ in range(3)]}
+        for i in range(150)
+    ]
+    m = BrandMatcher.from_brands(brands)
+    for _ in range(200):
+        text = "".join(rnd.choice("abcde ") for _ in range(80))
+        naive = [b["name"] for b in brands if any(p in text for p in b["patterns"])]
+        assert m.match(text) == naive
+        assert match_brands(text, brands) == naive
+
+
+def test_load_matcher_roundtrip_cache(tmp_path):
+    y = tmp_path / "brands.yaml"
+    y.write_text('brands:\n  - name: "Erste"\n    patterns: ["erste","george"]\n', encoding="utf-8")
+    cache = tmp_path / "brands.ac.json"
+    first = load_matcher(str(y), str(cache))
+    assert cache.exists()
+    second = load_matcher(str(y), str(cache))
+    assert first.match("Login GEORGE") == second.match("Login GEORGE") == ["Erste"]
+
+
+def test_lookalike_index():
+    from scamgeo_banking.detection.lookalike import LookalikeIndex, skeleton
+
+    brands = [
+        {"name": "Erste", "patterns": ["erste", "sparkasse", "erstebank"], "trusted": {"erstebank.at", "sparkasse.at"}},
+        {"name": "Raiffeisen", "patterns": ["raiffeisen", "mein-elba"], "trusted": {"raiffeisen.at"}},
+    ]
+    ix = LookalikeIndex(brands)
+    assert skeleton("raiffe1sen") == skeleton("raіffeisen")  # cyrylickie "і"
+    hit = ix.match("https://raiffe1sen-secure.net/login")
+    assert (hit.brand, hit.reason) == ("Raiffeisen", "homoglyph")
+    hit = ix.match("erstebnak.at")
+    assert (hit.trusted_domain, hit.reason, hit.distance) == ("erstebank.at", "typo", 1)
+    assert ix.match("mein-elba-login.com").reason == "brand_token"
+    assert ix.match("www.erstebank.at") is None and ix.match("login.sparkasse.at") is None
+    assert ix.match("example.com") is None
+    # dosłownie ta sama etykieta pod inną TLD to nie homoglif
+    hit = ix.match("raiffeisen.top")
+    assert (hit.trusted_domain, hit.reason) == ("raiffeisen.at", "tld_swap")
+    assert ix.match("rаiffeisen.top").reason == "homoglyph"   # cyrylickie "а"
+    short = LookalikeIndex([{"name": "Wise", "patterns": ["wise"], "trusted": {"wise.com"}}])
+    assert short.match("wise.pl") is None                     # nazwa za mało charakterystyczna
+    hit = ix.match("raiffeisen.at.evil.com")
+    assert (hit.brand, hit.reason) == ("Raiffeisen", "subdomain")
+    assert ix.match("raiffeisen.co.at").reason == "tld_swap"
+
+
+def test_lookalike_index_skips_shared_labels_and_short_typos():
+    from scamgeo_banking.detection.lookalike import LookalikeIndex
+
+    ix = LookalikeIndex([
+        {"name": "Erste", "patterns": ["erste", "sparkasse", "george"], "trusted": {"sparkasse.at", "george.at"}},
+        {"name": "Sparkasse DE", "patterns": ["sparkasse"], "trusted": {"sparkasse-de.example"}},
+    ])
+    assert ix.match("sparkasse.de") is None                    # etykieta dwóch brandów — nie wiadomo, czyja
+    assert ix.match("george.com").reason == "tld_swap"
+    assert ix.match("sparkasse-login.de").reason == "brand_token"
+    assert ix.match("georg.com") is None and ix.match("gearge.com") is None   # ≤ 6 znaków: tylko dokładnie
+
+
+def test_load_index_resolves_repo_path_and_logs_fallback(tmp_path, monkeypatch, caplog):
+    from scamgeo_banking.detection.lookalike import load_index
+
+    monkeypatch.chdir(tmp_path)   # configs/ względem repozytorium, nie katalogu bieżącego
+    assert load_index().match("erstebnak.at").brand == "Erste"
+    with caplog.at_level("WARNING", logger="scamgeo_banking.detection.lookalike"):
+        assert load_index(str(tmp_path / "brak.yaml")).match("erstebnak.at") is None
+    assert "brak.yaml" in caplog.text
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session
+
+from scamgeo_banking.tele import telegram as T
+
+
+def _records():
+    t0 = datetime(2024, 3, 1, 7, tzinfo=timezone.utc)
+    texts = [
+        "Przelej 500 zł na konto, zwrot gwarantowany https://zysk-szybki.pl/start 🇵🇱",
+        "Guten Tag, bitte überweisen Sie 200 EUR heute noch https://gewinn.de/a",
+        "Dzień dobry, czekam na przelew PLN, proszę o potwierdzenie wpłaty",
+        "ok",
+    ]
+    return [
+        {"id": i + 1, "date": t0 + timedelta(hours=i * 5), "text": texts[i % 4],
+         "urls": [u for u in texts[i % 4].split() if u.startswith("http")], "author": i % 3}
+        for i in range(40)
+    ]
+
+
+def test_incremental_state_matches_full_recompute(tmp_path, monkeypatch):
+    recs = _records()
+    full, _ = T.combine_signals(
+        T.collect_language_signals(recs, workers=1),
+        T.infer_timezone_offset([r["date"] for r in recs]),
+        T.collect_currency_signals(recs), T.collect_tld_signals(recs), T.collect_flag_emojis(recs),
+    )
+
+    st = T.CountryInferenceState("@demo")
+    assert st.add_records(recs[:25]) == 25
+    assert st.add_records(recs[:30]) == 5          # stare wiadomości są pomijane
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "state.db"))
+    from scamgeo_banking.db import init_db
+    with Session(init_db()) as s:
+        st.save(s)
+        st = T.CountryInferenceState.load(s, "@demo")
+    assert st.add_records(recs) == 10
+    ranked, _ = st.ranking()
+    assert ranked == full
+    assert st.report()["confidence"] == T.confidence_of(full)
+
+
+def test_per_author_cap_only_with_several_authors():
+    text = "Dzień dobry, proszę o przelew na konto jeszcze dzisiaj"
+    one = [{"text": text, "author": 7}] * 250      # kanał / rozmowa z jednym użytkownikiem
+    two = one + [{"text": text, "author": 8}] * 250
+    assert T.collect_language_signals(one, workers=1) == {"pl": 250}
+    assert T.collect_language_signals(two, workers=1) == {"pl": 400}
+    st = T.CountryInferenceState("@one")
+    st.add_records([dict(r, id=i + 1) for i, r in enumerate(one)])
+    assert st.lang_counts == {"pl": 250}
+    # drugi autor w kolejnej partii: limit działa od początku, jak na całej historii naraz
+    st.add_records([dict(r, id=300 + i) for i, r in enumerate(two[250:])])
+    assert st.lang_counts == T.collect_language_signals(two, workers=1) == {"pl": 400}
+
+
+def test_date_cutoff_keeps_new_messages_from_boundary_second():
+    t = datetime(2024, 3, 1, 7, tzinfo=timezone.utc)
+    old = [{"id": 1, "date": t - timedelta(seconds=1), "text": "a"}, {"id": 2, "date": t, "text": "b"}]
+    st = T.CountryInferenceState("@export")
+    assert T.add_stream(st, iter(old)) == 2
+    grown = old + [{"id": 3, "date": t, "text": "c"}, {"id": 4, "date": t + timedelta(seconds=1), "text": "d"}]
+    assert T.add_stream(T.CountryInferenceState.from_json(st.to_json()), iter(grown)) == 2   # id 3 z tej samej sekundy
+    assert T.add_stream(st, iter(grown)) == 2 and T.add_stream(st, iter(grown)) == 0
+
+
+def test_scan_country_signals_single_pass():
+    cur, tlds, flags = T.scan_country_signals(
+        "Wpłać 500 zł albo 20 Ft 🇵🇱🇭🇺", ["https://zysk.pl/a", "http://user@x.gewinn.de:8080/b", "https://example.com"]
+    )
+    assert cur == ["Poland", "Hungary"]  # kolejność jak w CURRENCY_SIGNALS
+    assert tlds == ["Poland", "Germany"]
+    assert flags == ["Poland", "Hungary"]
@@ -0,0 +1,104 @@
+import asyncio
+import importlib
+import json
+from types import SimpleNamespace
+
+from telethon.tl.types import Channel, ChatPhotoEmpty, InputPeerChannel, User
+
+
+def _channel(cid, username):
+    return Channel(id=cid, title=f"T{cid}", photo=ChatPhotoEmpty(), date=None, access_hash=cid * 3, username=username)
+
+
+# sieć: alpha -> (opis) bravo, (link) charlie, (dyskusja bez nazwy) id:900; bravo -> delta; charlie -> @boss_man (user)
+GRAPH = {
+    "alpha_chan": (1, "kontakt @bravo_chan", ["wpłaty USDT TRC20 t.me/charlie_chan"], 900),
+    "bravo_chan": (2, "", ["pisz do @delta_chan"], None),
+    "charlie_chan": (3, "admin: @boss_man IBAN DE89370400440532013000", [], None),
+    "delta_chan": (4, "", ["@echo_chan"], None),
+    "echo_chan": (5, "", [], None),
+    None: (900, "", ["tu też @alpha_chan"], None),
+}
+
+
+class FakeClient:
+    def __init__(self):
+        self.ents = {u: _channel(cid, u) for u, (cid, *_ ) in GRAPH.items()}
+        self.user = User(id=77, first_name="Boss", username="boss_man", access_hash=1)
+        self.calls = []
+
+    async def get_entity(self, peer):
+        if isinstance(peer, InputPeerChannel):
+            self.calls.append(f"peer:{peer.channel_id}")
+            return next(e for e in self.ents.values() if e.id == peer.channel_id)
+        self.calls.append(peer)
+        return self.user if peer == "boss_man" else self.ents[peer]
+
+    def _row(self, entity):
+        return GRAPH[entity.username]
+
+    async def __call__(self, req):
+        _, about, _, linked = self._row(req.channel)
+        chats = [self.ents[None]] if linked else []
+        return SimpleNamespace(full_chat=SimpleNamespace(about=about, linked_chat_id=linked), chats=chats)
+
+    async def iter_messages(self, entity, limit=None):
+        for t in self._row(entity)[2]:
+            await asyncio.sleep(0)
+            yield SimpleNamespace(message=t, entities=None)
+
+
+def test_crawler_expands_by_priority_within_depth_and_resumes(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "crawl.db"))
+    tc = importlib.import_module("scamgeo_banking.tele.tg_crawl")
+    from scamgeo_banking.db import init_db
+
+    engine = init_db()
+    client = FakeClient()
+    cfg = {"max_depth": 2, "concurrency_total": 3, "concurrency_per_hop": 2, "api_budget": 9, "messages_per_node": 50}
+
+    # budżet na 3 węzły (koszt 3 wywołania / węzeł) — reszta zostaje w frontierze
+    c1 = tc.Crawler(client, engine, cfg)
+    c1.add_seeds(["@alpha_chan"])
+    st1 = asyncio.run(c1.run())
+    assert st1["stopped"] == "api_budget" and st1["api_used"] == 9 and st1["queued"] > 0
+
+    # wznowienie z bazy: bez ponownego odwiedzania, do wyczerpania frontieru
+    c2 = tc.Crawler(client, engine, {**cfg, "api_budget": 100})
+    c2.add_seeds(["alpha_chan"])
+    st2 = asyncio.run(c2.run())
+    assert st2["stopped"] is None and st2["queued"] == 0
+    assert client.calls.count("alpha_chan") == 1
+
+    n, e = tc.export_graph(engine, tmp_path / "g.json")
+    g = json.loads((tmp_path / "g.json").read_text(encoding="utf-8"))
+    nodes = {x["key"]: x for x in g["nodes"]}
+    assert set(nodes) == {"alpha_chan", "bravo_chan", "charlie_chan", "id:900", "delta_chan", "boss_man"}
+    assert "echo_chan" not in nodes                     # głębokość 3 > max_depth
+    assert nodes["boss_man"]["status"] == "user" and nodes["id:900"]["depth"] == 1
+    assert "peer:900" in client.calls                   # grupa bez nazwy przez (id, access_hash)
+    assert nodes["charlie_chan"]["risk"] > nodes["bravo_chan"]["risk"]
+    vias = {(x["src"], x["dst"]): x["via"] for x in g["edges"]}
+    assert vias[("alpha_chan", "bravo_chan")] == "about_mention"
+    assert vias[("alpha_chan", "charlie_chan")] == "tg_link"
+    assert vias[("alpha_chan", "id:900")] == "linked_chat"
+    assert vias[("id:900", "alpha_chan")] == "text_mention"   # krawędź zwrotna, bez ponownej wizyty
+
+
+def test_frontier_order_prefers_risk_then_depth(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "crawl.db"))
+    tc = importlib.import_module("scamgeo_banking.tele.tg_crawl")
+    from sqlmodel import Session
+    from scamgeo_banking.db import CrawlNode, init_db
+
+    engine = init_db()
+    with Session(engine) as s:
+        for key, depth, prio in [("low", 1, 5.0), ("deep", 2, 50.0), ("shallow", 1, 50.0), ("top", 2, 90.0)]:
+            s.add(CrawlNode(key=key, depth=depth, priority=prio))
+        s.commit()
+    c = tc.Crawler(None, engine)
+    c._load()
+    order = []
+    while c._heap:
+        order.append(__import__("heapq").heappop(c._heap)[3])
+    assert order == ["top", "shallow", "deep", "low"]
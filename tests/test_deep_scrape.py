@@ -0,0 +1,127 @@
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+from telethon.errors import FloodWaitError
+
+
+class FakeClient:
+    """iter_messages z opóźnieniem; kanał "slowpoke" raz rzuca FloodWait w połowie."""
+
+    def __init__(self, top=10):
+        self.active = self.peak = 0
+        self.flooded = False
+        self.top = top
+
+    async def get_entity(self, handle):
+        return SimpleNamespace(title=handle.upper(), about=None)
+
+    async def iter_messages(self, entity, limit=None, offset_id=0, min_id=0, reverse=False):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if reverse:   # od najstarszej; offset_id = dolna granica
+                lo = max(min_id, offset_id)
+                ids = range(lo + 1, min(self.top, lo + limit) + 1)
+            else:
+                start = offset_id - 1 if offset_id else self.top
+                ids = range(start, max(min_id, start - limit), -1)
+            for mid in ids:
+                await asyncio.sleep(0.001)
+                if entity.title == "SLOWPOKE" and mid == 5 and not self.flooded:
+                    self.flooded = True
+                    raise FloodWaitError(request=None, capture=0)
+                yield SimpleNamespace(id=mid, raw_text=f"msg {mid} https://x{mid}.example/a", message=None, date="2024-01-01")
+        finally:
+            self.active -= 1
+
+
+def test_scheduler_bounds_concurrency_and_resumes_after_flood(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ds = importlib.import_module("scamgeo_banking.tele.tg_deep_scrape")
+
+    client = FakeClient()
+    handles = ["alpha1", "bravo2", "slowpoke", "delta4", "echo55"]
+
+    async def run():
+        sem = asyncio.Semaphore(2)
+        progress = {"done": 0, "total": len(handles), "t0": 0.0}
+        return await asyncio.gather(*(ds._channel_task(client, h, sem, 10, progress) for h in handles))
+
+    out = asyncio.run(run())
+    assert [r["handle"] for r in out] == handles
+    assert client.peak <= 2
+    slow = out[2]
+    assert slow["ok"] and slow["errors"] == ["flood_wait:0s"]
+    assert len(slow["urls"]) == 10  # wszystkie wiadomości, bez powtórek po wznowieniu
+    assert all(r["ok"] and len(r["urls"]) == 10 for r in out)
+
+
+def test_incremental_scrape_uses_high_water_mark_and_merges_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "state.db"))
+    ds = importlib.import_module("scamgeo_banking.tele.tg_deep_scrape")
+    from sqlmodel import Session
+    from sqlmodel import select
+    from scamgeo_banking.db import Snapshot, init_db, load_channel_state, save_channel_state
+
+    async def scrape(client, prev):
+        min_id = (prev or {}).get("last_msg_id", 0)
+        progress = {"done": 0, "total": 1, "t0": 0.0}
+        data = await ds._channel_task(client, "alpha1", asyncio.Semaphore(1), 50, progress, min_id=min_id)
+        return data
+
+    engine = init_db()
+    runs = []
+    for top in (10, 14, 14):
+        with Session(engine) as s:
+            prev = load_channel_state(s, "alpha1")
+        data = asyncio.run(scrape(FakeClient(top=top), prev))
+        runs.append(len(data["urls"]))
+        entry, state = ds.merge_channel_state(prev, data)
+        if state is not None:
+            with Session(engine) as s:
+                save_channel_state(s, "alpha1", state)
+
+    assert runs == [10, 4, 0]  # drugi przebieg: tylko id 11..14, trzeci: nic nowego
+    with Session(engine) as s:
+        st = load_channel_state(s, "alpha1")
+    assert st["last_msg_id"] == 14
+    assert len(st["urls"]) == 14 and st["title"] == "ALPHA1"
+    assert entry["urls"] == st["urls"] and "_max_id" not in entry
+    assert [x["id"] for x in st["samples"][:5]] == [14, 13, 12, 11, 10]
+    with Session(engine) as s:   # stan kanału nadpisywany, nie dopisywany
+        assert len(s.exec(select(Snapshot)).all()) == 1
+
+
+def test_incremental_scrape_with_more_new_messages_than_limit_leaves_no_gap(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ds = importlib.import_module("scamgeo_banking.tele.tg_deep_scrape")
+
+    async def scrape(client, min_id):
+        progress = {"done": 0, "total": 1, "t0": 0.0}
+        return await ds._channel_task(client, "alpha1", asyncio.Semaphore(1), 50, progress, min_id=min_id)
+
+    state, seen = {"last_msg_id": 100, "samples": [], **{k: [] for k in ds.IOC_KEYS}}, []
+    client = FakeClient(top=220)   # 120 nowych przy limicie 50
+    for _ in range(4):
+        data = asyncio.run(scrape(client, state["last_msg_id"]))
+        seen += [r["id"] for r in data["_records"]]
+        _, new_state = ds.merge_channel_state(state, data)
+        state = new_state or state
+    assert sorted(seen) == list(range(101, 221)) and len(seen) == 120
+    assert state["last_msg_id"] == 220 and state["samples"][0]["id"] == 220
+
+
+def test_full_rescrape_merges_with_stored_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ds = importlib.import_module("scamgeo_banking.tele.tg_deep_scrape")
+
+    async def scrape(client, min_id):
+        progress = {"done": 0, "total": 1, "t0": 0.0}
+        return await ds._channel_task(client, "alpha1", asyncio.Semaphore(1), 10, progress, min_id=min_id)
+
+    _, state = ds.merge_channel_state(None, asyncio.run(scrape(FakeClient(top=10), 0)))
+    _, state = ds.merge_channel_state(state, asyncio.run(scrape(FakeClient(top=15), 0)))   # --full: bez min_id
+    assert len(state["urls"]) == 15 and state["last_msg_id"] == 15
+    assert [x["id"] for x in state["samples"]] == list(range(15, 0, -1))   # próbki bez powtórek
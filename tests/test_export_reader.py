@@ -0,0 +1,79 @@
+import json
+from datetime import datetime
+
+from scamgeo_banking.tele import export_reader as er
+from scamgeo_banking.tele import telegram as tg
+
+
+def _export(n, chat="Grupa", start=1):
+    msgs = [{"id": 0, "type": "service", "date": "2024-03-01T00:00:00", "action": "create_group"}]
+    for i in range(start, start + n):
+        text = f"wiadomość {i} https://x{i}.example/a" if i % 3 else [
+            "zobacz ", {"type": "link", "text": f"https://l{i}.example"}, {"type": "bold", "text": ' "messages": [ '}]
+        msgs.append({"id": i, "type": "message", "date": f"2024-03-01T{i % 24:02d}:15:00",
+                     "from": f"user{i % 4}", "from_id": f"user{i % 4}", "text": text})
+    return {"name": chat, "type": "private_group", "id": 1, "messages": msgs}
+
+
+def _reference(path):
+    # dawne parse_telegram_export: json.load + dateutil
+    from dateutil import parser as dateparser
+    data = json.load(open(path, encoding="utf-8"))
+    out = []
+    for m in data["messages"]:
+        if m.get("type") != "message":
+            continue
+        r = er.message_record(m)
+        r["date"] = dateparser.parse(m["date"])
+        out.append(r)
+    return out
+
+
+def test_streaming_parser_matches_json_load_across_buffer_boundaries(tmp_path):
+    p = tmp_path / "result.json"
+    p.write_text(json.dumps(_export(200), ensure_ascii=False, indent=1), encoding="utf-8")
+    ref = _reference(p)
+    for chunk in (7, 64, 1000, er.CHUNK):   # małe bufory: klucz i wiadomości przecięte granicą
+        got = list(er.iter_telegram_export(p, chunk_size=chunk))
+        assert [(r["id"], r["date"], r["text"], sorted(r["urls"]), r["author"]) for r in got] == \
+               [(r["id"], r["date"], r["text"], sorted(r["urls"]), r["author"]) for r in ref]
+    assert got[2]["text"] == 'zobacz https://l3.example "messages": [ ' and got[2]["urls"] == ["https://l3.example"]
+    assert got[0]["date"] == datetime(2024, 3, 1, 1, 15)
+    assert tg.parse_telegram_export(str(p)) == got
+
+
+def test_full_account_export_and_directory_in_parallel(tmp_path):
+    full = {"about": "x", "chats": {"about": "y", "list": [_export(30, "A"), _export(20, "B")]}}
+    (tmp_path / "acc").mkdir()
+    (tmp_path / "acc" / "result.json").write_text(json.dumps(full), encoding="utf-8")
+    assert len(list(er.iter_telegram_export(tmp_path / "acc" / "result.json", chunk_size=50))) == 50
+
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "result.json").write_text(json.dumps(_export(40, start=500)), encoding="utf-8")
+    assert er.export_files(tmp_path) == [str(tmp_path / "acc" / "result.json"), str(tmp_path / "b" / "result.json")]
+
+    par = tg.export_state(str(tmp_path), workers=2)
+    seq = tg.export_state(str(tmp_path), workers=1)
+    assert par.messages == seq.messages == 90
+    assert par.hours == seq.hours and par.tld_counts == seq.tld_counts and par.last_id == 539
+    assert sum(par.hours) == 90
+
+
+def test_full_account_export_streamed_in_batches_keeps_every_chat(tmp_path):
+    # id 1..30 i 1..20 — ten sam zakres id w dwóch czatach, granica partii w środku czatu A
+    full = {"chats": {"list": [_export(30, "A"), _export(20, "B")]}}
+    p = tmp_path / "result.json"
+    p.write_text(json.dumps(full), encoding="utf-8")
+    st = tg.CountryInferenceState(str(p))
+    assert tg.add_stream(st, er.iter_telegram_export(p), batch=7) == 50
+    assert st.messages == 50 and sum(st.hours) == 50
+    assert tg.add_stream(st, er.iter_telegram_export(p), batch=7) == 0   # powtórny eksport: nic nowego
+
+
+def test_export_mode_imports_without_telethon():
+    import os, subprocess, sys
+
+    code = ("import sys; sys.modules['telethon'] = None\n"
+            "from scamgeo_banking.tele import telegram\n"
+            "assert not telegram.TELETHON_OK")
+    subprocess.run([sys.executable, "-c", code], check=True, env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)})
@@ -0,0 +1,128 @@
+import asyncio
+import importlib
+import json
+
+import pytest
+from telethon import errors
+
+from scamgeo_banking.tele.fake_client import FakeTelegramClient, FakeWorld
+from scamgeo_banking.tele.session_pool import SessionPool, new_client, telegram_backend
+
+
+def test_world_is_deterministic_and_entities_are_per_session():
+    w = FakeWorld(channels=5, messages=50, seed=3)
+    assert w.message(2, 17, "a").raw_text == FakeWorld(channels=5, messages=50, seed=3).message(2, 17, "b").raw_text
+    a, b = FakeTelegramClient("a", world=w), FakeTelegramClient("b", world=w)
+    ent = a.get_entity("@fake_chan_00002")   # poza pętlą jak telethon.sync
+    assert ent.username == "fake_chan_00002"
+
+    async def ids(client, entity, **kw):
+        return [m.id async for m in client.iter_messages(entity, **kw)]
+
+    assert asyncio.run(ids(a, ent, limit=5)) == [50, 49, 48, 47, 46]
+    assert asyncio.run(ids(a, ent, limit=None, min_id=47)) == [50, 49, 48]
+    with pytest.raises(errors.ChannelInvalidError):
+        asyncio.run(ids(b, ent, limit=1))   # access_hash z innego konta
+    with pytest.raises(ValueError):
+        a.get_entity("nie_ma_takiego")
+    msg = next(w.message(2, mid, "a") for mid in range(1, 51) if w.message(2, mid, "a").photo)
+    assert a.download_media(msg, file=bytes).startswith(b"FAKEIMG:")
+    with pytest.raises(errors.FileReferenceInvalidError):
+        b.download_media(msg, file=bytes)   # zdjęcie z wiadomości pobranej innym kontem
+
+
+def test_backend_selection(tmp_path, monkeypatch):
+    cfg = tmp_path / "config.json"
+    cfg.write_text(json.dumps({"telegram_backend": "fake", "fake_telegram": {"channels": 7, "latency": 0.01}}))
+    c = new_client("s", 1, "h", path=cfg)
+    assert isinstance(c, FakeTelegramClient) and c.world.n == 7 and c.latency == 0.01
+    monkeypatch.setenv("TG_BACKEND", "grpc")
+    with pytest.raises(ValueError):
+        telegram_backend(cfg)
+    monkeypatch.delenv("TG_BACKEND")
+    assert telegram_backend(tmp_path / "brak.json") == ("telethon", {})
+
+
+def test_deep_scrape_on_fake_pool_with_floods(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ds = importlib.import_module("scamgeo_banking.tele.tg_deep_scrape")
+    from scamgeo_banking.tele.media import MediaStore
+    w = FakeWorld(channels=12, messages=250, photo_rate=0.2)
+    clients = [(f"acc{i}", FakeTelegramClient(f"acc{i}", world=w, flood_every=9, flood_seconds=1)) for i in range(3)]
+    pool = SessionPool(clients, per_client=2, min_interval=0.0)
+    store = MediaStore(tmp_path / "media")
+
+    async def run():
+        sem = asyncio.Semaphore(6)
+        progress = {"done": 0, "total": w.n, "t0": 0.0}
+        return await asyncio.gather(*(ds._channel_task(pool, h, sem, 200, progress, media=store) for h in w.handles()))
+
+    out = asyncio.run(run())
+    assert all(r["ok"] for r in out)
+    assert all(r["_max_id"] == 250 and r["_new"] == 200 for r in out)   # flood nie gubi ani nie dubluje wiadomości
+    assert any(r["ibans"] for r in out) and any(r["urls"] for r in out)
+    s = pool.summary()
+    assert sum(v["floods"] for v in s.values()) >= 3 and sum(v["failover"] for v in s.values()) >= 1
+    # obrazy pobiera konto, które pobrało wiadomość (także po przejściu kanału na inne konto)
+    assert store.stats["stored"] == 20 and store.stats["errors"] == 0
+
+
+class _FloodOnce(FakeTelegramClient):
+    async def _api(self, kind):
+        if kind == "history" and self.calls["history"] == 1 and not self.calls["flood_wait"]:
+            self.calls["flood_wait"] += 1
+            raise errors.FloodWaitError(request=None, capture=1)
+        await super()._api(kind)
+
+
+def test_media_downloaded_by_account_that_fetched_it(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ds = importlib.import_module("scamgeo_banking.tele.tg_deep_scrape")
+    from scamgeo_banking.tele.media import MediaStore
+    w = FakeWorld(channels=1, messages=300, photo_rate=0.3)
+    pool = SessionPool([("a", FakeTelegramClient("a", world=w)), ("b", FakeTelegramClient("b", world=w))], min_interval=0.0)
+    owner = pool.owner("fake_chan_00000")
+    owner.client = _FloodOnce(owner.name, world=w)   # druga strona historii: FloodWait -> reszta kanału na drugim koncie
+    store = MediaStore(tmp_path / "media")
+    data = asyncio.run(ds._channel_task(pool, "fake_chan_00000", asyncio.Semaphore(1), 300,
+                                        {"done": 0, "total": 1, "t0": 0.0}, media=store))
+    assert data["ok"] and data["_new"] == 300
+    assert all(pc.client.calls["download"] for pc in pool.members)
+    assert store.stats["errors"] == 0 and store.stats["stored"] > 0
+
+
+def test_admin_dump_on_fake():
+    ad = importlib.import_module("scamgeo_banking.tele.tg_admin_dump")
+    client = FakeTelegramClient("a", channels=4, messages=30, admins=2)
+    out = asyncio.run(ad.dump_all(client, ["fake_chan_00000", "fake_chan_00001", "nie_ma_kanalu"], history=20))
+    assert [len(i["admins"]) for i in out[:2]] == [4, 2]   # kanał 0 ma podpiętą grupę z własnymi adminami
+    assert out[0]["title"] == "Fake kanał 0" and out[0]["errors"] == []
+    assert "fake_admin_0_0" in {s["username"] for s in out[0]["suspected_admins"]}
+    assert out[2]["errors"]
+
+
+def test_crawler_on_fake(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "crawl.db"))
+    tc = importlib.import_module("scamgeo_banking.tele.tg_crawl")
+    from scamgeo_banking.db import init_db
+
+    client = FakeTelegramClient("a", channels=30, messages=40)
+    c = tc.Crawler(client, init_db(), {"max_depth": 1, "concurrency_total": 4, "concurrency_per_hop": 2,
+                                       "api_budget": 500, "messages_per_node": 40})
+    c.add_seeds(["fake_chan_00000"])
+    st = asyncio.run(c.run())
+    assert st["stopped"] is None and st["done"] > 1 and st["user"] >= 1
+
+
+def test_live_fetch_uses_fake_backend(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TG_BACKEND", "fake")
+    monkeypatch.setenv("TG_API_ID", "1")
+    monkeypatch.setenv("TG_API_HASH", "x")
+    tg = importlib.import_module("scamgeo_banking.tele.telegram")
+    recs = tg.fetch_messages_live("fake_chan_00003", limit=20, min_id=990)
+    assert [r["id"] for r in recs] == list(range(1000, 990, -1))
+    # przyrostowo: wszystkie nowe (stronami), nie tylko ostatnie `limit`
+    assert [r["id"] for r in tg.fetch_messages_live("fake_chan_00003", limit=20, min_id=750)] == list(range(1000, 750, -1))
+    assert len(tg.fetch_messages_live("fake_chan_00003", limit=250)) == 250
+    assert all(r["date"].tzinfo is not None for r in recs)
@@ -0,0 +1,184 @@
+import asyncio
+import importlib
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from platforms import youtube
+from platforms.fetch_engine import FetchEngine, load_settings
+
+
+class _Handler(BaseHTTPRequestHandler):
+    active = Counter()
+    peak = Counter()
+    hits = Counter()
+    lock = threading.Lock()
+
+    def log_message(self, *a):
+        pass
+
+    def _send(self, code, body, ctype="text/html", headers=()):
+        data = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers:
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        host = self.headers["Host"].split(":")[0]
+        cls = type(self)
+        with cls.lock:
+            cls.hits[self.path] += 1
+            cls.active[host] += 1
+            cls.active["*"] += 1
+            cls.peak[host] = max(cls.peak[host], cls.active[host])
+            cls.peak["*"] = max(cls.peak["*"], cls.active["*"])
+        try:
+            if self.path.startswith("/flaky") and cls.hits[self.path] == 1:
+                return self._send(429, "slow down", headers=[("Retry-After", "0")])
+            if self.path.startswith("/feed"):
+                entries = "".join(f'<entry><title>Video {i}</title><link href="http://{self.headers["Host"]}/watch/{i}"/></entry>'
+                                  for i in range(4))
+                return self._send(200, f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>', "application/atom+xml")
+            time.sleep(0.05)
+            self._send(200, f"<html><script>x()</script><p>page {self.path} USDT TRC20</p></html>")
+        finally:
+            with cls.lock:
+                cls.active[host] -= 1
+                cls.active["*"] -= 1
+
+
+@pytest.fixture
+def server():
+    for c in (_Handler.active, _Handler.peak, _Handler.hits):
+        c.clear()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield srv.server_address[1]
+    srv.shutdown()
+
+
+def test_global_and_per_host_limits_with_pacing(server):
+    urls = [f"http://{h}:{server}/p{i}" for i in range(12) for h in ("127.0.0.1", "localhost")]
+    starts = {}
+
+    async def run():
+        async with FetchEngine(concurrency_total=4, concurrency_per_host=3, host_interval=0.01) as eng:
+            pace = eng._pace
+
+            async def timed(host):   # start w pętli zdarzeń (wątki puli i serwer dokładają własny jitter)
+                await pace(host)
+                starts.setdefault(host, []).append(time.monotonic())
+
+            eng._pace = timed
+            return await eng.get_many(urls)
+
+    t0 = time.monotonic()
+    out = asyncio.run(run())
+    elapsed = time.monotonic() - t0
+    assert [r.status_code for r in out] == [200] * 24
+    assert "/p3 " in out[6].text   # kolejność wyników = kolejność URL-i
+    assert _Handler.peak["*"] <= 4 and _Handler.peak["localhost"] <= 3 and _Handler.peak["127.0.0.1"] <= 3
+    assert _Handler.peak["*"] >= 3
+    assert elapsed < 24 * 0.05                                    # szybciej niż po kolei
+    for ts in starts.values():
+        ts.sort()
+        assert len(ts) == 12 and min(b - a for a, b in zip(ts, ts[1:])) >= 0.008
+
+
+def test_retry_after_and_errors_do_not_abort_batch(server):
+    async def run():
+        async with FetchEngine(concurrency_total=2, concurrency_per_host=2, host_interval=0.0, max_retries=1) as eng:
+            out = await eng.get_many([f"http://127.0.0.1:{server}/flaky", f"http://127.0.0.1:1/closed"])
+            return out, dict(eng.stats)
+
+    (ok, err), stats = asyncio.run(run())
+    assert ok.status_code == 200 and _Handler.hits["/flaky"] == 2
+    assert isinstance(err, Exception) and stats["retries"] >= 2
+
+
+def test_youtube_watch_pages_fetched_concurrently(server, monkeypatch):
+    monkeypatch.setattr(youtube, "RSS_TMPL", f"http://127.0.0.1:{server}/feed?channel_id={{cid}}")
+
+    async def run():
+        async with FetchEngine(concurrency_total=8, concurrency_per_host=4, host_interval=0.0) as eng:
+            return await youtube.afetch_channel_recent(eng, "UCx", limit=3)
+
+    items = asyncio.run(run())
+    assert [it.title for it in items] == ["Video 0", "Video 1", "Video 2"]
+    assert all("USDT TRC20" in it.text and "x()" not in it.text for it in items)
+    assert _Handler.peak["127.0.0.1"] >= 2
+
+
+def test_settings_from_scanner_yaml(tmp_path):
+    p = tmp_path / "scanner.yaml"
+    p.write_text("scanner:\n  concurrency_total: 7\n  concurrency_per_host: 2\n  js_rendering: true\n", encoding="utf-8")
+    assert load_settings(p)["concurrency_total"] == 7 and "js_rendering" not in load_settings(p)
+    eng = FetchEngine.from_settings(p, host_interval=0.1)
+    assert (eng.total, eng.per_host, eng.host_interval) == (7, 2, 0.1)
+    eng.close()
+
+
+def test_webscan_collect_keeps_order_and_skips_failed_targets(server, monkeypatch):
+    webscan = importlib.import_module("pipeline.webscan")
+    monkeypatch.setattr(youtube, "RSS_TMPL", f"http://127.0.0.1:{server}/feed?channel_id={{cid}}")
+    targets = ["yt:UCa", "  ", "tt:@nikt", f"http://127.0.0.1:{server}/feeds/videos.xml?channel_id=UCb"]
+    monkeypatch.setattr(webscan, "afetch_profile_recent", lambda eng, h, limit: _fail(h))
+
+    async def run():
+        async with FetchEngine(concurrency_total=8, concurrency_per_host=4, host_interval=0.0) as eng:
+            return await webscan.collect(targets, eng)
+
+    items = asyncio.run(run())
+    assert [it.title for it in items] == [f"Video {i}" for i in range(4)] * 2
+    assert all("USDT TRC20" in it.text for it in items)
+
+
+async def _fail(handle):
+    raise RuntimeError(f"{handle}: 403")
+
+
+def test_scan_targets_scores_misses_in_one_batch(server, monkeypatch, tmp_path):
+    webscan = importlib.import_module("pipeline.webscan")
+    monkeypatch.setattr(youtube, "RSS_TMPL", f"http://127.0.0.1:{server}/feed?channel_id={{cid}}")
+    batches = []
+    real = webscan.score_batch
+    monkeypatch.setattr(webscan, "score_batch", lambda texts, urls: batches.append(len(texts)) or real(texts, urls))
+
+    def scan():
+        eng = FetchEngine(concurrency_total=8, concurrency_per_host=4, host_interval=0.0)
+        try:
+            return webscan.scan_targets(["yt:UCa"], tmp_path, eng)
+        finally:
+            eng.close()
+
+    rows = scan()
+    assert batches == [4] and len(rows) == 4
+    assert all(r["label"] == "suspicious" and [h["rule"] for h in r["hits"]] == ["usdt"] for r in rows)
+    assert scan() == rows and batches == [4, 0]   # drugi przebieg w całości z cache
+    assert (tmp_path / "webscan_scored.csv").exists()
+
+
+def test_scan_targets_cache_key_uses_host_not_full_url(monkeypatch, tmp_path):
+    webscan = importlib.import_module("pipeline.webscan")
+    from platforms.common_fetch import WebItem
+
+    items = [WebItem("youtube", "UCa", url, None, "Zarabiaj 100 USDT dziennie", {})
+             for url in ("https://www.youtube.com/watch?v=1", "https://www.youtube.com/watch?v=2", "https://pay.top/a")]
+
+    async def fake_collect(targets, engine=None):
+        return items
+
+    batches = []
+    real = webscan.score_batch
+    monkeypatch.setattr(webscan, "collect", fake_collect)
+    monkeypatch.setattr(webscan, "score_batch", lambda texts, urls: batches.append(len(texts)) or real(texts, urls))
+    rows = webscan.scan_targets(["yt:UCa"], tmp_path)
+    assert batches == [2] and rows[0]["score"] == rows[1]["score"]   # ten sam host = jeden wynik
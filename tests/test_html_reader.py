@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from scamgeo_banking.tele import html_reader as hr
+
+DEMO = Path(__file__).resolve().parents[1] / "demo" / "messages.html"
+
+HEAD = '<html><body><div class="page_header"><div class="text bold">Czat</div></div><div class="history">'
+TAIL = "</div></body></html>"
+
+
+@pytest.fixture(params=["stdlib", "lxml"])
+def backend(request, monkeypatch):
+    """Każdy test czytnika na obu ścieżkach: lxml (preferowana) i html.parser."""
+    if request.param == "lxml":
+        if hr.etree is None:
+            pytest.skip("lxml nie jest zainstalowany")
+    else:
+        monkeypatch.setattr(hr, "etree", None)
+    return request.param
+
+
+def _msg(i, author, text, joined=False, extra=""):
+    name = "" if joined else f'<div class="from_name">\n {author}\n</div>'
+    return (
+        f'<div class="message default clearfix{" joined" if joined else ""}" id="message{i}">'
+        f'<div class="pull_left userpic_wrap"><div class="userpic"></div></div>'
+        f'<div class="body"><div class="pull_right date details" title="01.03.2024 10:{i:02d}:05 UTC+01:00">10:{i:02d}</div>'
+        f'{name}{extra}<div class="text">{text}</div></div></div>'
+    )
+
+
+def _write(tmp_path):
+    fwd = ('<div class="forwarded body"><div class="from_name">Obcy kanał '
+           '<span class="date details" title="01.01.2024 00:00:00">x</span></div>'
+           '<div class="text">przekazane <a href="https://t.me/fwd_channel">t.me/fwd_channel</a></div></div>')
+    p1 = HEAD + '<div class="message service" id="message-1"><div class="body details">1 March</div></div>'
+    p1 += _msg(1, "K N", "Witam<br>druga linia")
+    p1 += _msg(2, "K N", 'link <a href="https://evil.example/pay">evil</a> &amp; @scam_ops', joined=True)
+    p1 += _msg(3, "Laura Polat", "", extra=fwd) + TAIL
+    p2 = HEAD + _msg(4, "Laura Polat", "IBAN DE89370400440532013000", joined=True)
+    p2 += _msg(5, "K N", 'ok <a href="#go_to_message1">odp</a>') + TAIL
+    # messages10 po messages2 (kolejność numeryczna, nie leksykalna)
+    p10 = HEAD + _msg(6, "Laura Polat", "koniec") + TAIL
+    (tmp_path / "messages.html").write_text(p1, encoding="utf-8")
+    (tmp_path / "messages10.html").write_text(p10, encoding="utf-8")
+    (tmp_path / "messages2.html").write_text(p2, encoding="utf-8")
+    (tmp_path / "other.html").write_text(HEAD + _msg(9, "X", "nie") + TAIL, encoding="utf-8")
+    return tmp_path / "messages.html"
+
+
+def test_split_export_in_order_with_joined_authors(tmp_path, backend):
+    path = _write(tmp_path)
+    assert [Path(f).name for f in hr.export_html_files(path)] == ["messages.html", "messages2.html", "messages10.html"]
+    assert hr.export_html_files(tmp_path) == hr.export_html_files(path)
+
+    ms = list(hr.iter_html_messages(path, chunk_size=97))   # małe kawałki: tagi przecięte granicą
+    assert [m.id for m in ms] == [f"message{i}" for i in range(1, 7)]
+    assert [m.author for m in ms] == ["K N", "K N", "Laura Polat", "Laura Polat", "K N", "Laura Polat"]
+    assert ms[0].text == "Witam\ndruga linia"
+    assert ms[1].text == "link evil & @scam_ops"
+    assert ms[1].links == ["https://evil.example/pay"]
+    # przekazana treść należy do wiadomości, ale autor i data są z ramki zewnętrznej
+    assert ms[2].text == "przekazane t.me/fwd_channel"
+    assert ms[2].links == ["https://t.me/fwd_channel"]
+    assert ms[2].timestamp == datetime(2024, 3, 1, 10, 3, 5, tzinfo=timezone(timedelta(hours=1)))
+    assert ms[4].links == []   # linki wewnętrzne eksportu pomijane
+
+
+def test_title_date_formats():
+    assert hr.parse_title_date("21.10.2025 18:26:04 UTC-03:30") == datetime(
+        2025, 10, 21, 18, 26, 4, tzinfo=timezone(-timedelta(hours=3, minutes=30)))
+    assert hr.parse_title_date("21.10.2025 18:26:04") == datetime(2025, 10, 21, 18, 26, 4)
+    assert hr.parse_title_date("wczoraj") is None
+
+
+def test_single_pass_for_many_consumers(tmp_path, backend):
+    path = _write(tmp_path)
+    authors, links = [], []
+    n = hr.for_each_message(path, lambda m: authors.append(m.author), lambda m: links.extend(m.links))
+    assert n == 6 and len(authors) == 6
+    assert links == ["https://evil.example/pay", "https://t.me/fwd_channel"]
+
+
+def test_demo_export(backend):
+    ms = list(hr.iter_html_messages(DEMO))
+    assert len(ms) == 339
+    assert {m.author for m in ms} == {"K N", "Laura Polat"}
+    assert all(m.timestamp is not None and m.timestamp.tzinfo for m in ms)
+    assert [m.timestamp for m in ms] == sorted(m.timestamp for m in ms)
@@ -0,0 +1,10 @@
+from scamgeo_banking.detection.iban import validate_iban, validate_ibans
+
+
+def test_validate_ibans_batch_matches_single():
+    good = ["DE89370400440532013000", "GB29NWBK60161331926819", "FR1420041010050500013M02606",
+            "SC18SSCB11010000000000001497USD", "pl61 1090 1014 0000 0712 1981 2874"]
+    bad = ["DE89370400440532013001", "XX12345678901234", "GB29NWBK6016133192681", "AT61"]
+    res = validate_ibans(good + bad)
+    assert res == [True] * len(good) + [False] * len(bad)
+    assert res == [validate_iban(x) for x in good + bad]
@@ -0,0 +1,45 @@
+import importlib
+
+from scamgeo_banking.detection.iocs import scan_iocs, iter_iocs, group_iocs
+
+
+def test_scan_iocs_single_pass_kinds():
+    text = (
+        "Wpłać na DE89370400440532013000 (BIC COBADEFFXXX), "
+        "USDT TRC20: TQn9Y2khEsLJW1ChVWFMSMeRDow5KcbLSE, "
+        "ETH 0x52908400098527886E0F7030069857D2E4169EE7, "
+        "BTC bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq. "
+        "Kontakt @support_admin, https://t.me/+AbCdEfGhIjKl lub WhatsApp: +48 600 700 800, "
+        "strona https://erste-bonus-secure.com/login"
+    )
+    g = group_iocs(scan_iocs(text))
+    assert g["iban"] == ["DE89370400440532013000"]
+    assert g["bic"] == ["COBADEFFXXX"]
+    assert g["trc20"] == ["TQn9Y2khEsLJW1ChVWFMSMeRDow5KcbLSE"]
+    assert g["eth"] == ["0x52908400098527886E0F7030069857D2E4169EE7"]
+    assert g["btc"] == ["bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq"]
+    assert g["tg_handle"] == ["support_admin"]
+    assert g["tg_join"] == ["t.me/+AbCdEfGhIjKl"]
+    assert g["whatsapp"] == ["+48600700800"]
+    assert g["url"] == ["https://t.me/+AbCdEfGhIjKl", "https://erste-bonus-secure.com/login"]
+
+
+def test_iter_iocs_skips_clean_messages():
+    texts = ["dzień dobry", None, "", "link: t.me/scam_channel_1", "mail a@b.pl"]
+    hits = list(iter_iocs(texts))
+    assert [i for i, _ in hits] == [3]
+    assert hits[0][1][0].kind == "tg_handle"
+    assert hits[0][1][0].value == "scam_channel_1"
+
+
+def test_payment_iocs_inside_urls(tmp_path, monkeypatch):
+    text = ("https://etherscan.io/address/0x52908400098527886E0F7030069857D2E4169EE7 "
+            "i https://bank.example/pay?iban=DE89370400440532013000&x=1")
+    g = group_iocs(scan_iocs(text))
+    assert g["eth"] == ["0x52908400098527886E0F7030069857D2E4169EE7"]
+    assert g["iban"] == ["DE89370400440532013000"]
+    assert len(g["url"]) == 2
+    monkeypatch.chdir(tmp_path)
+    ds = importlib.import_module("scamgeo_banking.tele.tg_deep_scrape")
+    urls, ibans, btc, eth, trc20 = ds.extract_from_text(text)
+    assert ibans == ["DE89370400440532013000"] and eth == ["0x52908400098527886E0F7030069857D2E4169EE7"]
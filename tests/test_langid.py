@@ -0,0 +1,41 @@
+import pytest
+from langdetect import DetectorFactory
+
+from scamgeo_banking.detection import langid
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    # cache modułu jest wspólny dla całego procesu — inne testy mogły już wykryć te treści
+    monkeypatch.setattr(langid, "_CACHE", langid.TextCache(maxsize=1000))
+
+
+def test_ngram_extraction_matches_langdetect():
+    m = langid._NgramModel()
+    for text in (
+        "Dzień dobry, INWESTYCJA w kryptowaluty https://x.pl/a?b=1 mail@x.com",
+        "Привет, как дела?   Напиши мне в личку ABC",
+        "Bună ziua, aș dori să retrag banii",
+    ):
+        d = m.factory.create()
+        d.append(text)
+        d.cleaning_text()
+        assert m.ngrams(text) == d._extract_ngrams()
+
+
+def test_detect_languages_cache_and_cutoff():
+    DetectorFactory.seed = 0
+    texts = [
+        "Dzień dobry, chciałbym zapytać o inwestycję w kryptowaluty.",
+        "🔥 dzień dobry,  chciałbym zapytać o inwestycję w kryptowaluty.",
+        "Guten Tag, ich möchte mein Geld zurück, bitte kontaktieren Sie mich.",
+        "ok 👍",
+    ]
+    assert langid.DEFAULT_BACKEND == "langdetect"   # "ngram" tylko na życzenie
+    before = langid.cache_stats()["misses"]
+    assert langid.detect_languages(texts, backend="ngram", workers=1) == ["pl", "pl", "de", None]
+    assert langid.cache_stats()["misses"] - before == 3  # powtórka po normalizacji nie jest wykrywana drugi raz
+    assert langid.detect_languages(texts[:1], workers=1) == ["pl"]
+
+    recs = [{"author": "a", "text": str(i)} for i in range(5)] + [{"author": None, "text": "x"}] * 3
+    assert len(langid.sample_per_author(recs, cap=2)) == 5
@@ -0,0 +1,89 @@
+import asyncio
+import importlib
+import json
+from types import SimpleNamespace
+
+from telethon.tl.types import DocumentAttributeSticker
+
+from scamgeo_banking.tele.media import MediaStore, iter_manifest
+
+BANNER = b"\x89PNG banner" * 50
+IBAN_SHOT = b"\xff\xd8 IBAN DE89370400440532013000" * 20
+
+
+def _photo(pid, size=2000):
+    return SimpleNamespace(id=pid, sizes=[SimpleNamespace(size=100), SimpleNamespace(sizes=[500, size])])
+
+
+def _msg(mid, photo=None, document=None, text=""):
+    return SimpleNamespace(id=mid, photo=photo, document=document, raw_text=text, message=None, date="2024-01-01")
+
+
+class FakeClient:
+    """download_media z opóźnieniem; treść zależy od id pliku."""
+
+    def __init__(self, content):
+        self.content = content
+        self.calls = []
+        self.active = self.peak = 0
+
+    async def download_media(self, msg, file=None):
+        assert file is bytes
+        media = msg.photo or msg.document
+        self.calls.append(media.id)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.005)
+        self.active -= 1
+        return self.content[media.id]
+
+    async def get_entity(self, handle):
+        return SimpleNamespace(title=handle.upper(), about=None)
+
+    async def iter_messages(self, entity, limit=None, offset_id=0, min_id=0):
+        for m in self.messages:
+            yield m
+
+
+def test_dedupe_by_file_id_and_sha256(tmp_path):
+    client = FakeClient({1: BANNER, 2: BANNER, 3: IBAN_SHOT, 4: b"x" * 10, 5: b"gif"})
+    store = MediaStore(tmp_path / "media", concurrency=2, max_photo_bytes=5000, max_doc_bytes=5000)
+    msgs = [_msg(i, photo=_photo(1)) for i in range(10, 20)]                     # baner reposty: ten sam plik
+    msgs += [_msg(30, photo=_photo(2)), _msg(31, photo=_photo(3))]               # baner wgrany od nowa + zrzut
+    msgs += [_msg(40, photo=_photo(4, size=10_000))]                             # ponad limit
+    msgs += [_msg(41, document=SimpleNamespace(id=5, mime_type="image/webp", size=10,
+                                               attributes=[DocumentAttributeSticker("", None)]))]
+    msgs += [_msg(42, document=SimpleNamespace(id=6, mime_type="video/mp4", size=10, attributes=[]))]
+    shas = asyncio.run(store.fetch_all(client, "chan1", msgs))
+
+    assert sorted(client.calls) == [1, 2, 3]   # każdy plik raz, mimo 10 równoległych repostów
+    assert client.peak <= 2
+    assert len(set(s for s in shas if s)) == 2 and shas[-3:] == [None, None, None]
+    assert store.stats["stored"] == 2 and store.stats["dup_sha256"] == 1 and store.stats["too_big"] == 1
+    files = [p for p in (tmp_path / "media").rglob("*.jpg")]
+    assert len(files) == 2
+    man = list(iter_manifest(tmp_path / "media"))
+    assert sorted(r["msg_id"] for r in man) == list(range(10, 20)) + [30, 31]
+    assert {r["path"] for r in man if r["msg_id"] in (10, 30)} == {man[0]["path"]}
+
+    # nowy przebieg: znane id i wiadomości z manifestu bez pobierania i bez nowych wpisów
+    again = MediaStore(tmp_path / "media")
+    client.calls.clear()
+    asyncio.run(again.fetch_all(client, "chan1", msgs[:1] + [_msg(50, photo=_photo(3))]))
+    assert client.calls == [] and len(again) == 2
+    assert len(list(iter_manifest(tmp_path / "media"))) == len(man) + 1
+
+
+def test_scraper_collects_media_only_messages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ds = importlib.import_module("scamgeo_banking.tele.tg_deep_scrape")
+    client = FakeClient({7: IBAN_SHOT})
+    client.messages = [_msg(3, photo=_photo(7)), _msg(2, text="zobacz https://x.example/a"), _msg(1, photo=_photo(7))]
+    store = MediaStore(tmp_path / "media")
+    progress = {"done": 0, "total": 1, "t0": 0.0}
+    data = asyncio.run(ds._channel_task(client, "chan1", asyncio.Semaphore(1), 10, progress, media=store))
+    assert data["ok"] and "_media" not in data
+    assert data["urls"] == ["https://x.example/a"]
+    assert client.calls == [7]
+    lines = (tmp_path / "media" / "manifest.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["msg_id"] for l in lines] == [3, 1]
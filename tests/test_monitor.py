@@ -0,0 +1,81 @@
+import asyncio
+import importlib
+import json
+
+from sqlmodel import Session, select
+
+from scamgeo_banking.tele.fake_client import FakeTelegramClient
+
+
+def test_monitor_scores_live_messages_and_writes_in_batches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "mon.db"))
+    (tmp_path / "scam_hunter_out").mkdir()   # OUTDIR tworzony przy imporcie — tu mógł być już zaimportowany
+    mon = importlib.import_module("scamgeo_banking.tele.monitor")
+    from scamgeo_banking.db import Snapshot, init_db, load_channel_state, save_channel_state
+    from scamgeo_banking.storage.archive import MessageArchive
+
+    engine = init_db()
+    with Session(engine) as s:   # kanał 1 widziany wcześniej do id 880 -> nadrabianie 881..1000 partiami po 50
+        save_channel_state(s, "fake_chan_00001", {"last_msg_id": 880, "urls": [], "ibans": [], "btc": [], "eth": [],
+                                                  "trc20": [], "title": None, "about": None, "samples": []})
+    client = FakeTelegramClient("a", channels=4, messages=1000)
+    archive = MessageArchive(tmp_path / "archive")
+    m = mon.Monitor(engine, {"flush_secs": 0.05, "flush_every": 1000, "catchup": 50}, archive=archive,
+                    hits_path=tmp_path / "hits.jsonl")
+    handles = ["fake_chan_00000", "fake_chan_00001", "nie_ma_kanalu"]
+
+    async def run():
+        task = asyncio.create_task(m.run(client, handles))
+        await asyncio.sleep(0.02)
+        await client.publish(30)   # 4 kanały x 30; kanały 2 i 3 nie są subskrybowane
+        for _ in range(100):       # zapis partii bez czekania na koniec
+            await asyncio.sleep(0.05)
+            if m.stats["messages"] >= 180:
+                break
+        written = dict(m.stats)
+        await client.disconnect()
+        await task
+        return written
+
+    written = asyncio.run(run())
+    assert written["messages"] == 2 * 30 + 120
+    assert archive.last_id("fake_chan_00000") == 1030 and archive.last_id("fake_chan_00001") == 1030
+    assert [r["id"] for r in archive.iter_messages("fake_chan_00001")] == list(range(881, 1031))
+    assert archive.channels() == ["fake_chan_00000", "fake_chan_00001"]
+    with Session(engine) as s:
+        st = load_channel_state(s, "fake_chan_00000")
+    assert st["last_msg_id"] == 1030 and st["title"] == "Fake kanał 0"
+    with Session(engine) as s:   # kilka partii, a stan kanału w jednym wierszu
+        assert len(s.exec(select(Snapshot)).all()) == 2
+    hits = [json.loads(l) for l in (tmp_path / "hits.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert hits and len(hits) == written["hits"]
+    assert any("iban" in h["iocs"] for h in hits) and {h["channel"] for h in hits} <= set(handles[:2])
+    assert all(h["msg_id"] > 880 for h in hits)
+
+
+def test_live_messages_during_catch_up_flush_cleanly(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "mon2.db"))
+    (tmp_path / "scam_hunter_out").mkdir()
+    mon = importlib.import_module("scamgeo_banking.tele.monitor")
+    from scamgeo_banking.db import init_db, save_channel_state
+    from scamgeo_banking.storage.archive import MessageArchive
+
+    engine = init_db()
+    with Session(engine) as s:
+        save_channel_state(s, "fake_chan_00000", {"last_msg_id": 960, "urls": [], "ibans": [], "btc": [], "eth": [],
+                                                  "trc20": [], "title": None, "about": None, "samples": []})
+    client = FakeTelegramClient("a", channels=1, messages=1000)
+    archive = MessageArchive(tmp_path / "archive")
+    m = mon.Monitor(engine, {"catchup": 10}, archive=archive, hits_path=tmp_path / "hits.jsonl")
+
+    async def run():
+        entities = await m.subscribe(client, ["fake_chan_00000"])
+        await client.publish(5)               # aktualizacje przed nadrabianiem: czekają we wspólnym buforze
+        await m.catch_up(client, entities)    # strony 961..1000 zapisywane osobno
+        await m.flush()                       # wcześniej: ValueError z max([]) — opóźnienia zabrane przez strony
+
+    asyncio.run(run())
+    assert m.stats["messages"] == 45
+    assert [r["id"] for r in archive.iter_messages("fake_chan_00000")] == list(range(961, 1006))
@@ -0,0 +1,78 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from scamgeo_banking.detection import reply_latency as rl
+
+
+def _chat(n=400, authors=("A", "B", "C"), seed=7):
+    rnd = random.Random(seed)
+    t = datetime(2024, 3, 1, 8, tzinfo=timezone(timedelta(hours=1)))
+    out = []
+    for _ in range(n):
+        t += timedelta(seconds=rnd.choice([5, 40, 90, 600, 4000]))
+        out.append((rnd.choice(authors), t))
+    return out
+
+
+def _reference(msgs, a, b, max_gap):
+    # dawna metoda z geo_linguistic_probe: dla każdej wiadomości A pierwsza późniejsza wiadomość B
+    out = []
+    for x, tx in msgs:
+        if x != a:
+            continue
+        later = [t for y, t in msgs if y == b and t >= tx]
+        if later:
+            d = (later[0] - tx).total_seconds()
+            if max_gap is None or d <= max_gap:
+                out.append(d)
+    return out
+
+
+def test_matches_quadratic_reference():
+    msgs = _chat()
+    res = rl.reply_latencies(reversed(msgs), max_gap=3600)   # kolejność wejścia bez znaczenia
+    assert set(res) == {(a, b) for a in "ABC" for b in "ABC" if a != b}
+    for (a, b), v in res.items():
+        assert list(v["latencies"]) == _reference(msgs, a, b, 3600)
+    full = rl.reply_latencies(msgs, max_gap=None)
+    assert list(full[("A", "B")]["latencies"]) == _reference(msgs, "A", "B", None)
+
+
+def test_summary_and_reply_hours():
+    t0 = datetime(2024, 3, 1, 9, 0, 0)   # bez strefy = UTC
+    msgs = [("A", t0), ("A", t0 + timedelta(seconds=20)), ("B", t0 + timedelta(seconds=60)),
+            ("A", t0 + timedelta(hours=5)), ("B", t0 + timedelta(hours=5, seconds=5))]
+    [ab, ba] = rl.reply_report(msgs)
+    assert (ab["author"], ab["responder"], ab["n"]) == ("A", "B", 3)
+    assert ab["median"] == 40 and ab["percentiles"]["p50"] == 40 and ab["mean"] == 35
+    assert [h["count"] for h in ab["histogram"]][:4] == [1, 0, 1, 1]   # 5s, 40s, 60s
+    # odpowiedzi B o 9:01 i 14:00 UTC, każda liczona raz mimo dwóch wiadomości A
+    assert ab["reply_hours_utc"][9] == 1 and ab["reply_hours_utc"][14] == 1 and sum(ab["reply_hours_utc"]) == 2
+    assert ab["utc_offset"] is not None
+    assert (ba["author"], ba["n"]) == ("B", 1)
+
+
+def test_percentile_matches_numpy():
+    vals = sorted(random.Random(1).random() * 1000 for _ in range(101))
+    for q in rl.PERCENTILES:
+        assert abs(rl.percentile(vals, q) - np.percentile(vals, q)) < 1e-9
+    assert rl.percentile([], 50) is None
+
+
+def test_pure_python_fallback_same_report(monkeypatch):
+    msgs = _chat(n=600, authors=("A", "B", "C", "D"))
+    fast = rl.reply_report(msgs, min_replies=2)
+    monkeypatch.setattr(rl, "np", None)
+    slow = rl.reply_report(msgs, min_replies=2)
+    assert [(r["author"], r["responder"], r["n"], r["median"], r["histogram"], r["reply_hours_utc"]) for r in fast] == \
+           [(r["author"], r["responder"], r["n"], r["median"], r["histogram"], r["reply_hours_utc"]) for r in slow]
+
+
+def test_pairs_only_for_authors_that_talk():
+    t0 = datetime(2024, 1, 1)
+    msgs = [("A", t0), ("B", t0 + timedelta(seconds=1)), ("A", t0 + timedelta(seconds=2)),
+            ("C", t0 + timedelta(days=3))]
+    assert set(rl.reply_latencies(msgs)) == {("A", "B"), ("B", "A"), ("A", "C")}
+    assert len(rl.reply_latencies(msgs)[("A", "C")]["latencies"]) == 0   # > MAX_GAP
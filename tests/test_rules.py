@@ -0,0 +1,41 @@
+import importlib
+import random
+
+from scamgeo_banking.scoring.rules import RuleEngine, default_rules, rules_from_patterns
+
+
+def _engine():
+    return RuleEngine(
+        rules_from_patterns("kw", [r"(skontaktuj .*WhatsApp|WhatsApp:\s*\+?\d+)", r"(USDT|TRC20)"], 20) + default_rules()
+    )
+
+
+def test_weights_and_explanations():
+    eng = _engine()
+    res = eng.score("Skontaktuj się przez WhatsApp, USDT bez ryzyka, sure profit")
+    rules = {(h["rule"], h["match"].lower()) for h in res["hits"]}
+    assert ("kw:0", "skontaktuj się przez whatsapp") in rules
+    assert ("risk:6", "whatsapp") in rules          # zagnieżdżone w dłuższym trafieniu
+    assert ("kw:1", "usdt") in rules and ("risk:3", "usdt") in rules  # ten sam start, dwie reguły
+    assert {h["weight"] for h in res["hits"] if h["match"] == "sure profit"} == {20}
+    assert res["label"] == "banking_scam"
+
+
+def test_trigger_path_equals_full_search():
+    eng = _engine()
+    words = ("iban konto otp tan bitcoin usdt 100% 0% bez ryzyka garantowany zysk bonus whatsapp "
+             "t.me official ad reklama skontaktuj WhatsApp: +48123 hello świat").split()
+    rnd = random.Random(3)
+    texts = [" ".join(rnd.choice(words) for _ in range(rnd.randint(1, 20))) for _ in range(500)]
+    fast = eng.score_batch(texts)
+    eng._text.positions = lambda _t: None  # wymuś ścieżkę pełnego search()
+    assert eng.score_batch(texts) == fast
+
+
+def test_banking_terms_scored_once_with_baseline_weights():
+    banking = importlib.import_module("scoring.banking")
+    res = banking.score_text("Wpłać USDT (TRC20), WhatsApp: +48123456789, t.me/vipsignals")
+    assert sorted((h["rule"], h["weight"]) for h in res["hits"]) == [("telegram", 10), ("usdt", 25), ("whatsapp", 20)]
+    assert res["score"] == 55 and res["label"] == "banking_scam"
+    assert banking.score_text("tylko USDT")["score"] == 25
+    assert banking.score_batch(["recharge USDT"], ["https://pay.top/a"])[0]["score"] == 20 + 25 + 15
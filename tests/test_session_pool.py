@@ -0,0 +1,109 @@
+import asyncio
+import importlib
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from telethon.errors import FloodWaitError
+
+from scamgeo_banking.tele.session_pool import SessionPool, load_accounts, owner_index
+
+
+class FakeClient:
+    """Konto testowe: iter_messages z opóźnieniem; flood_at=mid -> jednorazowy FloodWait na tej wiadomości."""
+
+    def __init__(self, name, flood_at=None, flood_s=30):
+        self.name = name
+        self.flood_at, self.flood_s = flood_at, flood_s
+        self.active = self.peak = 0
+        self.served = []
+
+    async def get_entity(self, handle):
+        if self.flood_at == "resolve":
+            self.flood_at = None
+            raise FloodWaitError(request=None, capture=self.flood_s)
+        return SimpleNamespace(title=handle.upper(), about=None, account=self.name)
+
+    async def iter_messages(self, entity, limit=None, offset_id=0, min_id=0):
+        assert entity.account == self.name   # encja z innego konta = zły access_hash
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            start = offset_id - 1 if offset_id else 10
+            for mid in range(start, max(min_id, start - limit), -1):
+                await asyncio.sleep(0.001)
+                if mid == self.flood_at:
+                    self.flood_at = None
+                    raise FloodWaitError(request=None, capture=self.flood_s)
+                self.served.append((entity.title, mid))
+                yield SimpleNamespace(id=mid, raw_text=f"msg {mid} https://x{mid}.example/a", message=None, date="2024-01-01")
+        finally:
+            self.active -= 1
+
+
+def test_load_accounts_shapes(tmp_path):
+    p = tmp_path / "config.json"
+    p.write_text(json.dumps({"telegram_accounts": [{"api_id": "1", "api_hash": "a"}, {"api_id": 2, "api_hash": "b", "session_name": "s2"}]}))
+    assert load_accounts(p) == [{"api_id": 1, "api_hash": "a", "session_name": "session1"},
+                                {"api_id": 2, "api_hash": "b", "session_name": "s2"}]
+    p.write_text(json.dumps({"telegram": {"api_id": 5, "api_hash": "x"}, "seeds": []}))
+    assert load_accounts(p, default_session="scamhunter.session") == [{"api_id": 5, "api_hash": "x", "session_name": "scamhunter.session"}]
+    p.write_text(json.dumps({"telegram_accounts": [{"api_id": 1, "api_hash": "a", "session_name": "x"}] * 2}))
+    with pytest.raises(ValueError):
+        load_accounts(p)
+    assert load_accounts(tmp_path / "brak.json") == []
+
+
+def test_shard_is_stable_and_covers_all_seeds():
+    pool = SessionPool([(f"acc{i}", FakeClient(f"acc{i}")) for i in range(3)])
+    seeds = [f"chan_{i}" for i in range(60)]
+    shards = pool.shard(seeds)
+    assert sorted(sum(shards.values(), [])) == sorted(seeds)
+    assert all(len(v) > 5 for v in shards.values())
+    assert owner_index("@Chan_7", 3) == owner_index("chan_7", 3)
+    assert pool.owner("chan_7").name in shards and "chan_7" in shards[pool.owner("chan_7").name]
+
+
+def test_deep_scrape_fails_over_on_flood_without_waiting(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ds = importlib.import_module("scamgeo_banking.tele.tg_deep_scrape")
+    a, b = FakeClient("a", flood_at=6, flood_s=30), FakeClient("b")
+    pool = SessionPool([("a", a), ("b", b)], per_client=2, min_interval=0.0)
+    handles = [h for h in (f"chan{i}" for i in range(40)) if pool.owner(h).name == "a"][:3]
+
+    async def run():
+        sem = asyncio.Semaphore(4)
+        progress = {"done": 0, "total": len(handles), "t0": 0.0}
+        return await asyncio.gather(*(ds._channel_task(pool, h, sem, 10, progress) for h in handles))
+
+    t0 = time.monotonic()
+    out = asyncio.run(run())
+    assert time.monotonic() - t0 < 5   # nikt nie czekał 30 s FloodWait
+    assert all(r["ok"] and len(r["urls"]) == 10 for r in out)
+    assert sum(r["errors"] == ["flood_wait:30s"] for r in out) == 1
+    # kanał przerwany na koncie a dokończony na b od miejsca przerwania, bez powtórek
+    flooded = next(r["handle"] for r in out if r["errors"])
+    got = [mid for acc in (a, b) for t, mid in acc.served if t == flooded.upper()]
+    assert sorted(got) == list(range(1, 11))
+    s = pool.summary()
+    assert s["a"]["floods"] == 1 and s["b"]["failover"] >= 1
+    assert a.peak <= 2 and b.peak <= 2
+
+
+def test_admin_dump_moves_seed_to_free_account(monkeypatch):
+    ad = importlib.import_module("scamgeo_banking.tele.tg_admin_dump")
+    a, b = FakeClient("a", flood_at="resolve", flood_s=60), FakeClient("b")
+    pool = SessionPool([("a", a), ("b", b)], per_client=None, min_interval=0.0)
+    seed = next(h for h in (f"chan{i}" for i in range(40)) if pool.owner(h).name == "a")
+    calls = []
+
+    async def fake_fetch(client, handle, cache=None, history=None, sink=None):
+        calls.append((client.name, cache))
+        await client.get_entity(handle)
+        return {**ad._new_info(handle), "title": handle}
+
+    monkeypatch.setattr(ad, "fetch_for_handle", fake_fetch)
+    out = asyncio.run(ad.dump_all(pool, [seed], cache={"a": "cache-a", "b": "cache-b"}))
+    assert out[0]["title"] == seed and out[0]["errors"] == []
+    assert calls == [("a", "cache-a"), ("b", "cache-b")]   # cache encji zgodny z kontem
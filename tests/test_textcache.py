@@ -0,0 +1,36 @@
+import importlib
+
+from scamgeo_banking.detection.iocs import PATTERNS_TAG
+from scamgeo_banking.detection.textcache import TextCache, content_key, normalize_text
+
+
+def test_text_cache_normalization_and_hits(tmp_path):
+    a = "🔥 Zarabiaj  100 USDT dziennie!\nhttps://t.me/promo_one?x=1"
+    b = "zarabiaj 100 usdt dziennie! 💰💰 https://t.me/promo_one?x=1"
+    c = "Zarabiaj 100 USDT dziennie! https://t.me/other_one"
+    (ka, ua), (kb, ub), (kc, _) = content_key(a), content_key(b), content_key(c)
+    assert ka == kb != kc                      # ścieżka URL-a (t.me/…) jest częścią klucza
+    assert ua == ub == ["https://t.me/promo_one?x=1"]
+    assert content_key(a, fold=False)[0] != content_key(b, fold=False)[0]
+    assert content_key(a, "https://youtube.com/watch?v=1")[0] != ka
+    # dekoracje spoza ASCII (emoji z ZWJ, selektory, symbole) i białe znaki Unicode -> jedna spacja
+    assert normalize_text("👩\u200d💻 Заработок\u00a0\u2003100 ✅\ufe0f USDT ☎", fold=False)[0] == "Заработок 100 USDT"
+
+    cache = TextCache(maxsize=2, path=tmp_path / "c.json", tag="v1")
+    calls = []
+    for text in (a, b, c, a):
+        cache.get_or_compute(content_key(text)[0], lambda: calls.append(1) or {"score": 1})
+    assert len(calls) == 2 and cache.stats()["hits"] == 2
+    cache.save()
+    assert len(TextCache(path=tmp_path / "c.json", tag="v1")) == 2
+    assert len(TextCache(path=tmp_path / "c.json", tag="v2")) == 0
+
+
+def test_extract_cache_keeps_case_of_ibans(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ds = importlib.import_module("scamgeo_banking.tele.tg_deep_scrape")
+    assert ds.TEXT_CACHE.tag == f"extract-{PATTERNS_TAG}"   # zmiana wzorców skanera = nowy cache
+    monkeypatch.setattr(ds, "TEXT_CACHE", ds.TextCache())
+    assert ds.extract_cached("Przelew: DE89370400440532013000")[1] == ["DE89370400440532013000"]
+    assert ds.extract_cached("przelew: de89370400440532013000")[1] == []
+    assert ds.TEXT_CACHE.stats()["hits"] == 0
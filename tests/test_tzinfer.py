@@ -0,0 +1,41 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from scamgeo_banking.detection import tzinfer
+
+
+def _brute_force(dates):
+    # dawna implementacja z tele/telegram.py (lista przesunięć + Counter per offset)
+    if not dates:
+        return None
+    hours = [d.astimezone(timezone.utc).hour for d in dates]
+    best_offset, best_score = None, -1
+    for off in tzinfer.UTC_OFFSETS:
+        counter = Counter((h + off) % 24 for h in hours)
+        score = sum(counter.get(h % 24, 0) for a, b in tzinfer.AWAKE_WINDOWS for h in range(a, b + 1))
+        if score > best_score:
+            best_score, best_offset = score, off
+    return best_offset
+
+
+def test_batch_offsets_match_brute_force():
+    rnd = random.Random(3)
+    t0 = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    groups = {
+        f"a{i}": [t0 + timedelta(minutes=rnd.randint(0, 60 * 24 * 14)) for _ in range(rnd.randint(0, 30))]
+        for i in range(200)
+    }
+    keys, hists = tzinfer.hour_histograms(groups)
+    assert hists.shape == (200, 24)
+    assert tzinfer.infer_offsets(hists) == [_brute_force(groups[k]) for k in keys]
+    assert tzinfer.infer_offset(["2024-05-01T08:30:00Z"]) == _brute_force([t0 + timedelta(hours=8)])
+
+
+def test_histograms_for_several_zones_in_one_pass():
+    t0 = datetime(2024, 3, 30, tzinfo=timezone.utc)
+    dates = [t0 + timedelta(hours=7 * i) for i in range(40)] + ["zła data", None]
+    vienna = timezone(timedelta(hours=1))
+    local, utc = tzinfer.hour_histogram_tzs(iter(dates), (vienna, timezone.utc))   # generator: tylko jedno przejście
+    assert list(local) == list(tzinfer.hour_histogram(dates, vienna))
+    assert list(utc) == list(tzinfer.hour_histogram(dates)) and sum(utc) == 40
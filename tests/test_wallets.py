@@ -0,0 +1,17 @@
+from scamgeo_banking.detection.wallets import filter_wallets, keccak256
+
+
+def test_wallet_checksums():
+    assert keccak256(b"").hex() == "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+    found = {
+        "btc": ["1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa", "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb",
+                "bc1p5d7rjq7g6rdk2yhzks9smlaqtedr4dekq08ge8ztwac72sfr9rusxg3297"],
+        "eth": ["0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed", "0x5aaeb6053F3E94C9b9A09f33669435E7Ef1BeAed"],
+        "trc20": ["TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t", "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6u"],
+        "urls": ["https://x.example"],
+    }
+    out = filter_wallets(found)
+    assert out["btc"] == [found["btc"][0], found["btc"][2]]
+    assert out["eth"] == [found["eth"][0]]
+    assert out["trc20"] == [found["trc20"][0]]
+    assert out["urls"] == found["urls"]